@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from core.palette import PaletteRegistry
+
 # Logolás (ha elérhető)
 try:
     from core.reconnect_handler import log_event
@@ -24,6 +26,8 @@ BASE_DIR.mkdir(parents=True, exist_ok=True)
 CONFIG_FILE = str(BASE_DIR / "led_schedule.json")
 # Új fájl az ütemezési profilok tárolásához
 PROFILES_FILE = str(BASE_DIR / "led_schedule_profiles.json")
+# SQLite profil tároló (az első indításkor a fenti JSON fájlokból töltődik fel)
+PROFILES_DB = str(BASE_DIR / "led_schedule_profiles.db")
 
 CHARACTERISTIC_UUID = "0000fff3-0000-1000-8000-00805f9b34fb"
 
@@ -44,6 +48,7 @@ CUSTOM_COLORS_FILE = str(BASE_DIR / "custom_colors.json")
 
 
 def _load_custom_colors():
+    """Betölti a mentett saját színeket ``{"name", "hex"}`` szótárak listájaként."""
     if Path(CUSTOM_COLORS_FILE).exists():
         try:
             import json
@@ -54,8 +59,7 @@ def _load_custom_colors():
             for item in data:
                 if isinstance(item, dict) and "name" in item and "hex" in item:
                     hex_val = item["hex"].lstrip("#")
-                    cmd = f"7e000503{hex_val}00ef"
-                    colors.append((item["name"], f"#{hex_val}", cmd))
+                    colors.append({"name": item["name"], "hex": f"#{hex_val}"})
             return colors
         except Exception as e:
             log_event(f"Hiba a saját színek betöltésekor ({CUSTOM_COLORS_FILE}): {e}")
@@ -66,4 +70,17 @@ def _load_custom_colors():
 CUSTOM_COLORS = _load_custom_colors()
 
 
-COLORS = DEFAULT_COLORS + CUSTOM_COLORS
+def _build_palette():
+    palette = PaletteRegistry(DEFAULT_COLORS)
+    for item in CUSTOM_COLORS:
+        try:
+            palette.add(item["name"], item["hex"])
+        except ValueError as e:
+            log_event(f"Figyelmeztetés: Saját szín kihagyva: {e}")
+    return palette
+
+
+PALETTE = _build_palette()
+
+# Visszafelé kompatibilitás: a registry (name, hex, command) tuple-ként iterálható
+COLORS = PALETTE
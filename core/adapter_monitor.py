@@ -0,0 +1,197 @@
+"""Event-driven Bluetooth adapter power/presence tracking (BlueZ ``PropertiesChanged``)."""
+
+import asyncio
+import importlib.util
+import sys
+import threading
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy AdapterMonitor]: {msg}")
+
+
+ADAPTER_INTERFACE = "org.bluez.Adapter1"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+OBJECT_MANAGER_INTERFACE = "org.freedesktop.DBus.ObjectManager"
+DEFAULT_ADAPTER = "hci0"
+
+
+def watcher_supported():
+    """BlueZ esemény figyelés csak Linuxon, telepített dbus_fast mellett (a bleak hozza)."""
+    return sys.platform.startswith("linux") and importlib.util.find_spec("dbus_fast") is not None
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdapterMonitor:
+    """Thread-safe adapter state shared by the BLE loops.
+
+    ``powered`` is ``None`` while no event source reports the state (non-Linux,
+    or the watcher is not running); callers then behave as before and only a
+    known ``False`` pauses connect/scan activity. Waiters on any event loop
+    are woken as soon as the adapter comes back.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._powered = None
+        self._waiters = []  # (loop, future)
+        self._listeners = []
+
+    @property
+    def powered(self):
+        return self._powered
+
+    @property
+    def available(self):
+        """False csak akkor, ha egy esemény kifejezetten kikapcsolt/eltűnt adaptert jelzett."""
+        return self._powered is not False
+
+    def subscribe(self, callback):
+        """``callback(powered)`` minden állapotváltozáskor (a jelző szálán fut)."""
+        self._listeners.append(callback)
+
+    def set_powered(self, powered, source="event"):
+        with self._lock:
+            if powered == self._powered:
+                return
+            self._powered = powered
+            waiters = self._waiters if powered is not False else []
+            if powered is not False:
+                self._waiters = []
+        state = {True: "bekapcsolva", False: "kikapcsolva / nem elérhető", None: "ismeretlen"}[powered]
+        log_event(f"Bluetooth adapter: {state} ({source}).")
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                pass  # a várakozó hurka már leállt
+        for callback in list(self._listeners):
+            try:
+                callback(powered)
+            except Exception as e:
+                log_event(f"Hiba az adapter állapot figyelőjében: {e}")
+
+    async def wait_available(self, timeout=None):
+        """Vár, amíg az adapter újra elérhető; True, ha az (a timeout lejárta előtt)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._powered is not False:
+                return True
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters = [w for w in self._waiters if w[1] is not future]
+
+
+def _value(variant):
+    return getattr(variant, "value", variant)
+
+
+class BluezAdapterWatcher:
+    """Feeds an :class:`AdapterMonitor` from BlueZ D-Bus signals.
+
+    Listens for ``PropertiesChanged`` (``Powered``) on the adapter object and
+    ``InterfacesAdded``/``InterfacesRemoved`` for the adapter appearing or
+    disappearing (USB dongle, rfkill, suspend/resume). ``bus_address`` points
+    at a different bus than the system bus (a local stand-in in tests).
+    """
+
+    def __init__(self, monitor, adapter=DEFAULT_ADAPTER, bus_address=None):
+        self.monitor = monitor
+        self.path = f"/org/bluez/{adapter}"
+        self.bus_address = bus_address
+
+    def handle_signal(self, interface, member, path, body):
+        """Egy D-Bus jel feldolgozása; True, ha az adapter állapotát érintette."""
+        if interface == PROPERTIES_INTERFACE and member == "PropertiesChanged":
+            if path == self.path and body and body[0] == ADAPTER_INTERFACE:
+                changed = body[1] if len(body) > 1 else {}
+                if "Powered" in changed:
+                    self.monitor.set_powered(bool(_value(changed["Powered"])))
+                    return True
+        elif interface == OBJECT_MANAGER_INTERFACE and member == "InterfacesAdded":
+            if body and body[0] == self.path and ADAPTER_INTERFACE in body[1]:
+                props = body[1][ADAPTER_INTERFACE]
+                self.monitor.set_powered(bool(_value(props.get("Powered", False))), "adapter megjelent")
+                return True
+        elif interface == OBJECT_MANAGER_INTERFACE and member == "InterfacesRemoved":
+            if body and body[0] == self.path and ADAPTER_INTERFACE in body[1]:
+                self.monitor.set_powered(False, "adapter eltűnt")
+                return True
+        return False
+
+    def _on_message(self, message):
+        from dbus_fast import MessageType
+
+        if message.message_type == MessageType.SIGNAL:
+            self.handle_signal(message.interface, message.member, message.path, message.body)
+        return None
+
+    async def run(self):
+        """Figyel, amíg a busz kapcsolat él (vagy a taskot megszakítják)."""
+        from dbus_fast import BusType, Message, MessageType
+        from dbus_fast.aio import MessageBus
+
+        if self.bus_address:
+            bus = MessageBus(bus_address=self.bus_address)
+        else:
+            bus = MessageBus(bus_type=BusType.SYSTEM)
+        await bus.connect()
+        try:
+            bus.add_message_handler(self._on_message)
+            rules = (
+                f"type='signal',interface='{PROPERTIES_INTERFACE}',member='PropertiesChanged',path='{self.path}'",
+                f"type='signal',interface='{OBJECT_MANAGER_INTERFACE}'",
+            )
+            for rule in rules:
+                await bus.call(
+                    Message(
+                        destination="org.freedesktop.DBus",
+                        path="/org/freedesktop/DBus",
+                        interface="org.freedesktop.DBus",
+                        member="AddMatch",
+                        signature="s",
+                        body=[rule],
+                    )
+                )
+            reply = await bus.call(
+                Message(
+                    destination="org.bluez",
+                    path=self.path,
+                    interface=PROPERTIES_INTERFACE,
+                    member="Get",
+                    signature="ss",
+                    body=[ADAPTER_INTERFACE, "Powered"],
+                )
+            )
+            if reply.message_type == MessageType.ERROR:
+                self.monitor.set_powered(False, f"nincs adapter: {reply.error_name}")
+            else:
+                self.monitor.set_powered(bool(_value(reply.body[0])), "kezdeti állapot")
+            await bus.wait_for_disconnect()
+        finally:
+            bus.disconnect()
+            # Eseményforrás nélkül nem tartunk meg elavult "kikapcsolva" állapotot
+            self.monitor.set_powered(None, "figyelő leállt")
+
+
+# Az alapértelmezett adapter közös állapota (BLEController és a reconnect loop is ezt nézi)
+ADAPTER_MONITOR = AdapterMonitor()
@@ -0,0 +1,237 @@
+"""Assignment of devices to local Bluetooth adapters by load and RSSI, with failure migration."""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from core.metrics import METRICS
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy AdapterPool]: {msg}")
+
+
+MAX_LINKS_PER_ADAPTER = 5  # a legtöbb vezérlő 5-7 egyidejű kapcsolatnál kezd romlani
+MIGRATE_AFTER_FAILURES = 3
+THROUGHPUT_WINDOW = 60.0  # másodperc
+UNKNOWN_RSSI = -127
+SYSFS_BLUETOOTH = "/sys/class/bluetooth"
+
+
+def enumerate_adapters():
+    """Local adapter names (``hci0``, ``hci1`` ...); ``[None]`` = the backend's default adapter.
+
+    Only Linux/BlueZ lets bleak pick an adapter per client; elsewhere, and with
+    a single controller, everything stays on the default adapter.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            names = sorted(n for n in os.listdir(SYSFS_BLUETOOTH) if n.startswith("hci") and ":" not in n)
+        except OSError:
+            names = []
+        if len(names) > 1:
+            return names
+    return [None]
+
+
+class _AdapterStats:
+    __slots__ = ("links", "assigned", "writes", "bytes", "recent", "failures")
+
+    def __init__(self):
+        self.links = set()  # csatlakozott címek
+        self.assigned = set()  # ide rendelt címek (a csatlakozás alattiakkal együtt)
+        self.writes = 0
+        self.bytes = 0
+        self.recent = deque()  # írások időbélyegei az áteresztőképességhez
+        self.failures = 0
+
+
+class AdapterPool:
+    """Shared by every BLEController (one per LED strip) and the reconnect loops.
+
+    A device keeps its adapter while it works. New devices go to the adapter
+    with the fewest assigned devices (ties broken by the best RSSI seen there),
+    and a device that fails to connect ``migrate_after`` times in a row is
+    moved to the best other adapter.
+    """
+
+    def __init__(
+        self,
+        adapters=None,
+        max_links=MAX_LINKS_PER_ADAPTER,
+        migrate_after=MIGRATE_AFTER_FAILURES,
+        clock=time.monotonic,
+    ):
+        self._adapters = list(adapters) if adapters is not None else None
+        self.max_links = max_links
+        self.migrate_after = migrate_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._assignment = {}
+        self._failures = {}
+        self._rssi = {}  # (cím, adapter) -> dBm
+        self.migrations = 0
+
+    @property
+    def adapters(self):
+        with self._lock:
+            self._ensure_adapters()
+            return list(self._adapters)
+
+    def _ensure_adapters(self):
+        if self._adapters is None:
+            self._adapters = enumerate_adapters()
+            if self._adapters != [None]:
+                log_event(f"Bluetooth adapterek: {', '.join(self._adapters)}")
+        for adapter in self._adapters:
+            if adapter not in self._stats:
+                self._stats[adapter] = _AdapterStats()
+
+    def note_rssi(self, address, adapter, rssi):
+        if rssi is not None:
+            with self._lock:
+                self._rssi[(address.upper(), adapter)] = rssi
+
+    def _best(self, address, exclude=()):
+        candidates = [a for a in self._adapters if a not in exclude] or list(self._adapters)
+
+        def score(adapter):
+            stats = self._stats[adapter]
+            full = len(stats.assigned - {address}) >= self.max_links
+            return (full, len(stats.assigned - {address}), -self._rssi.get((address, adapter), UNKNOWN_RSSI))
+
+        return min(candidates, key=score)
+
+    def assign(self, address):
+        """Az eszköz adaptere (szükség esetén új hozzárendeléssel)."""
+        address = address.upper()
+        with self._lock:
+            self._ensure_adapters()
+            adapter = self._assignment.get(address, False)
+            if adapter is False or adapter not in self._stats:
+                adapter = self._best(address)
+                self._move(address, adapter)
+            return adapter
+
+    def _move(self, address, adapter):
+        previous = self._assignment.get(address, False)
+        if previous is not False and previous in self._stats:
+            self._stats[previous].assigned.discard(address)
+            self._stats[previous].links.discard(address)
+        self._assignment[address] = adapter
+        self._stats[adapter].assigned.add(address)
+
+    def note_connected(self, address):
+        address = address.upper()
+        with self._lock:
+            adapter = self._assignment.get(address, False)
+            if adapter is False:
+                return
+            self._failures[address] = 0
+            self._stats[adapter].links.add(address)
+
+    def note_disconnected(self, address):
+        address = address.upper()
+        with self._lock:
+            adapter = self._assignment.get(address, False)
+            if adapter is not False:
+                self._stats[adapter].links.discard(address)
+
+    def note_failure(self, address):
+        """Sikertelen csatlakozás; ismétlődés esetén másik adapterre költözteti az eszközt.
+
+        Returns the adapter the device is assigned to afterwards.
+        """
+        address = address.upper()
+        with self._lock:
+            self._ensure_adapters()
+            adapter = self._assignment.get(address, False)
+            if adapter is False:
+                return None
+            self._stats[adapter].failures += 1
+            failures = self._failures.get(address, 0) + 1
+            self._failures[address] = failures
+            if failures < self.migrate_after or len(self._adapters) < 2:
+                return adapter
+            target = self._best(address, exclude=(adapter,))
+            self._failures[address] = 0
+            if target == adapter:
+                return adapter
+            self._move(address, target)
+            self.migrations += 1
+        log_event(f"{address}: {failures} sikertelen csatlakozás a(z) {adapter} adapteren, áthelyezés ide: {target}")
+        return target
+
+    def release(self, address):
+        """Az eszköz végleges elengedése (pl. a felhasználó bontotta a kapcsolatot)."""
+        address = address.upper()
+        with self._lock:
+            adapter = self._assignment.pop(address, False)
+            self._failures.pop(address, None)
+            if adapter is not False and adapter in self._stats:
+                self._stats[adapter].assigned.discard(address)
+                self._stats[adapter].links.discard(address)
+
+    def note_write(self, adapter, nbytes):
+        now = self._clock()
+        with self._lock:
+            stats = self._stats.get(adapter)
+            if stats is None:
+                return
+            stats.writes += 1
+            stats.bytes += nbytes
+            stats.recent.append(now)
+            self._trim(stats, now)
+
+    def _trim(self, stats, now):
+        cutoff = now - THROUGHPUT_WINDOW
+        while stats.recent and stats.recent[0] < cutoff:
+            stats.recent.popleft()
+
+    def snapshot(self):
+        """Adapterenként: kapcsolatok, hozzárendelt eszközök, írások és írás/s (az utolsó percben)."""
+        now = self._clock()
+        with self._lock:
+            self._ensure_adapters()
+            result = {}
+            for adapter in self._adapters:
+                stats = self._stats[adapter]
+                self._trim(stats, now)
+                result[adapter or "default"] = {
+                    "links": len(stats.links),
+                    "assigned": len(stats.assigned),
+                    "writes": stats.writes,
+                    "bytes": stats.bytes,
+                    "writes_per_second": len(stats.recent) / THROUGHPUT_WINDOW,
+                    "connect_failures": stats.failures,
+                }
+            return result
+
+    def metric_lines(self):
+        """Prometheus sorok (a MetricsRegistry collectoraként)."""
+        snap = self.snapshot()
+        lines = ["# TYPE led_adapter_links gauge"]
+        lines += [f'led_adapter_links{{adapter="{name}"}} {s["links"]}' for name, s in snap.items()]
+        lines.append("# TYPE led_adapter_writes_total counter")
+        lines += [f'led_adapter_writes_total{{adapter="{name}"}} {s["writes"]}' for name, s in snap.items()]
+        lines.append("# TYPE led_adapter_write_bytes_total counter")
+        lines += [f'led_adapter_write_bytes_total{{adapter="{name}"}} {s["bytes"]}' for name, s in snap.items()]
+        lines.append("# TYPE led_adapter_migrations_total counter")
+        lines.append(f"led_adapter_migrations_total {self.migrations}")
+        return lines
+
+
+# Az alkalmazás közös adapter-készlete (minden BLEController ezt használja)
+ADAPTER_POOL = AdapterPool()
+METRICS.add_collector(ADAPTER_POOL.metric_lines)
@@ -1,9 +1,25 @@
 # core/ble_controller.py (Logolással + eredeti szűréssel)
 
 import asyncio
+import threading
+import time
 from bleak import BleakClient, BleakScanner, BleakError
-from config import CHARACTERISTIC_UUID
+from config import BASE_DIR, CHARACTERISTIC_UUID
+from core.device_shadow import UNKNOWN_STATE, DeviceShadow
+from core.gatt_cache import GATT_CACHE_FILE, GattCache, client_kwargs
+from core import bluez_write
+from core.adapter_monitor import ADAPTER_MONITOR
+from core.adapter_pool import ADAPTER_POOL
+from core.keep_alive import KeepAliveScheduler
+from core.tracing import current_span
+from core.metrics import METRICS
+from core.ble_scheduler import CAUSE_PRIORITY, OperationPreempted, Priority, scheduler_for
+from core.warm_start import note_first_command
+from core.usage_journal import USAGE_JOURNAL
+from core.command_trace import COMMAND_TRACE
+from core import clock
 import traceback  # Hozzáadás a tracebackhez
+from contextlib import asynccontextmanager
 
 # Logolás importálása
 try:
@@ -17,6 +33,16 @@ except ImportError:
             print(f"[LOG - Dummy BLEController]: {msg}")
 
 
+ADAPTER_OFF_MESSAGE = "A Bluetooth ki van kapcsolva vagy nem érhető el. Kapcsolja be, majd próbálja újra."
+FOREIGN_CONNECT_POLL = 0.2  # másodperc
+FOREIGN_CONNECT_WAIT = 20.0  # legfeljebb ennyit várunk egy másik szál csatlakozására
+
+
+def connect_key(address):
+    """Single-flight kulcs egy cím csatlakozási műveletéhez (AsyncHelper.run_async_task ``key``)."""
+    return f"connect:{address.upper()}"
+
+
 class BLEController:
     BLUETOOTH_OFF_WINERRORS = {-2147020577}
     BLUETOOTH_OFF_STRINGS = [
@@ -27,9 +53,28 @@ class BLEController:
         "device not ready",
     ]
 
-    def __init__(self):
+    def __init__(self, client_factory=None, adapter_pool=None, journal=None, command_trace=None):
         self.client = None
+        # BleakClient-kompatibilis gyár (pl. a szimulált backend kliense)
+        self._client_factory = client_factory or BleakClient
+        self.adapter_pool = adapter_pool or ADAPTER_POOL
+        self.journal = journal or USAGE_JOURNAL  # tényleges állapotváltozások használati naplója
+        self.command_trace = command_trace or COMMAND_TRACE  # opcionális frame-szintű trace (visszajátszáshoz)
+        self.adapter = None  # None = a backend alapértelmezett adaptere
         self._connection_lock = asyncio.Lock()
+        self.target_address = None  # az utoljára célzott eszköz címe (a shadow kulcsa)
+        self.shadows = {}
+        self.keep_alive = KeepAliveScheduler()
+        self.scheduler = scheduler_for(None)  # az adapter közös, prioritásos műveleti sora
+        # Folyamatban lévő csatlakozások (GUI, auto-connect, reconnect loop), szálak között közös
+        self._connects_in_flight = set()
+        self._connects_lock = threading.Lock()
+        # A feloldott írási karakterisztika (kliens, karakterisztika) párként, címenként perzisztált handle-lel
+        self.gatt_cache = GattCache(str(BASE_DIR / GATT_CACHE_FILE))
+        self._write_char = (None, None)
+        # Linuxon az írások a BlueZ AcquireWrite socketjén mennek, ha elérhető (None = mindig bleak)
+        self.fast_writer = bluez_write.AcquiredWriter() if bluez_write.is_supported() else None
+        self.adapter_monitor = ADAPTER_MONITOR
 
     def _is_bluetooth_off_error(self, exc: Exception) -> bool:
         """Heurisztikusan megállapítja, hogy a kivétel a Bluetooth kikapcsolt
@@ -43,21 +88,31 @@ class BLEController:
             if s in msg:
                 return True
         return False
-
-    async def scan(self):
-        """Eszközök keresése (bővített logolással)."""
-        log_event("BLEController: Starting BleakScanner.discover...")  # <<< ÚJ LOG >>>
+
+    def _check_adapter(self):
+        """Ha a figyelő kikapcsolt adaptert jelez, azonnal hibázunk (nincs értelmetlen próbálkozás)."""
+        if not self.adapter_monitor.available:
+            raise RuntimeError(ADAPTER_OFF_MESSAGE)
+
+    async def scan(self):
+        """Eszközök keresése (bővített logolással)."""
+        self._check_adapter()
+        log_event("BLEController: Starting BleakScanner.discover...")  # <<< ÚJ LOG >>>
         devices_list = []
         try:
-            # Növelt timeout
-            discovered = await BleakScanner.discover(timeout=12.0)
+            # Növelt timeout; a felhasználói parancs megszakíthatja (ne várjon 12 s-ot a keresés mögött)
+            async with self.scheduler.slot(Priority.SCAN, "scan", preemptible=True) as grant:
+                discovered = await grant.run(BleakScanner.discover(timeout=12.0))
             log_event(f"BLEController: Discover finished. Found {len(discovered)} raw devices.")  # <<< ÚJ LOG >>>
             if discovered:
                 log_event("BLEController: Processing discovered devices...")  # <<< ÚJ LOG >>>
+                scan_adapter = self.adapter_pool.adapters[0]
                 for d in discovered:
                     name = d.name if d.name else "Unnamed Device"
                     address = d.address
                     log_event(f"  - Processing: {name} ({address})")  # <<< ÚJ LOG >>>
+                    # A keresés az alapértelmezett (első) adapteren fut; az RSSI segít az adapter választásban
+                    self.adapter_pool.note_rssi(address, scan_adapter, getattr(d, "rssi", None))
                     # Eredeti szűrés visszaállítása: Csak névvel rendelkező eszközök
                     if d.name:
                         devices_list.append((name, address))
@@ -66,21 +121,66 @@ class BLEController:
             else:
                 log_event("BLEController: No devices discovered by BleakScanner.")  # <<< ÚJ LOG >>>
 
+        except OperationPreempted:
+            log_event("BLEController: Keresés megszakítva egy felhasználói parancs miatt.")
+            devices_list = []
         except Exception as e:
             log_event(f"BLEController: Error during scan execution: {e}")  # <<< ÚJ LOG >>>
             log_event(f"Traceback:\n{traceback.format_exc()}")  # <<< ÚJ LOG >>>
             if self._is_bluetooth_off_error(e):
-                raise RuntimeError(
-                    "A Bluetooth ki van kapcsolva vagy nem érhető el. Kapcsolja be, majd próbálja újra."
-                ) from e
+                raise RuntimeError(ADAPTER_OFF_MESSAGE) from e
             devices_list = []  # Hiba esetén üres lista
 
         log_event(f"BLEController: Returning {len(devices_list)} named devices to AsyncHelper.")  # <<< ÚJ LOG >>>
         return devices_list  # Csak a névvel rendelkezőket adjuk vissza
 
+    # --- Single-flight csatlakozás ---
+    def begin_connect(self, address):
+        """Regisztrál egy csatlakozási kísérletet; False, ha ugyanide már fut egy (bármely szálon)."""
+        key = connect_key(address)
+        with self._connects_lock:
+            if key in self._connects_in_flight:
+                return False
+            self._connects_in_flight.add(key)
+            return True
+
+    def end_connect(self, address):
+        with self._connects_lock:
+            self._connects_in_flight.discard(connect_key(address))
+
+    def connect_in_flight(self, address):
+        with self._connects_lock:
+            return connect_key(address) in self._connects_in_flight
+
+    async def _await_foreign_connect(self, address):
+        """Megvárja egy másik szál (pl. a reconnect loop) kísérletét; True, ha az sikerült."""
+        log_event(f"BLEController: Csatlakozás már folyamatban: {address}, várakozás az eredményre.")
+        deadline = clock.monotonic() + FOREIGN_CONNECT_WAIT
+        while self.connect_in_flight(address) and clock.monotonic() < deadline:
+            await asyncio.sleep(FOREIGN_CONNECT_POLL)
+        client = self.client
+        return bool(client and client.is_connected and client.address.upper() == address.upper())
+
+    async def _single_flight(self, address, connect):
+        """Regisztrált kísérletként futtatja a ``connect()``-et, vagy átveszi a futó kísérlet eredményét."""
+        self._check_adapter()
+        if not self.begin_connect(address):
+            if await self._await_foreign_connect(address):
+                return True
+            if not self.begin_connect(address):
+                raise BleakError(f"Connection to {address} is already in progress.")
+        try:
+            return await connect()
+        finally:
+            self.end_connect(address)
+
     # connect, disconnect, send_command metódusok változatlanok maradnak
     async def connect(self, address):
         """Csatlakozás az eszközhöz címmel (egyszeri próbálkozás)."""
+        self.target_address = address
+        return await self._single_flight(address, lambda: self._connect_once(address))
+
+    async def _connect_once(self, address):
         async with self._connection_lock:
             if self.client and self.client.is_connected:
                 if self.client.address.upper() == address.upper():
@@ -93,18 +193,37 @@ class BLEController:
             if self.client:
                 pass  # Disconnect már megtörtént
 
-            self.client = BleakClient(address)
+            self.client = self.new_client(address)
             try:
-                await self.client.connect(timeout=15.0)
+                async with self.scheduler.slot(Priority.USER, "connect"):
+                    await self.client.connect(timeout=15.0)
                 log_event(f"BLEController: Sikeres csatlakozás: {address}")
+                self.on_connected(address)
                 return True
             except Exception as e:
                 log_event(f"BLEController: Csatlakozási hiba a connect() során ({type(e).__name__}): {e}")
                 self.client = None
+                self.on_connect_failed(address)
                 raise e
 
+    def new_client(self, address):
+        """Új kliens a címhez, a készlet által kijelölt adapteren (annak ütemezőjével)."""
+        adapter = self.adapter_pool.assign(address)
+        if adapter != self.adapter:
+            self.adapter = adapter
+            self.scheduler = scheduler_for(adapter)
+        return self._client_factory(address, **client_kwargs(adapter))
+
+    def on_connect_failed(self, address):
+        """Sikertelen csatlakozás: ismétlődés esetén a készlet másik adapterre költözteti az eszközt."""
+        self.adapter_pool.note_failure(address)
+
     async def connect_with_retry(self, address, attempts=3, delay=1.0, timeout=15.0):
         """Try connecting multiple times before giving up."""
+        self.target_address = address
+        return await self._single_flight(address, lambda: self._connect_attempts(address, attempts, delay, timeout))
+
+    async def _connect_attempts(self, address, attempts, delay, timeout):
         last_exc = None
         for attempt in range(1, attempts + 1):
             try:
@@ -118,14 +237,17 @@ class BLEController:
                         else:
                             await self.disconnect()
 
-                    self.client = BleakClient(address)
-                    await self.client.connect(timeout=timeout)
+                    self.client = self.new_client(address)
+                    async with self.scheduler.slot(Priority.USER, "connect"):
+                        await self.client.connect(timeout=timeout)
                     log_event(f"BLEController: Connected on attempt {attempt}: {address}")
+                    self.on_connected(address)
                     return True
             except Exception as e:
                 last_exc = e
                 log_event(f"BLEController: Connect error on attempt {attempt} ({type(e).__name__}): {e}")
                 self.client = None
+                self.on_connect_failed(address)
                 if attempt < attempts:
                     await asyncio.sleep(delay)
         if last_exc:
@@ -137,6 +259,9 @@ class BLEController:
         async with self._connection_lock:
             client_to_disconnect = self.client
             self.client = None
+            self.on_link_lost()
+            if client_to_disconnect:
+                self.adapter_pool.release(client_to_disconnect.address)
             if client_to_disconnect and client_to_disconnect.is_connected:
                 log_event(f"BLEController: disconnect() hívása: {client_to_disconnect.address}")
                 try:
@@ -145,17 +270,192 @@ class BLEController:
                 except BleakError as e:
                     log_event(f"BLEController: Hiba a kapcsolat bontása közben: {e}")
 
-    async def send_command(self, hex_command):
-        """Parancs küldése a csatlakoztatott eszköznek."""
+    @asynccontextmanager
+    async def _slot(self, priority, label):
+        """Ütemező slot; aktív trace esetén a várakozás ``ble.slot_wait`` span-ként látszik."""
+        span = current_span()
+        wait = span.child("ble.slot_wait", priority=Priority(priority).name, label=label) if span is not None else None
+        grant = None
+        try:
+            grant = await self.scheduler.acquire(priority, label)
+        finally:
+            if wait is not None:
+                wait.end(failed=grant is None)
+        try:
+            yield grant
+        finally:
+            self.scheduler.release(grant)
+
+    async def send_command(self, hex_command, priority=Priority.USER, cause="user"):
+        """Parancs küldése a csatlakoztatott eszköznek (az adott prioritási osztályban)."""
+        issued = self.command_trace.now() if self.command_trace.enabled else None
+        async with self._slot(priority, "write"):
+            await self._write_frame(hex_command, cause, issued)
+
+    async def _write_frame(self, hex_command, cause="user", issued=None):
+        """Egy frame kiírása; a hívó már birtokolja az ütemező slotját.
+
+        ``issued``: a parancs kiadásának ideje (slot várakozás előtt) a parancs trace-hez.
+        """
         if self.client and self.client.is_connected:
+            span = current_span()
+            if span is not None:
+                span = span.child("ble.write_gatt_char", frame=hex_command)
+            trace = self.command_trace
+            written = trace.now() if trace.enabled else None
+            started = time.perf_counter()
+            failed = True
             try:
-                await self.client.write_gatt_char(CHARACTERISTIC_UUID, bytes.fromhex(hex_command), response=False)
+                data = bytes.fromhex(hex_command)
+                await self._write_bytes(data)
+                failed = False
+                METRICS.write_result(True, time.perf_counter() - started)
+                note_first_command()
+                self.adapter_pool.note_write(self.adapter, len(data))
+                if self.target_address:
+                    self.keep_alive.note_write(self.target_address)
             except BleakError as e:
+                METRICS.write_result(False)
                 log_event(f"BLEController: Hiba parancs küldésekor ({hex_command}): {e}")
                 raise e
             except Exception as e:
+                METRICS.write_result(False)
                 log_event(f"BLEController: Váratlan hiba parancs küldésekor ({hex_command}): {e}")
                 raise e
+            finally:
+                # Sikertelen (vagy megszakított) írás span-je is lezárul, különben eltűnne a trace-ből
+                if span is not None:
+                    span.end(failed=failed)
+                if written is not None:
+                    trace.record(hex_command, cause, self.target_address, issued, written, ok=not failed)
         else:
             # Ezt a hibát a hívónak (async_helper) kell elkapnia és a command_error_signal-ra küldenie
             raise BleakError("Cannot send command: Not connected to device.")
+
+    async def write_keep_alive(self, hex_command):
+        """Keep-alive frame a parancsokkal azonos íróúton (a hívó birtokolja a KEEPALIVE slotot).
+
+        A megszerzett AcquireWrite descriptor mellett a BlueZ a bleak ``WriteValue`` hívását
+        elutasítja, ezért a ping sem mehet közvetlenül a ``write_gatt_char``-ra.
+        """
+        if not (self.client and self.client.is_connected):
+            raise BleakError("Cannot send keep-alive: Not connected to device.")
+        await self._write_bytes(bytes.fromhex(hex_command))
+
+    async def _write_bytes(self, data):
+        if not await self._fast_write(data):
+            await self.client.write_gatt_char(self.write_target, data, response=False)
+
+    async def _fast_write(self, data):
+        """Írás az AcquireWrite descriptorra; False, ha a bleak útra kell visszaesni."""
+        if self.fast_writer is None:
+            return False
+        client, char = self._write_char
+        if char is None or client is not self.client:
+            return False  # a karakterisztika még nincs feloldva ehhez a klienshez
+        return await self.fast_writer.write(client, char, data)
+
+    # --- Device shadow ---
+    def shadow_for(self, address=None):
+        """Visszaadja (szükség esetén létrehozza) az eszköz shadow-ját."""
+        address = (address or self.target_address or "").upper()
+        if not address:
+            return None
+        shadow = self.shadows.get(address)
+        if shadow is None:
+            shadow = self.shadows[address] = DeviceShadow(address)
+        return shadow
+
+    async def apply_state(self, power=None, color=None, brightness=None, cause="user"):
+        """Set the desired state and write only the frames that change the device.
+
+        Returns True if anything was written. Without a link the intent is
+        buffered silently for a short grace period and replayed on reconnect;
+        after that the usual "Not connected" error is raised. ``cause``
+        (user/schedule/replay) selects the scheduler priority class.
+        """
+        shadow = self.shadow_for()
+        if shadow is None:
+            raise BleakError("Cannot send command: Not connected to device.")
+        frames = shadow.set_desired(power=power, color=color, brightness=brightness)
+        if not frames:
+            log_event("BLEController: Írás kihagyva, az eszköz már a kívánt állapotban van.")
+            return False
+        if not (self.client and self.client.is_connected):
+            age = shadow.buffer_intent(frames)
+            if age <= shadow.intent_grace:
+                log_event(f"BLEController: Nincs kapcsolat, szándék pufferelve ({len(frames)} frame).")
+                return False
+            raise BleakError("Cannot send command: Not connected to device.")
+        issued = self.command_trace.now() if self.command_trace.enabled else None
+        async with self._slot(CAUSE_PRIORITY.get(cause, Priority.USER), f"apply_state:{cause}"):
+            for frame in frames:
+                await self._write_frame(frame, cause, issued)
+                shadow.acknowledge(frame)
+        self.journal.record(shadow.address, shadow.reported, cause)
+        return True
+
+    def retarget(self, address):
+        """Új címre váltás (pl. újrakeresés után); a shadow átkerül az új címre."""
+        previous = self.shadow_for()
+        self.target_address = address
+        if previous and address.upper() not in self.shadows:
+            previous.address = address.upper()
+            self.shadows[address.upper()] = previous
+
+    def on_connected(self, address):
+        """Sikeres csatlakozás után (bármely úton): keep-alive, metrikák, írási karakterisztika."""
+        self.keep_alive.note_connected(address)
+        self.adapter_pool.note_connected(address)
+        METRICS.connection_state(True)
+        client = self.client
+        try:
+            char = self.gatt_cache.resolve(client, address, CHARACTERISTIC_UUID)
+        except Exception as e:
+            log_event(f"BLEController: Írási karakterisztika feloldása sikertelen, UUID alapú írás marad: {e}")
+            char = None
+        self._write_char = (client, char)
+
+    @property
+    def write_target(self):
+        """Az aktuális kliens feloldott karakterisztikája (handle), különben a UUID."""
+        client, char = self._write_char
+        if char is not None and client is self.client:
+            return char
+        return CHARACTERISTIC_UUID
+
+    def on_link_lost(self):
+        """A kapcsolat megszakadt: a shadow riportált állapota ismeretlenné válik."""
+        METRICS.connection_state(False)
+        if self.target_address:
+            self.adapter_pool.note_disconnected(self.target_address)
+        if self.fast_writer is not None:
+            self.fast_writer.close()
+        shadow = self.shadow_for()
+        if shadow:
+            if shadow.reported != UNKNOWN_STATE:
+                self.journal.mark_unknown(shadow.address)  # a riport ne számolja tovább a bekapcsolt időt
+            shadow.mark_link_lost()
+
+    def journal_shutdown(self):
+        """Kilépéskor minden ismert állapotú eszköz állapota ismeretlenként kerül a naplóba."""
+        for shadow in list(self.shadows.values()):
+            if shadow.reported != UNKNOWN_STATE:
+                self.journal.mark_unknown(shadow.address)
+
+    async def reconcile(self):
+        """Újracsatlakozás után visszajátssza a kívánt állapotot (egy frame)."""
+        shadow = self.shadow_for()
+        if shadow is None:
+            return False
+        frames = shadow.reconcile_frames()
+        if frames:
+            issued = self.command_trace.now() if self.command_trace.enabled else None
+            async with self._slot(CAUSE_PRIORITY["replay"], "reconcile"):
+                for frame in frames:
+                    await self._write_frame(frame, "replay", issued)
+                    shadow.acknowledge(frame)
+            self.journal.record(shadow.address, shadow.reported, "replay")
+        if frames:
+            log_event(f"BLEController: Állapot visszaállítva újracsatlakozás után ({', '.join(frames)}).")
+        return bool(frames)
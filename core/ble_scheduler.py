@@ -0,0 +1,231 @@
+"""Priority-ordered access to the Bluetooth adapter, shared across event loops."""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+from core.latency_stats import LATENCY, RollingHistogram
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy BleScheduler]: {msg}")
+
+
+class Priority(IntEnum):
+    """Kisebb érték = előbb kap sort."""
+
+    USER = 0
+    SCHEDULE = 1
+    KEEPALIVE = 2
+    SCAN = 3
+
+
+# Parancs eredete -> prioritás (lásd BLEController.apply_state)
+CAUSE_PRIORITY = {
+    "user": Priority.USER,
+    "schedule": Priority.SCHEDULE,
+    "replay": Priority.SCHEDULE,
+}
+
+
+class OperationPreempted(Exception):
+    """A preemptible operation was cancelled to let a user command through."""
+
+
+class Grant:
+    """One request for the adapter; becomes the holder once granted."""
+
+    __slots__ = (
+        "priority",
+        "label",
+        "preemptible",
+        "loop",
+        "future",
+        "task",
+        "requested",
+        "granted",
+        "preempted",
+        "abandoned",
+    )
+
+    def __init__(self, priority, label, preemptible, loop, requested):
+        self.priority = priority
+        self.label = label
+        self.preemptible = preemptible
+        self.loop = loop
+        self.future = None
+        self.task = None
+        self.requested = requested
+        self.granted = None
+        self.preempted = False
+        self.abandoned = False
+
+    async def run(self, coro):
+        """Run ``coro`` as a cancellable sub-task; raises ``OperationPreempted`` if preempted."""
+        self.task = asyncio.ensure_future(coro)
+        if self.preempted:
+            self.task.cancel()
+        try:
+            return await self.task
+        except asyncio.CancelledError:
+            if self.preempted and self.task.cancelled():
+                raise OperationPreempted(self.label) from None
+            raise
+
+    def _cancel_for_preemption(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class OperationScheduler:
+    """Serialises adapter operations by priority class.
+
+    Callers on any event loop (the AsyncHelper loop, the reconnect loop) use
+    ``async with scheduler.slot(priority, label):``. A waiting user command
+    cancels a running preemptible operation (background rescans), and wait
+    and hold times are recorded per class.
+    """
+
+    def __init__(self, name="default", recorder=LATENCY, clock=time.perf_counter):
+        self.name = name
+        self._recorder = recorder
+        self._clock = clock
+        self._lock = threading.Lock()  # csak rövid, await nélküli szakaszok
+        self._holder = None
+        self._waiters = []
+        self._seq = itertools.count()
+        self.wait_stats = {p: RollingHistogram() for p in Priority}
+        self.preemptions = 0
+
+    @property
+    def busy(self):
+        return self._holder is not None
+
+    @asynccontextmanager
+    async def slot(self, priority, label="", preemptible=False):
+        grant = await self.acquire(priority, label, preemptible)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    async def acquire(self, priority, label="", preemptible=False):
+        loop = asyncio.get_running_loop()
+        grant = Grant(Priority(priority), label, preemptible, loop, self._clock())
+        preempt = None
+        with self._lock:
+            if self._holder is None:
+                # Szabad adapter mellett csak elhagyott várakozók maradhattak
+                self._waiters.clear()
+                self._grant(grant)
+                return grant
+            grant.future = loop.create_future()
+            heapq.heappush(self._waiters, (grant.priority, next(self._seq), grant))
+            holder = self._holder
+            if (
+                holder is not None
+                and holder.preemptible
+                and not holder.preempted
+                and grant.priority == Priority.USER
+                and holder.priority > grant.priority
+            ):
+                holder.preempted = True
+                self.preemptions += 1
+                preempt = holder
+        if preempt is not None:
+            log_event(f"BLE ütemező: '{preempt.label}' megszakítva a(z) '{label}' művelet miatt.")
+            try:
+                preempt.loop.call_soon_threadsafe(preempt._cancel_for_preemption)
+            except RuntimeError:
+                pass  # a tartó hurok már leállt
+        try:
+            await grant.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = self._holder is grant
+                if not granted:
+                    grant.abandoned = True
+            if granted:
+                self.release(grant)
+            raise
+        return grant
+
+    def _grant(self, grant):
+        grant.granted = self._clock()
+        self._holder = grant
+        wait = grant.granted - grant.requested
+        self.wait_stats[grant.priority].add(wait)
+
+    def release(self, grant):
+        """Frees the adapter and hands it to the highest-priority live waiter."""
+        while True:
+            with self._lock:
+                if self._holder is not grant:
+                    return
+                self._holder = None
+                nxt = None
+                while self._waiters:
+                    _, _, candidate = heapq.heappop(self._waiters)
+                    if not candidate.abandoned:
+                        nxt = candidate
+                        break
+                if nxt is not None:
+                    self._grant(nxt)
+            self._record(grant)
+            if nxt is None:
+                return
+            try:
+                nxt.loop.call_soon_threadsafe(_wake, nxt.future)
+                return
+            except RuntimeError:
+                # A várakozó hurka már nem fut: továbbadjuk a következőnek
+                grant = nxt
+
+    def _record(self, grant):
+        if grant.granted is None:
+            return
+        held = self._clock() - grant.granted
+        self._recorder.record(f"ble.{grant.priority.name.lower()}", grant.granted - grant.requested, held)
+
+    def snapshot(self):
+        """Per-class wait summaries, queue depth and preemption count."""
+        with self._lock:
+            holder = self._holder
+            return {
+                "adapter": self.name,
+                "holder": (holder.priority.name, holder.label) if holder else None,
+                "waiting": len([w for w in self._waiters if not w[2].abandoned]),
+                "preemptions": self.preemptions,
+                "wait": {p.name: self.wait_stats[p].summary() for p in Priority},
+            }
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def scheduler_for(adapter=None):
+    """Az adapterhez tartozó (közös) ütemező; ``None`` az alapértelmezett adapter."""
+    key = adapter or "default"
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = OperationScheduler(key)
+        return scheduler
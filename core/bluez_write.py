@@ -0,0 +1,142 @@
+"""Linux fast path: write-without-response frames through a BlueZ ``AcquireWrite`` socket."""
+
+import os
+import sys
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy BluezWrite]: {msg}")
+
+
+BLUEZ_SERVICE = "org.bluez"
+GATT_CHARACTERISTIC_INTERFACE = "org.bluez.GattCharacteristic1"
+ATT_HEADER_SIZE = 3  # opcode + handle; a payload legfeljebb MTU - 3 bájt
+
+
+def is_supported():
+    return sys.platform.startswith("linux")
+
+
+async def acquire_write_fd(char_path, bus_address=None):
+    """Calls ``AcquireWrite`` on the characteristic and returns ``(fd, mtu)``.
+
+    ``bus_address`` selects a different bus than the system bus (a local D-Bus
+    stand-in in tests). Raises ``OSError`` if BlueZ refuses the request.
+    """
+    from dbus_fast import BusType, Message, MessageType
+    from dbus_fast.aio import MessageBus
+
+    if bus_address:
+        bus = MessageBus(bus_address=bus_address, negotiate_unix_fd=True)
+    else:
+        bus = MessageBus(bus_type=BusType.SYSTEM, negotiate_unix_fd=True)
+    await bus.connect()
+    try:
+        reply = await bus.call(
+            Message(
+                destination=BLUEZ_SERVICE,
+                path=char_path,
+                interface=GATT_CHARACTERISTIC_INTERFACE,
+                member="AcquireWrite",
+                signature="a{sv}",
+                body=[{}],
+            )
+        )
+        if reply.message_type == MessageType.ERROR:
+            raise OSError(f"{reply.error_name}: {reply.body[0] if reply.body else ''}")
+        fd_index, mtu = reply.body
+        return reply.unix_fds[fd_index], mtu
+    finally:
+        bus.disconnect()
+
+
+def _object_path(char):
+    """A karakterisztika BlueZ D-Bus objektum útvonala (a bleak verziótól függően ``path`` vagy ``obj``)."""
+    path = getattr(char, "path", None)
+    if isinstance(path, str):
+        return path
+    obj = getattr(char, "obj", None)
+    if isinstance(obj, (tuple, list)) and obj and isinstance(obj[0], str):
+        return obj[0]
+    return None
+
+
+class AcquiredWriter:
+    """Writes frames straight to an acquired descriptor, one descriptor per connected client.
+
+    ``write`` returns False whenever the fast path is not usable (no BlueZ
+    object path, refused ``AcquireWrite``, oversized frame, broken socket),
+    and the caller falls back to ``write_gatt_char``. BlueZ rejects
+    ``WriteValue`` while the descriptor is held, so it is always closed
+    before such a fallback. A refused or broken descriptor is not retried
+    until the next connection; after an oversized frame the next frame
+    acquires it again.
+    """
+
+    def __init__(self, acquire=acquire_write_fd):
+        self._acquire = acquire
+        self._client = None
+        self._fd = None
+        self.mtu = 0
+        self.frames = 0
+        self.fallbacks = 0
+
+    @property
+    def active(self):
+        return self._fd is not None
+
+    async def _open(self, char):
+        path = _object_path(char)
+        if not path:
+            return
+        try:
+            self._fd, self.mtu = await self._acquire(path)
+            log_event(f"BlueZ AcquireWrite aktív ({path}, MTU {self.mtu}).")
+        except Exception as e:
+            log_event(f"BlueZ AcquireWrite nem elérhető, bleak írás marad: {e}")
+            self._fd = None
+
+    async def write(self, client, char, data):
+        if client is not self._client:
+            self.close()
+            self._client = client
+            if char is not None:
+                await self._open(char)
+        if self._fd is None:
+            self.fallbacks += 1
+            return False
+        if len(data) > self.mtu - ATT_HEADER_SIZE:
+            # A bleak írás előtt el kell engedni a descriptort; a következő frame újra megszerzi
+            self.close()
+            self.fallbacks += 1
+            return False
+        try:
+            os.write(self._fd, data)
+        except OSError as e:
+            log_event(f"BlueZ AcquireWrite socket hiba, vissza a bleak írásra: {e}")
+            self._close_fd()
+            self.fallbacks += 1
+            return False
+        self.frames += 1
+        return True
+
+    def _close_fd(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+    def close(self):
+        """Bontáskor: a descriptor lezárása, a következő kliens újra próbálkozik."""
+        self._close_fd()
+        self._client = None
@@ -0,0 +1,127 @@
+"""Injectable time source: the system clock, or a virtual clock for time-travel tests.
+
+Scheduling, keep-alive, backoff and timeline code read time through
+:func:`now`, :func:`wall_time` and :func:`monotonic` (or take a clock
+argument). With a :class:`VirtualClock` installed via :func:`set_clock` and
+its event loop running the coroutines, ``asyncio.sleep`` and timeouts
+advance virtual time instantly whenever the loop would otherwise block.
+"""
+
+import asyncio
+import selectors
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def now(self, tz=None):
+        return datetime.now(tz)
+
+    def new_event_loop(self):
+        return asyncio.new_event_loop()
+
+
+class VirtualClock:
+    """Virtual wall and monotonic time that only moves when advanced.
+
+    ``start`` is a unix timestamp or an aware ``datetime`` (default: the
+    current time, so the virtual day starts "today").
+    """
+
+    def __init__(self, start=None):
+        if isinstance(start, datetime):
+            start = start.timestamp()
+        self._wall = time.time() if start is None else float(start)
+        self._elapsed = 0.0
+
+    def time(self):
+        return self._wall + self._elapsed
+
+    def monotonic(self):
+        return self._elapsed
+
+    def now(self, tz=None):
+        return datetime.fromtimestamp(self.time(), tz)
+
+    def advance(self, seconds):
+        if seconds < 0:
+            raise ValueError("A virtuális idő nem mehet visszafelé")
+        self._elapsed += seconds
+
+    def advance_to(self, when):
+        """Előre a megadott (aware) időpontig vagy unix időbélyegig."""
+        target = when.timestamp() if isinstance(when, datetime) else when
+        self.advance(max(0.0, target - self.time()))
+
+    def new_event_loop(self):
+        return VirtualTimeEventLoop(self)
+
+
+class _VirtualTimeSelector:
+    """Wraps a real selector: an idle wait with a timeout advances the virtual clock instead of blocking."""
+
+    def __init__(self, selector, clock):
+        self._selector = selector
+        self._clock = clock
+
+    def select(self, timeout=None):
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # Nincs időzített feladat: valódi I/O-ra (pl. call_soon_threadsafe) várunk
+            return self._selector.select(None)
+        self._clock.advance(timeout)
+        return []
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose ``time()`` is the virtual monotonic clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        super().__init__(_VirtualTimeSelector(selectors.DefaultSelector(), clock))
+
+    def time(self):
+        return self.clock.monotonic()
+
+
+SYSTEM_CLOCK = SystemClock()
+_current = SYSTEM_CLOCK
+
+
+def current_clock():
+    return _current
+
+
+def set_clock(clock):
+    """Installs ``clock`` (``None`` = system clock) and returns the previous one."""
+    global _current
+    previous, _current = _current, clock or SYSTEM_CLOCK
+    return previous
+
+
+def now(tz=None):
+    return _current.now(tz)
+
+
+def wall_time():
+    return _current.time()
+
+
+def monotonic():
+    return _current.monotonic()
+
+
+def new_event_loop():
+    """Event loop for the app's asyncio threads, running on the current clock."""
+    return _current.new_event_loop()
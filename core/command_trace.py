@@ -0,0 +1,189 @@
+"""Optional capture of every outbound BLE frame, and replay of a capture through ``BLEController``.
+
+A trace is a JSON-lines text file: a header line, then one record per write
+attempt. Record times are monotonic seconds since the trace was opened:
+``t`` when the command was issued (before waiting for the scheduler slot),
+``w`` when the write itself started. Lines are flushed as written, so a
+trace survives a crash up to its last frame.
+"""
+
+import asyncio
+import json
+import threading
+from collections import namedtuple
+
+from core.ble_scheduler import CAUSE_PRIORITY, Priority
+from core.clock import monotonic, wall_time
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy CommandTrace]: {msg}")
+
+
+COMMAND_TRACE_FILE = "command_trace.jsonl"
+TRACE_FORMAT = "led-command-trace"
+TRACE_VERSION = 1
+
+TraceRecord = namedtuple("TraceRecord", "t w cause address frame ok")
+ReplayResult = namedtuple("ReplayResult", "sent failed lag duration")
+
+
+def cause_priority(cause):
+    """Ütemező prioritás egy rögzített ok alapján (ahogy az élő alkalmazás küldte)."""
+    if cause == "keep-alive":
+        return Priority.KEEPALIVE
+    return CAUSE_PRIORITY.get(cause, Priority.USER)
+
+
+class CommandTrace:
+    """Writer side; ``record`` is a no-op until :meth:`open` is called."""
+
+    def __init__(self, clock=monotonic):
+        self.path = None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file = None
+        self._origin = 0.0
+        self.records = 0
+
+    @property
+    def enabled(self):
+        return self._file is not None
+
+    def now(self):
+        """Monotonikus idő a ``t``/``w`` mezőkhöz (``issued`` paraméterként adható tovább)."""
+        return self._clock()
+
+    def open(self, path):
+        """Starts a new capture at ``path`` (an existing file is overwritten)."""
+        with self._lock:
+            if self._file is not None:
+                return True
+            try:
+                self._file = open(path, "w", encoding="utf-8", buffering=1)
+            except OSError as e:
+                log_event(f"Hiba a parancs trace megnyitásakor ({path}): {e}")
+                return False
+            self._origin = self._clock()
+            self._file.write(json.dumps({"format": TRACE_FORMAT, "version": TRACE_VERSION, "started": wall_time()}))
+            self._file.write("\n")
+            self.path = str(path)
+            self.records = 0
+        log_event(f"Parancs trace rögzítése: {path}")
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def record(self, frame, cause="user", address=None, issued=None, written=None, ok=True):
+        """Egy kimenő frame rögzítése; ``issued``/``written`` a :meth:`now` szerinti idők."""
+        if self._file is None:
+            return False
+        now = self._clock()
+        issued = now if issued is None else issued
+        written = issued if written is None else written
+        line = json.dumps(
+            {
+                "t": round(issued - self._origin, 6),
+                "w": round(written - self._origin, 6),
+                "cause": cause,
+                "address": address,
+                "frame": frame,
+                "ok": ok,
+            }
+        )
+        with self._lock:
+            if self._file is None:
+                return False
+            try:
+                self._file.write(line + "\n")
+            except (OSError, ValueError) as e:
+                log_event(f"Hiba a parancs trace írásakor: {e}")
+                return False
+            self.records += 1
+        return True
+
+
+def load(path):
+    """``(header, [TraceRecord])``; a torn last line (crash while writing) is skipped."""
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    if not lines:
+        raise ValueError(f"Empty command trace: {path}")
+    header = json.loads(lines[0])
+    if header.get("format") != TRACE_FORMAT:
+        raise ValueError(f"Not a command trace: {path}")
+    records = []
+    for number, line in enumerate(lines[1:], start=2):
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            if number == len(lines):
+                break
+            raise
+        records.append(
+            TraceRecord(
+                data["t"],
+                data.get("w", data["t"]),
+                data.get("cause", "user"),
+                data.get("address"),
+                data["frame"],
+                data.get("ok", True),
+            )
+        )
+    return header, records
+
+
+async def replay(controller, records, speed=1.0):
+    """Feeds ``records`` through ``controller.send_command`` with the recorded priorities.
+
+    With a ``speed`` (1.0 = real time) each command is issued at its recorded
+    ``t / speed`` offset without waiting for earlier ones, so queueing builds
+    up as it did in the field. ``speed=None`` drops the gaps: each command
+    is sent as soon as the previous one finished. Failed writes are counted,
+    not raised. ``lag`` holds each sent command's issue-to-completion seconds.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    lag = []
+    failed = 0
+
+    async def send(record, due):
+        nonlocal failed
+        try:
+            await controller.send_command(record.frame, cause_priority(record.cause), record.cause)
+        except Exception as e:
+            failed += 1
+            log_event(f"Trace visszajátszás: sikertelen frame ({record.frame}): {e}")
+            return
+        lag.append(loop.time() - due)
+
+    if speed is None:
+        for record in records:
+            await send(record, loop.time())
+    else:
+        tasks = []
+        origin = records[0].t if records else 0.0
+        for record in records:
+            due = started + (record.t - origin) / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(send(record, due)))
+        await asyncio.gather(*tasks)
+    return ReplayResult(len(lag), failed, lag, loop.time() - started)
+
+
+# Az alkalmazás trace-e (a főablak nyitja meg, ha a beállítás engedi)
+COMMAND_TRACE = CommandTrace()
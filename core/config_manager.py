@@ -5,6 +5,7 @@ import os
 import traceback
 
 from config import BASE_DIR
+from core.file_io import FILE_IO
 
 # Logolás (ha a reconnect_handler elérhető)
 try:
@@ -28,6 +29,14 @@ DEFAULT_SETTINGS = {
     "last_device_name": None,  # Hozzáadva a név is
     "auto_connect_on_startup": True,  # Új beállítás: automatikus csatlakozás induláskor
     "brightness_level": 80,  # Fényerő százalékos értéke (0-100)
+    "tray_memory_saver": False,  # Rejtett GUI lebontása tálcán töltött tétlen idő után
+    "tray_release_delay_minutes": 10,  # Tétlen idő (perc) a GUI lebontása előtt
+    "metrics_export": True,  # Prometheus metrikák periodikus kiírása a BASE_DIR alá
+    "metrics_http_port": 0,  # Ha nem 0, a metrikák a 127.0.0.1:port/metrics címen is elérhetők
+    "usage_journal": True,  # Tényleges LED állapotváltozások bináris naplója a BASE_DIR alá
+    "command_trace": False,  # Minden kimenő BLE frame rögzítése visszajátszáshoz (hibabejelentésekhez)
+    "stall_watchdog_ms": 250,  # GUI szál akadás küszöbe (ms) a stack mentéshez; 0 = kikapcsolva
+    "slow_callback_ms": 100,  # Az asyncio hurkot ennél tovább blokkoló callbackek rögzítése; 0 = kikapcsolva
 }
 
 
@@ -117,9 +126,9 @@ def set_setting(key, value):
         # Biztosítjuk, hogy csak az ismert kulcsokat mentsük, az aktuális értékekkel
         settings_to_save = {k: CURRENT_SETTINGS.get(k, DEFAULT_SETTINGS[k]) for k in DEFAULT_SETTINGS}
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(settings_to_save, f, ensure_ascii=False, indent=4)
-            log_event(f"Beállítások elmentve ({key}={value}): {path}")
+            # Pillanatkép itt, a lemezre írás a FILE_IO szálán (atomi cserével)
+            FILE_IO.save_json(path, settings_to_save)
+            log_event(f"Beállítások mentése ({key}={value}): {path}")
         except Exception as e:
             log_event(f"Hiba a beállítások mentésekor ({path}): {e}")
             traceback.print_exc()
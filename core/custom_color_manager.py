@@ -1,8 +1,7 @@
 """Manage custom color definitions for the LED application."""
 
-import json
-
-from config import CUSTOM_COLORS_FILE, CUSTOM_COLORS, COLORS
+from config import CUSTOM_COLORS_FILE, CUSTOM_COLORS, PALETTE
+from core.file_io import FILE_IO
 
 # Logolás importálása
 try:
@@ -18,26 +17,36 @@ except ImportError:
 
 
 def save_custom_colors_list():
-    """Persist the current list of custom colors to disk."""
+    """Persist the current list of custom colors to disk (written on the I/O thread when it runs)."""
     try:
-        with open(CUSTOM_COLORS_FILE, "w", encoding="utf-8") as f:
-            json.dump(CUSTOM_COLORS, f, ensure_ascii=False, indent=4)
+        FILE_IO.save_json(CUSTOM_COLORS_FILE, CUSTOM_COLORS)
     except Exception as e:
         log_event(f"Hiba a színek mentésekor: {e}")
         raise
 
 
 def add_custom_color(name: str, hex_code: str):
-    """Add a new custom color and persist it."""
-    hex_code = hex_code.lstrip("#")
-    entry = {"name": name, "hex": f"#{hex_code}"}
-    CUSTOM_COLORS.append(entry)
-    COLORS.append((name, f"#{hex_code}", f"7e000503{hex_code}00ef"))
+    """Add a new custom color and persist it.
+
+    Raises ``ValueError`` if a color with the same name already exists.
+    """
+    entry = PALETTE.add(name, hex_code)
+    CUSTOM_COLORS.append({"name": entry.name, "hex": entry.hex})
     save_custom_colors_list()
 
 
 def delete_custom_color(name: str):
     """Delete a custom color by name and persist the list."""
     CUSTOM_COLORS[:] = [c for c in CUSTOM_COLORS if c.get("name") != name]
-    COLORS[:] = [c for c in COLORS if c[0] != name]
+    if name in PALETTE:
+        PALETTE.remove(name)
+    save_custom_colors_list()
+
+
+def rename_custom_color(old_name: str, new_name: str):
+    """Rename a custom color and persist the list."""
+    PALETTE.rename(old_name, new_name)
+    for c in CUSTOM_COLORS:
+        if c.get("name") == old_name:
+            c["name"] = new_name
     save_custom_colors_list()
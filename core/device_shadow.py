@@ -0,0 +1,135 @@
+"""Per-device shadow of the LED strip state (desired vs. last acknowledged)."""
+
+import threading
+from typing import NamedTuple, Optional
+
+from core.clock import monotonic
+
+OFF_COMMAND = "7e00050300000000ef"
+COLOR_PREFIX = "7e000503"
+BRIGHTNESS_PREFIX = "7e0001"
+INTENT_GRACE_SECONDS = 15.0  # ennyi ideig pufferelünk csendben kapcsolat nélkül
+
+
+def brightness_command(level: int) -> str:
+    """Fényerő parancs 0-100 közötti értékre."""
+    return f"{BRIGHTNESS_PREFIX}{max(0, min(100, int(level))):02x}00000000ef"
+
+
+class DeviceState(NamedTuple):
+    """Power/color/brightness triple; ``None`` means unknown."""
+
+    power: Optional[bool] = None
+    color: Optional[str] = None  # színparancs (hex frame)
+    brightness: Optional[int] = None
+
+
+UNKNOWN_STATE = DeviceState()
+
+
+def state_after_frame(state: DeviceState, frame: str) -> DeviceState:
+    """Az eszköz állapota egy sikeresen elküldött frame után."""
+    frame = frame.lower()
+    if frame == OFF_COMMAND:
+        return state._replace(power=False)
+    if frame.startswith(COLOR_PREFIX):
+        return state._replace(power=True, color=frame)
+    if frame.startswith(BRIGHTNESS_PREFIX):
+        return state._replace(brightness=int(frame[6:8], 16))
+    return state
+
+
+def power_frame(desired: DeviceState) -> Optional[str]:
+    """A kívánt be/ki és szín állapotot beállító egyetlen frame."""
+    if desired.power is False:
+        return OFF_COMMAND
+    if desired.power and desired.color:
+        return desired.color
+    return None
+
+
+class DeviceShadow:
+    """Tracks what the user wants and what the strip was last told.
+
+    ``set_desired`` returns only the frames that would change the device, so
+    repeated identical commands cost no radio traffic. While the link is down
+    the latest intent is kept and :meth:`reconcile_frames` yields the single
+    power/color frame to replay after reconnecting.
+    """
+
+    def __init__(self, address, intent_grace=INTENT_GRACE_SECONDS, clock=monotonic):
+        self.address = address
+        self.intent_grace = intent_grace
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.desired = UNKNOWN_STATE
+        self.reported = UNKNOWN_STATE
+        self._buffered_since = None
+        self._buffered_brightness = False
+        self.suppressed_writes = 0
+
+    @staticmethod
+    def _diff_frames(desired, reported):
+        frames = []
+        if desired.power is False and reported.power is not False:
+            frames.append(OFF_COMMAND)
+        elif desired.power and desired.color:
+            if reported.power is not True or reported.color != desired.color:
+                frames.append(desired.color)
+        if desired.brightness is not None and desired.brightness != reported.brightness:
+            frames.append(brightness_command(desired.brightness))
+        return frames
+
+    def set_desired(self, power=None, color=None, brightness=None):
+        """Update the desired state and return the frames needed to reach it."""
+        with self._lock:
+            changes = {}
+            if power is not None:
+                changes["power"] = bool(power)
+            if color is not None:
+                changes["color"] = color.lower()
+            if brightness is not None:
+                changes["brightness"] = max(0, min(100, int(brightness)))
+            self.desired = self.desired._replace(**changes)
+            frames = self._diff_frames(self.desired, self.reported)
+            if not frames:
+                self.suppressed_writes += 1
+            return frames
+
+    def acknowledge(self, frame):
+        """Egy frame sikeresen kiment: a riportált állapot frissítése."""
+        with self._lock:
+            self.reported = state_after_frame(self.reported, frame)
+
+    def buffer_intent(self, frames):
+        """Kapcsolat nélkül érkezett szándék tárolása; visszaadja a pufferelés korát (s)."""
+        with self._lock:
+            now = self._clock()
+            if self._buffered_since is None:
+                self._buffered_since = now
+            if any(f.startswith(BRIGHTNESS_PREFIX) for f in frames):
+                self._buffered_brightness = True
+            return now - self._buffered_since
+
+    def mark_link_lost(self):
+        """A kapcsolat megszakadt: az eszköz valós állapota ismeretlen."""
+        with self._lock:
+            self.reported = UNKNOWN_STATE
+
+    def reconcile_frames(self):
+        """Frames to replay after a reconnect, and clear the buffered intent.
+
+        Always one power/color frame when the desired state is known; a
+        brightness frame is added only if a brightness change was buffered
+        while the link was down.
+        """
+        with self._lock:
+            frames = []
+            frame = power_frame(self.desired)
+            if frame:
+                frames.append(frame)
+            if self._buffered_brightness and self.desired.brightness is not None:
+                frames.append(brightness_command(self.desired.brightness))
+            self._buffered_since = None
+            self._buffered_brightness = False
+            return frames
@@ -0,0 +1,178 @@
+"""Off-thread JSON persistence: snapshot on the caller, write atomically on a worker thread.
+
+:meth:`FileIOService.save_json` takes a compact snapshot of the data on
+the calling thread, using the C JSON encoder, so later changes to the
+live object do not leak into the file. The worker pretty-prints it and
+replaces the target atomically (temp file, fsync, ``os.replace``).
+Repeated saves of the same file while one is queued collapse into the
+latest snapshot. Before :meth:`start` (and after :meth:`stop`) saves
+are written synchronously, still atomically.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections import deque
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy FileIO]: {msg}")
+
+
+STOP_TIMEOUT = 5.0  # kilépéskor legfeljebb ennyit várunk a függő mentésekre
+
+
+def write_atomic(path, text):
+    """``text`` kiírása ideiglenes fájlba ugyanabban a könyvtárban, majd atomi csere."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _pretty(snapshot):
+    return json.dumps(json.loads(snapshot), ensure_ascii=False, indent=4)
+
+
+class FileIOService:
+    """Single worker thread for JSON saves; results go to ``on_done`` and the listeners.
+
+    Callbacks get ``(path, error)`` with ``error`` ``None`` on success and run on
+    the worker thread, so GUI code should forward them through a Qt signal.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = {}  # útvonal -> (pillanatkép, [on_done])
+        self._order = deque()
+        self._active = None
+        self._thread = None
+        self._stopping = False
+        self._listeners = []
+        self.coalesced = 0
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def save_json(self, path, data, on_done=None):
+        """Queues ``data`` for ``path``. Serialization errors raise here, write errors are reported."""
+        path = os.path.abspath(str(path))
+        snapshot = json.dumps(data, ensure_ascii=False)
+        with self._cond:
+            if self._thread is not None:
+                entry = self._pending.get(path)
+                if entry is not None:
+                    entry[1].append(on_done)
+                    self._pending[path] = (snapshot, entry[1])
+                    self.coalesced += 1
+                else:
+                    self._pending[path] = (snapshot, [on_done])
+                    self._order.append(path)
+                self._cond.notify_all()
+                return True
+        # Nincs worker (indítás előtt, tesztekben, leállítás után): szinkron írás
+        error = self._write(path, snapshot)
+        self._notify(path, error, [on_done])
+        return error is None
+
+    def _write(self, path, snapshot):
+        try:
+            write_atomic(path, _pretty(snapshot))
+            return None
+        except Exception as e:
+            log_event(f"Hiba a fájl mentésekor ({path}): {e}")
+            return str(e)
+
+    def _notify(self, path, error, callbacks):
+        for callback in [c for c in callbacks if c is not None] + list(self._listeners):
+            try:
+                callback(path, error)
+            except Exception as e:
+                log_event(f"Hiba a mentés visszajelzésekor ({path}): {e}")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._order and not self._stopping:
+                    self._cond.wait()
+                if not self._order:
+                    self._thread = None  # innentől a mentések szinkronok
+                    self._cond.notify_all()
+                    return
+                path = self._order.popleft()
+                snapshot, callbacks = self._pending.pop(path)
+                self._active = path
+            error = self._write(path, snapshot)
+            with self._cond:
+                self._active = None
+                self._cond.notify_all()
+            self._notify(path, error, callbacks)
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="file-io", daemon=True)
+            self._thread.start()
+
+    def flush(self, path=None, timeout=None):
+        """Waits until the pending save of ``path`` (or every save) is on disk; False on timeout."""
+        path = os.path.abspath(str(path)) if path is not None else None
+
+        def idle():
+            if path is None:
+                return not self._order and self._active is None
+            return path not in self._pending and self._active != path
+
+        with self._cond:
+            return self._cond.wait_for(idle, timeout)
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Writes out the queued saves, then stops the worker (later saves are synchronous)."""
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        thread.join(timeout)
+        if thread.is_alive():
+            log_event("Figyelmeztetés: a függő fájlmentések nem fejeződtek be időben.")
+
+    def load_json(self, path):
+        """Reads ``path`` after any queued save of it has been written (read-after-write)."""
+        self.flush(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+# Az alkalmazás közös I/O szála (a főablak indítja és állítja le)
+FILE_IO = FileIOService()
@@ -0,0 +1,110 @@
+"""Per-device cache of the resolved write characteristic (GATT handle)."""
+
+import json
+import os
+import sys
+import threading
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy GattCache]: {msg}")
+
+
+GATT_CACHE_FILE = "gatt_cache.json"
+
+
+def client_kwargs(adapter=None):
+    """BleakClient backend kwargs that let the OS reuse cached services on reconnect.
+
+    WinRT re-runs discovery unless ``use_cached_services`` is set; BlueZ keeps
+    the services of bonded/known devices in bluetoothd on its own. ``adapter``
+    (``hci1`` ...) pins the client to a local controller (BlueZ only).
+    """
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["winrt"] = {"use_cached_services": True}
+    if adapter:
+        kwargs["adapter"] = adapter
+    return kwargs
+
+
+class GattCache:
+    """Address -> ``{"handle", "uuid", "service"}`` of the write characteristic, persisted as JSON."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = {k.upper(): v for k, v in data.items() if isinstance(v, dict) and "handle" in v}
+        except (OSError, ValueError, AttributeError) as e:
+            log_event(f"Hiba a GATT cache betöltésekor ({self.path}): {e}")
+            self._entries = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2)
+        except OSError as e:
+            log_event(f"Hiba a GATT cache mentésekor ({self.path}): {e}")
+
+    def get(self, address):
+        with self._lock:
+            entry = self._entries.get(address.upper())
+            return dict(entry) if entry else None
+
+    def resolve(self, client, address, uuid):
+        """The write characteristic of a connected client (or ``None`` if the backend has no services).
+
+        The persisted handle is tried first, a UUID search is the fallback;
+        a changed handle (e.g. firmware update) is written back to the cache.
+        """
+        services = getattr(client, "services", None)
+        if services is None:
+            return None
+        uuid = uuid.lower()
+        entry = self.get(address)
+        char = None
+        if entry:
+            try:
+                char = services.get_characteristic(entry["handle"])
+            except Exception:
+                char = None
+            if char is not None and str(char.uuid).lower() != uuid:
+                char = None
+        if char is not None:
+            self.hits += 1
+            return char
+        self.misses += 1
+        char = services.get_characteristic(uuid)
+        if char is None:
+            return None
+        with self._lock:
+            self._entries[address.upper()] = {
+                "handle": char.handle,
+                "uuid": uuid,
+                "service": str(getattr(char, "service_uuid", "")),
+            }
+            self._save()
+        log_event(f"GATT cache frissítve: {address} -> handle {char.handle}")
+        return char
@@ -0,0 +1,153 @@
+"""Adaptive keep-alive scheduling that treats every successful write as liveness."""
+
+from core.clock import monotonic
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy KeepAlive]: {msg}")
+
+
+INITIAL_INTERVAL = 5.0  # a korábbi, bizonyítottan biztonságos tétlen ping időköz
+MIN_INTERVAL = 2.0
+MAX_INTERVAL = 60.0
+GROWTH_FACTOR = 1.25
+GROWTH_STREAK = 3  # ennyi sikeres tétlen periódus után növelünk
+SAFETY_MARGIN = 0.8  # a kapcsolatbontást okozó tétlen idő ennyiszerese a plafon
+SUPERVISION_GAP_RATIO = 0.5  # ennél rövidebb tétlenség utáni bontást nem tulajdonítunk a pingnek
+LEGACY_PING_INTERVAL = 5.0  # a régi ütemező tétlen felhasználónál ennyi időnként pingelt
+
+
+class _DeviceState:
+    __slots__ = (
+        "interval",
+        "ceiling",
+        "last_write",
+        "streak",
+        "pings",
+        "connected_since",
+        "connected_total",
+        "supervision_drops",
+    )
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.ceiling = None
+        self.last_write = None
+        self.streak = 0
+        self.pings = 0
+        self.connected_since = None
+        self.connected_total = 0.0
+        self.supervision_drops = 0
+
+
+class KeepAliveScheduler:
+    """Decides when a device needs a keep-alive frame.
+
+    Any successful write resets the idle timer, so pings only go out when
+    nothing else has been sent. The idle interval grows while the link stays
+    healthy and is capped just below the idle gap that preceded an observed
+    supervision-timeout disconnect.
+    """
+
+    def __init__(self, clock=monotonic, initial_interval=INITIAL_INTERVAL):
+        self._clock = clock
+        self._initial_interval = initial_interval
+        self._devices = {}
+
+    def _state(self, address):
+        key = address.upper()
+        state = self._devices.get(key)
+        if state is None:
+            state = self._devices[key] = _DeviceState(self._initial_interval)
+        return state
+
+    def interval(self, address):
+        return self._state(address).interval
+
+    def note_write(self, address, now=None):
+        """Sikeres írás (bármilyen forrásból): az eszköz életben van."""
+        self._state(address).last_write = self._clock() if now is None else now
+
+    def note_connected(self, address, now=None):
+        now = self._clock() if now is None else now
+        state = self._state(address)
+        state.last_write = now
+        state.connected_since = now
+
+    def due(self, address, now=None):
+        """True, ha a legutóbbi írás óta eltelt idő elérte a tanult időközt."""
+        now = self._clock() if now is None else now
+        state = self._state(address)
+        return state.last_write is None or now - state.last_write >= state.interval
+
+    def note_ping(self, address, now=None):
+        """Sikeres keep-alive: számlálás és óvatos időköz-növelés."""
+        now = self._clock() if now is None else now
+        state = self._state(address)
+        state.pings += 1
+        state.last_write = now
+        state.streak += 1
+        if state.streak >= GROWTH_STREAK:
+            state.streak = 0
+            limit = state.ceiling if state.ceiling is not None else MAX_INTERVAL
+            grown = min(limit, state.interval * GROWTH_FACTOR)
+            if grown > state.interval:
+                state.interval = grown
+                log_event(f"Keep-alive: időköz növelve {grown:.1f}s-ra ({address}).")
+
+    def note_disconnect(self, address, now=None):
+        """Kapcsolatbontás: ha tétlen szakaszban történt, supervision timeoutnak tekintjük."""
+        now = self._clock() if now is None else now
+        state = self._state(address)
+        state.streak = 0
+        if state.connected_since is None or state.last_write is None:
+            return  # nem volt élő kapcsolat, nincs mit tanulni
+        state.connected_total += now - state.connected_since
+        state.connected_since = None
+        idle_gap = now - state.last_write
+        if idle_gap < state.interval * SUPERVISION_GAP_RATIO:
+            return
+        state.supervision_drops += 1
+        ceiling = max(MIN_INTERVAL, idle_gap * SAFETY_MARGIN)
+        state.ceiling = ceiling if state.ceiling is None else min(state.ceiling, ceiling)
+        state.interval = max(MIN_INTERVAL, min(state.interval, state.ceiling))
+        log_event(
+            f"Keep-alive: tétlen bontás {idle_gap:.1f}s után ({address}), plafon {state.ceiling:.1f}s, "
+            f"új időköz {state.interval:.1f}s."
+        )
+
+    def report(self, address, now=None):
+        """Statisztika: elküldött és a régi ütemezéshez képest megspórolt pingek."""
+        now = self._clock() if now is None else now
+        state = self._state(address)
+        connected = state.connected_total
+        if state.connected_since is not None:
+            connected += now - state.connected_since
+        legacy = connected / LEGACY_PING_INTERVAL
+        saved = max(0.0, legacy - state.pings)
+        hours = connected / 3600.0
+        return {
+            "interval": state.interval,
+            "ceiling": state.ceiling,
+            "pings": state.pings,
+            "supervision_drops": state.supervision_drops,
+            "connected_seconds": connected,
+            "writes_saved": saved,
+            "writes_saved_per_hour": saved / hours if hours > 0 else 0.0,
+        }
+
+    def format_report(self, address, now=None):
+        r = self.report(address, now)
+        ceiling = f"{r['ceiling']:.1f}s" if r["ceiling"] is not None else "nincs"
+        return (
+            f"Keep-alive ({address}): időköz {r['interval']:.1f}s, plafon {ceiling}, "
+            f"pingek {r['pings']}, megspórolt írás/óra {r['writes_saved_per_hour']:.0f}"
+        )
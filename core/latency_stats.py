@@ -0,0 +1,109 @@
+"""Rolling latency histograms for async operations and event-loop lag."""
+
+import math
+import threading
+import time
+from collections import deque
+
+WINDOW_SECONDS = 600.0  # ennyi ideig maradnak a minták a percentilisekben
+MAX_SAMPLES = 1024
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted sequence (``None`` if empty)."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class RollingHistogram:
+    """Bounded, time-windowed sample buffer with percentile summaries."""
+
+    def __init__(self, window=WINDOW_SECONDS, max_samples=MAX_SAMPLES, clock=time.monotonic):
+        self.window = window
+        self._clock = clock
+        self._samples = deque(maxlen=max_samples)  # (időbélyeg, érték)
+        self.total_count = 0
+
+    def add(self, value, now=None):
+        now = self._clock() if now is None else now
+        self._samples.append((now, value))
+        self.total_count += 1
+
+    def _expire(self, now):
+        cutoff = now - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+    def values(self, now=None):
+        self._expire(self._clock() if now is None else now)
+        return [v for _, v in self._samples]
+
+    def summary(self, now=None):
+        """``{"count", "p50", "p95", "p99", "max"}`` over the current window."""
+        values = sorted(self.values(now))
+        result = {"count": len(values)}
+        for pct in PERCENTILES:
+            result[f"p{pct}"] = percentile(values, pct)
+        result["max"] = values[-1] if values else None
+        return result
+
+
+class LatencyRecorder:
+    """Thread-safe per-kind queue-delay/execution histograms plus loop lag."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queue = {}
+        self._exec = {}
+        self._errors = {}
+        self.loop_lag = RollingHistogram(clock=clock)
+
+    def _hist(self, table, kind):
+        hist = table.get(kind)
+        if hist is None:
+            hist = table[kind] = RollingHistogram(clock=self._clock)
+        return hist
+
+    def record(self, kind, queue_delay, exec_time, failed=False):
+        """Egy befejezett művelet időzítése (másodpercben)."""
+        with self._lock:
+            self._hist(self._queue, kind).add(max(0.0, queue_delay))
+            self._hist(self._exec, kind).add(max(0.0, exec_time))
+            if failed:
+                self._errors[kind] = self._errors.get(kind, 0) + 1
+
+    def record_loop_lag(self, lag):
+        with self._lock:
+            self.loop_lag.add(max(0.0, lag))
+
+    def kinds(self):
+        with self._lock:
+            return sorted(self._exec)
+
+    def snapshot(self):
+        """Point-in-time summary, safe to call from any thread."""
+        with self._lock:
+            kinds = {}
+            for kind, exec_hist in self._exec.items():
+                kinds[kind] = {
+                    "total": exec_hist.total_count,
+                    "errors": self._errors.get(kind, 0),
+                    "queue": self._queue[kind].summary(),
+                    "exec": exec_hist.summary(),
+                }
+            return {"kinds": kinds, "loop_lag": self.loop_lag.summary()}
+
+    def reset(self):
+        with self._lock:
+            self._queue.clear()
+            self._exec.clear()
+            self._errors.clear()
+            self.loop_lag = RollingHistogram(clock=self._clock)
+
+
+# Az alkalmazás közös mérője (AsyncHelper és a reconnect loop is ide ír)
+LATENCY = LatencyRecorder()
@@ -0,0 +1,105 @@
+# LEDapp/core/memory_utils.py
+
+import os
+import sys
+
+# Logolás (ha a reconnect_handler elérhető)
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except ImportError:
+
+        def log_event(msg):
+            print(f"[LOG - Dummy MemoryUtils]: {msg}")
+
+
+def _rss_windows(peak=False):
+    """Working set (vagy csúcs working set) méret lekérdezése a psapi-n keresztül."""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return None
+    return int(counters.PeakWorkingSetSize if peak else counters.WorkingSetSize)
+
+
+def _rss_proc():
+    """RSS kiolvasása a /proc/self/statm fájlból (Linux)."""
+    with open("/proc/self/statm", "r", encoding="ascii") as f:
+        fields = f.read().split()
+    return int(fields[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _rss_peak_rusage():
+    """Csúcs RSS a getrusage alapján (macOS és egyéb POSIX fallback)."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS bájtban, Linux kilobájtban adja vissza
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def get_rss_bytes():
+    """Return the resident set size of the current process in bytes, or None."""
+    try:
+        if sys.platform == "win32":
+            return _rss_windows()
+        if os.path.exists("/proc/self/statm"):
+            return _rss_proc()
+        return _rss_peak_rusage()
+    except Exception as e:
+        log_event(f"Hiba az RSS lekérdezésekor: {e}")
+        return None
+
+
+def get_peak_rss_bytes():
+    """Return the peak resident set size of the current process in bytes, or None."""
+    try:
+        if sys.platform == "win32":
+            return _rss_windows(peak=True)
+        peak = _rss_peak_rusage()
+        # a ru_maxrss késve követi a /proc szerinti aktuális RSS-t, a csúcs nem lehet kisebb annál
+        if os.path.exists("/proc/self/statm"):
+            peak = max(peak, _rss_proc())
+        return peak
+    except Exception as e:
+        log_event(f"Hiba a csúcs RSS lekérdezésekor: {e}")
+        return None
+
+
+def format_bytes(value):
+    """Human readable size string (``None`` -> ``"N/A"``)."""
+    if value is None:
+        return "N/A"
+    size = float(value)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def log_rss(label):
+    """Log the current RSS with a transition label and return the value."""
+    rss = get_rss_bytes()
+    log_event(f"Memória ({label}): RSS={format_bytes(rss)}")
+    return rss
@@ -0,0 +1,243 @@
+"""Connection health and throughput metrics in Prometheus text format."""
+
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy Metrics]: {msg}")
+
+
+METRICS_FILE = "metrics.prom"
+EXPORT_INTERVAL = 15.0  # másodperc
+WRITE_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+MAX_PENDING_EVENTS = 50_000  # biztonsági korlát, ha sokáig senki nem üríti a sort
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+class MetricsRegistry:
+    """Collects events from the BLE threads and aggregates them on demand.
+
+    Producers only append a tuple to a ``deque`` (atomic in CPython), so the
+    write path never takes a lock. Aggregation happens when the exporter (or a
+    caller of :meth:`render`) drains the queue under its own lock. While
+    ``enabled`` is False the producers are no-ops, so nothing piles up when
+    metrics export is switched off.
+    """
+
+    def __init__(self, clock=time.monotonic, enabled=True):
+        self._clock = clock
+        self.enabled = enabled
+        self._events = deque(maxlen=MAX_PENDING_EVENTS)
+        self._lock = threading.Lock()  # csak az aggregáló oldal használja
+        self._counters = {}
+        self._write_buckets = [0] * (len(WRITE_LATENCY_BUCKETS) + 1)
+        self._write_sum = 0.0
+        self._write_count = 0
+        self._connected_total = 0.0
+        self._connected_since = None
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """``collector()`` extra Prometheus sorokat ad a kimenethez (pl. adapterenkénti adatok)."""
+        self._collectors.append(collector)
+
+    # --- Producer oldal (bármely szálról, zár nélkül) ---
+    def write_result(self, ok, seconds=None):
+        if self.enabled:
+            self._events.append(("write", ok, seconds))
+
+    def reconnect_attempt(self, reason):
+        if self.enabled:
+            self._events.append(("count", "led_reconnect_attempts_total", (("reason", reason),)))
+
+    def rescan(self):
+        if self.enabled:
+            self._events.append(("count", "led_rescans_total", ()))
+
+    def schedule_transition(self, action):
+        if self.enabled:
+            self._events.append(("count", "led_schedule_transitions_total", (("action", action),)))
+
+    def connection_state(self, connected):
+        if self.enabled:
+            self._events.append(("link", connected, self._clock()))
+
+    # --- Aggregálás ---
+    def _drain(self):
+        events = self._events
+        while events:
+            kind, a, b = events.popleft()
+            if kind == "count":
+                key = (a, b)
+                self._counters[key] = self._counters.get(key, 0) + 1
+            elif kind == "write":
+                result = "ok" if a else "error"
+                key = ("led_writes_total", (("result", result),))
+                self._counters[key] = self._counters.get(key, 0) + 1
+                if a and b is not None:
+                    self._observe_write_latency(b)
+            elif kind == "link":
+                if a and self._connected_since is None:
+                    self._connected_since = b
+                elif not a and self._connected_since is not None:
+                    self._connected_total += b - self._connected_since
+                    self._connected_since = None
+
+    def _observe_write_latency(self, seconds):
+        self._write_sum += seconds
+        self._write_count += 1
+        for i, bound in enumerate(WRITE_LATENCY_BUCKETS):
+            if seconds <= bound:
+                self._write_buckets[i] += 1
+                return
+        self._write_buckets[-1] += 1
+
+    def snapshot(self):
+        """Aggregated values as a plain dict (counter keys are ``(name, labels)``)."""
+        with self._lock:
+            self._drain()
+            connected = self._connected_total
+            if self._connected_since is not None:
+                connected += self._clock() - self._connected_since
+            return {
+                "counters": dict(self._counters),
+                "connected": self._connected_since is not None,
+                "connected_seconds": connected,
+                "write_buckets": list(self._write_buckets),
+                "write_sum": self._write_sum,
+                "write_count": self._write_count,
+            }
+
+    def render(self):
+        """Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP led_connected Whether the LED controller is currently connected.",
+            "# TYPE led_connected gauge",
+            f"led_connected {1 if snap['connected'] else 0}",
+            "# HELP led_connected_seconds_total Time spent connected.",
+            "# TYPE led_connected_seconds_total counter",
+            f"led_connected_seconds_total {snap['connected_seconds']:.3f}",
+        ]
+        by_name = {}
+        for (name, labels), value in snap["counters"].items():
+            by_name.setdefault(name, []).append((dict(labels), value))
+        for name in sorted(by_name):
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(by_name[name], key=lambda item: sorted(item[0].items())):
+                lines.append(f"{name}{_label_text(labels)} {value}")
+
+        lines.append("# HELP led_write_latency_seconds Successful GATT write latency.")
+        lines.append("# TYPE led_write_latency_seconds histogram")
+        cumulative = 0
+        for bound, count in zip(WRITE_LATENCY_BUCKETS, snap["write_buckets"]):
+            cumulative += count
+            lines.append(f'led_write_latency_seconds_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += snap["write_buckets"][-1]
+        lines.append(f'led_write_latency_seconds_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"led_write_latency_seconds_sum {snap['write_sum']:.6f}")
+        lines.append(f"led_write_latency_seconds_count {snap['write_count']}")
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Periodically writes the registry to a ``.prom`` file, optionally serving it over HTTP."""
+
+    def __init__(self, registry, path, interval=EXPORT_INTERVAL, http_port=0):
+        self.registry = registry
+        self.path = str(path)
+        self.interval = interval
+        self.http_port = http_port
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def write_file(self):
+        """Atomikus kiírás (ideiglenes fájl + csere), hogy a gyűjtő ne lásson félkész fájlt."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.registry.render())
+        os.replace(tmp_path, self.path)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.write_file()
+            except OSError as e:
+                log_event(f"Hiba a metrikák kiírásakor ({self.path}): {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.registry.enabled = True
+        self._thread = threading.Thread(target=self._run, name="MetricsExporter", daemon=True)
+        self._thread.start()
+        if self.http_port:
+            self._start_http()
+        served = f", http://127.0.0.1:{self.http_port}/metrics" if self._server else ""
+        log_event(f"Metrika export indítva: {self.path}{served}")
+
+    def _start_http(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.http_port), Handler)
+        except OSError as e:
+            log_event(f"Metrika HTTP szerver nem indítható a {self.http_port} porton: {e}")
+            self._server = None
+            return
+        threading.Thread(target=self._server.serve_forever, name="MetricsHTTP", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        try:
+            self.write_file()
+        except OSError:
+            pass
+
+
+# Közös regiszter: a reconnect loop, a BLEController és az ütemező ide jelent.
+# Kikapcsolt export mellett nem gyűjt; a MetricsExporter.start() kapcsolja be.
+METRICS = MetricsRegistry(enabled=False)
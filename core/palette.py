@@ -0,0 +1,169 @@
+"""Indexed color palette with change notifications."""
+
+import weakref
+from typing import NamedTuple, Optional
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy Palette]: {msg}")
+
+
+def color_command(hex_code: str) -> str:
+    """Build the LED color frame for a ``#rrggbb`` (or ``rrggbb``) value."""
+    return f"7e000503{hex_code.lstrip('#').lower()}00ef"
+
+
+class PaletteEntry(NamedTuple):
+    """Immutable palette entry, unpackable as ``(name, hex, command)``."""
+
+    name: str
+    hex: str
+    command: str
+
+
+class PaletteEvent(NamedTuple):
+    """Change notification; ``kind`` is ``added``, ``removed`` or ``renamed``."""
+
+    kind: str
+    index: int
+    entry: PaletteEntry
+    previous: Optional[PaletteEntry] = None
+
+
+class PaletteRegistry:
+    """Ordered palette with O(1) lookups by name and by command payload.
+
+    Iterating or indexing the registry yields :class:`PaletteEntry` tuples in
+    display order, so it can stand in wherever the old ``COLORS`` list was used.
+    """
+
+    def __init__(self, entries=()):
+        self._entries = []
+        self._by_name = {}
+        self._index = {}
+        self._by_command = {}
+        self._listeners = []
+        for name, hex_code, command in entries:
+            self._insert(PaletteEntry(name, hex_code, command))
+
+    # --- Sequence protocol ---
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        return self._entries[index]
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    # --- Lookups ---
+    def get(self, name):
+        return self._by_name.get(name)
+
+    def index_of(self, name):
+        return self._index.get(name, -1)
+
+    def by_command(self, command):
+        names = self._by_command.get(command)
+        return self._by_name[names[0]] if names else None
+
+    def hex_for(self, name, default=None):
+        entry = self._by_name.get(name)
+        return entry.hex if entry else default
+
+    def command_for(self, name, default=None):
+        entry = self._by_name.get(name)
+        return entry.command if entry else default
+
+    def names(self):
+        return [e.name for e in self._entries]
+
+    # --- Mutations ---
+    def _insert(self, entry):
+        if entry.name in self._by_name:
+            raise ValueError(f"Már létezik ilyen nevű szín: {entry.name}")
+        self._index[entry.name] = len(self._entries)
+        self._entries.append(entry)
+        self._by_name[entry.name] = entry
+        self._by_command.setdefault(entry.command, []).append(entry.name)
+        return self._index[entry.name]
+
+    def _drop_command(self, entry):
+        names = self._by_command.get(entry.command, [])
+        if entry.name in names:
+            names.remove(entry.name)
+        if not names:
+            self._by_command.pop(entry.command, None)
+
+    def add(self, name, hex_code, command=None):
+        """Append a color and notify listeners; raises ``ValueError`` on duplicates."""
+        hex_code = f"#{hex_code.lstrip('#').lower()}"
+        entry = PaletteEntry(name, hex_code, command or color_command(hex_code))
+        index = self._insert(entry)
+        self._notify(PaletteEvent("added", index, entry))
+        return entry
+
+    def remove(self, name):
+        """Remove a color by name and notify listeners; raises ``KeyError`` if missing."""
+        entry = self._by_name.pop(name)
+        index = self._index.pop(name)
+        del self._entries[index]
+        self._drop_command(entry)
+        for i in range(index, len(self._entries)):
+            self._index[self._entries[i].name] = i
+        self._notify(PaletteEvent("removed", index, entry))
+        return entry
+
+    def rename(self, old_name, new_name):
+        """Rename a color in place, keeping its position and payload."""
+        if new_name in self._by_name:
+            raise ValueError(f"Már létezik ilyen nevű szín: {new_name}")
+        previous = self._by_name.pop(old_name)
+        index = self._index.pop(old_name)
+        entry = previous._replace(name=new_name)
+        self._entries[index] = entry
+        self._by_name[new_name] = entry
+        self._index[new_name] = index
+        self._drop_command(previous)
+        self._by_command.setdefault(entry.command, []).append(new_name)
+        self._notify(PaletteEvent("renamed", index, entry, previous))
+        return entry
+
+    # --- Notifications ---
+    def subscribe(self, listener):
+        """Register ``listener(event)``; bound methods are held weakly."""
+        if hasattr(listener, "__self__"):
+            ref = weakref.WeakMethod(listener)
+        else:
+            ref = weakref.ref(listener)
+        self._listeners.append(ref)
+
+    def unsubscribe(self, listener):
+        self._listeners = [ref for ref in self._listeners if ref() not in (None, listener)]
+
+    def _notify(self, event):
+        alive = []
+        for ref in self._listeners:
+            listener = ref()
+            if listener is None:
+                continue
+            alive.append(ref)
+            try:
+                listener(event)
+            except Exception as e:
+                log_event(f"Hiba a paletta esemény kezelésekor ({event.kind}, {event.entry.name}): {e}")
+        self._listeners = alive
@@ -0,0 +1,271 @@
+"""SQLite profile store: one row per profile and per day entry, saved one profile at a time.
+
+The database runs in WAL mode. A save rewrites only the rows of the changed
+profile, so the cost of a save does not grow with the number of profiles.
+:meth:`ProfileStore.load` reads the active profiles' schedules in one query.
+Inactive profiles get a :class:`LazySchedule` that reads its rows on first
+access. :meth:`ProfileStore.migrate` imports the old JSON data once; the
+``meta`` table records that it has run.
+"""
+
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy ProfileStore]: {msg}")
+
+
+SCHEMA_VERSION = 1
+ENTRY_FIELDS = ("color", "on_time", "off_time", "sunrise", "sunrise_offset", "sunset", "sunset_offset")
+_BOOL_FIELDS = ("sunrise", "sunset")
+_INT_FIELDS = ("sunrise_offset", "sunset_offset")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    active INTEGER NOT NULL DEFAULT 1,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    color TEXT NOT NULL DEFAULT '',
+    on_time TEXT NOT NULL DEFAULT '',
+    off_time TEXT NOT NULL DEFAULT '',
+    sunrise INTEGER NOT NULL DEFAULT 0,
+    sunrise_offset INTEGER NOT NULL DEFAULT 0,
+    sunset INTEGER NOT NULL DEFAULT 0,
+    sunset_offset INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile_id, day)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = ", ".join(ENTRY_FIELDS)
+_SELECT_ENTRIES = f"SELECT day, {_COLUMNS} FROM entries WHERE profile_id = ?"
+_UPSERT_ENTRY = (
+    f"INSERT INTO entries (profile_id, day, {_COLUMNS}) VALUES (?, ?, {', '.join('?' * len(ENTRY_FIELDS))}) "
+    f"ON CONFLICT (profile_id, day) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in ENTRY_FIELDS)}"
+)
+
+
+def _entry_row(entry):
+    """Egy nap bejegyzése az oszlopok típusaival (bool -> 0/1, offset -> int)."""
+    row = []
+    for field in ENTRY_FIELDS:
+        value = entry.get(field)
+        if field in _BOOL_FIELDS:
+            row.append(1 if value else 0)
+        elif field in _INT_FIELDS:
+            try:
+                row.append(int(value or 0))
+            except (ValueError, TypeError):
+                row.append(0)
+        else:
+            row.append(value if isinstance(value, str) else "")
+    return row
+
+
+def _entry_dict(color, on_time, off_time, sunrise, sunrise_offset, sunset, sunset_offset):
+    return {
+        "color": color,
+        "on_time": on_time,
+        "off_time": off_time,
+        "sunrise": bool(sunrise),
+        "sunrise_offset": sunrise_offset,
+        "sunset": bool(sunset),
+        "sunset_offset": sunset_offset,
+    }
+
+
+class LazySchedule(MutableMapping):
+    """Egy inaktív profil napjai; az első hozzáféréskor olvassa be őket a store-ból."""
+
+    def __init__(self, store, name, default_schedule):
+        self._store = store
+        self._name = name
+        self._default_schedule = default_schedule
+        self._data = None
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def _load(self):
+        if self._data is None:
+            self._data = self._store.load_schedule(self._name, self._default_schedule)
+        return self._data
+
+    def __getitem__(self, day):
+        return self._load()[day]
+
+    def __setitem__(self, day, entry):
+        self._load()[day] = entry
+
+    def __delitem__(self, day):
+        del self._load()[day]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def copy(self):
+        return dict(self._load())
+
+    def __repr__(self):
+        return f"LazySchedule({self._name!r}, loaded={self.loaded})"
+
+
+class ProfileStore:
+    """Profiles in SQLite (``profiles`` and ``entries`` tables); each write is its own transaction."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL-ban a NORMAL szinkronizálás is konzisztens; a commit nem vár fsync-re
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+            )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()  # az utolsó kapcsolat zárásakor a WAL visszaíródik
+                self._conn = None
+
+    def _meta(self, key):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def migrated(self):
+        with self._lock:
+            return self._meta("migrated_from") is not None
+
+    def journal_mode(self):
+        with self._lock:
+            return self._conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+    # --- Olvasás ---
+    def load(self, default_schedule):
+        """``{name: {"active", "schedule"}}`` sorrendben; inaktív profilnál a schedule :class:`LazySchedule`.
+
+        ``default_schedule`` returns a fresh ``{day: entry}`` dict that the stored rows overwrite.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT id, name, active FROM profiles ORDER BY position, id").fetchall()
+            entries = {}
+            for profile_id, day, *values in self._conn.execute(
+                f"SELECT e.profile_id, e.day, {', '.join('e.' + c for c in ENTRY_FIELDS)} "
+                "FROM entries e JOIN profiles p ON p.id = e.profile_id WHERE p.active = 1"
+            ):
+                entries.setdefault(profile_id, {})[day] = _entry_dict(*values)
+        defaults = default_schedule()
+        profiles = {}
+        for profile_id, name, active in rows:
+            if active:
+                days = entries.get(profile_id, {})
+                schedule = {day: days.get(day) or entry.copy() for day, entry in defaults.items()}
+            else:
+                schedule = LazySchedule(self, name, default_schedule)
+            profiles[name] = {"active": bool(active), "schedule": schedule}
+        return profiles
+
+    def load_schedule(self, name, default_schedule):
+        """Egy profil napjai (a hiányzó napok az alapértelmezésből)."""
+        schedule = default_schedule()
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                for day, *values in self._conn.execute(_SELECT_ENTRIES, row):
+                    schedule[day] = _entry_dict(*values)
+        return schedule
+
+    # --- Írás ---
+    def _upsert(self, name, profile, position=None):
+        conn = self._conn
+        active = 1 if profile.get("active", True) else 0
+        if position is None:
+            conn.execute(
+                "INSERT INTO profiles (name, active, position) "
+                "VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM profiles)) "
+                "ON CONFLICT (name) DO UPDATE SET active = excluded.active",
+                (name, active),
+            )
+        else:
+            conn.execute(
+                "INSERT INTO profiles (name, active, position) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET active = excluded.active, position = excluded.position",
+                (name, active, position),
+            )
+        schedule = profile.get("schedule")
+        if isinstance(schedule, LazySchedule) and not schedule.loaded:
+            return  # a napok nem változhattak, csak a profil sora íródik
+        profile_id = conn.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()[0]
+        days = list((schedule or {}).items())
+        conn.executemany(_UPSERT_ENTRY, [(profile_id, day, *_entry_row(entry)) for day, entry in days])
+        if days:
+            placeholders = ", ".join("?" * len(days))
+            conn.execute(
+                f"DELETE FROM entries WHERE profile_id = ? AND day NOT IN ({placeholders})",
+                (profile_id, *[day for day, _ in days]),
+            )
+        else:
+            conn.execute("DELETE FROM entries WHERE profile_id = ?", (profile_id,))
+
+    def upsert(self, name, profile):
+        """Egy profil mentése (új profil a lista végére kerül)."""
+        with self._lock, self._conn:
+            self._upsert(name, profile)
+
+    def delete(self, name):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM profiles WHERE name = ?", (name,))
+
+    def sync(self, profiles):
+        """Teljes szinkron egy tranzakcióban: sorrend, upsert, a hiányzók törlése."""
+        with self._lock, self._conn:
+            self._sync(profiles)
+
+    def _sync(self, profiles):
+        for position, (name, profile) in enumerate(profiles.items()):
+            self._upsert(name, profile, position)
+        existing = [row[0] for row in self._conn.execute("SELECT name FROM profiles")]
+        self._conn.executemany("DELETE FROM profiles WHERE name = ?", [(n,) for n in existing if n not in profiles])
+
+    def migrate(self, profiles, source):
+        """Egyszeri import (pl. a régi JSON fájlokból); False, ha már megtörtént.
+
+        Only profiles missing from the store are added, so profiles saved while an earlier
+        attempt was pending (unreadable source file) are kept.
+        """
+        with self._lock, self._conn:
+            if self._meta("migrated_from") is not None:
+                return False
+            existing = {row[0] for row in self._conn.execute("SELECT name FROM profiles")}
+            for name, profile in profiles.items():
+                if name not in existing:
+                    self._upsert(name, profile)
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from', ?)", (source or "",))
+        if profiles:
+            log_event(f"{len(profiles)} profil átemelve az SQLite tárolóba ({source}).")
+        return True
@@ -11,13 +11,13 @@ CHARACTERISTIC_UUID = "0000fff3-0000-1000-8000-00805f9b34fb"
 KEEP_ALIVE_COMMAND = "7e00000000000000ef"
 LOG_FILE = "led_connection_log.txt"
 CONNECT_TIMEOUT = 10.0  # gyorsabb timeout a connect hívásokhoz
-PING_INTERVAL = 20.0
-INACTIVITY_PING_THRESHOLD = 5.0
+KEEP_ALIVE_REPORT_INTERVAL = 3600.0  # a megspórolt pingek óránkénti naplózása
 RECONNECT_DELAY = 1.0
 MAX_CONNECT_ATTEMPTS = 3
 RESCAN_DELAY = 5.0
 LOOP_SLEEP = 0.5
 FAST_FIND_TIMEOUT = 3.0  # gyors cím alapú keresés ideje
+ADAPTER_WAIT_SLICE = 1.0  # kikapcsolt adapternél ennyi időnként nézzük a stop eventet
 RESCAN_TIMEOUT = 8.0  # rövidebb újrakeresési idő
 # POST_RESCAN_CONNECT_DELAY itt nincs
 
@@ -29,17 +29,36 @@ def log_event(message):
     print(entry)
 
 
-async def rescan_and_find_device(target_name):
+# A log_event definíciója után importáljuk, mert ezek a modulok innen veszik a loggert
+from core.latency_stats import LATENCY  # noqa: E402
+from core.metrics import METRICS  # noqa: E402
+from core.ble_scheduler import OperationPreempted, Priority  # noqa: E402
+from core import clock  # noqa: E402
+from core.command_trace import COMMAND_TRACE  # noqa: E402
+
+
+async def _background_scan(scheduler, label, coro):
+    """Háttérkeresés alacsony prioritással; felhasználói parancs megszakíthatja."""
+    if scheduler is None:
+        return await coro
+    async with scheduler.slot(Priority.SCAN, label, preemptible=True) as grant:
+        return await grant.run(coro)
+
+
+async def rescan_and_find_device(target_name, scheduler=None):
     """Új keresést végez és megkeresi az eszközt név alapján, címet ad vissza."""
     log_event(f"Új keresés indítása a(z) '{target_name}' nevű eszközhöz...")
     try:
-        devices = await BleakScanner.discover(timeout=RESCAN_TIMEOUT)
+        devices = await _background_scan(scheduler, "rescan", BleakScanner.discover(timeout=RESCAN_TIMEOUT))
         for device in devices:
             if device.name == target_name:
                 log_event(f"Eszköz újra megtalálva: {device.name} ({device.address})")
                 return device.address
         log_event(f"'{target_name}' nevű eszköz nem található a keresés során.")
         return None
+    except OperationPreempted:
+        log_event("Újrakeresés megszakítva egy felhasználói parancs miatt.")
+        return None
     except asyncio.CancelledError:
         log_event("Figyelmeztetés: Az eszközkeresés megszakadt (CancelledError).")
         return None
@@ -48,16 +67,21 @@ async def rescan_and_find_device(target_name):
         return None
 
 
-async def quick_find_by_address(address):
+async def quick_find_by_address(address, scheduler=None):
     """Rövid keresés egy adott címre, ha a kötés megszakadt."""
     log_event(f"Gyors címkeresés: {address}...")
     try:
-        dev = await BleakScanner.find_device_by_address(address, timeout=FAST_FIND_TIMEOUT)
+        dev = await _background_scan(
+            scheduler, "quick_find", BleakScanner.find_device_by_address(address, timeout=FAST_FIND_TIMEOUT)
+        )
         if dev:
             log_event("Eszköz megtalálva gyors kereséssel.")
             return address
         log_event("Gyors keresés nem talált eszközt.")
         return None
+    except OperationPreempted:
+        log_event("Gyors címkeresés megszakítva egy felhasználói parancs miatt.")
+        return None
     except asyncio.CancelledError:
         log_event("Gyors címkeresés megszakadt (CancelledError).")
         return None
@@ -66,6 +90,13 @@ async def quick_find_by_address(address):
         return None
 
 
+def _note_link_lost(app, address):
+    """Kapcsolatvesztés: keep-alive munkamenet vége, shadow/adapter pool/gyors író frissítése."""
+    if app.ble:
+        app.ble.keep_alive.note_disconnect(address)
+        app.ble.on_link_lost()
+
+
 # *** Függvény szignatúra bővítése a stop_eventtel ***
 async def start_ble_connection_loop(app, stop_event: threading.Event):
     # *************************************************
@@ -77,8 +108,12 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
     original_device_name = app.selected_device[0]
     current_address = app.selected_device[1]
     log_event(f"Kapcsolat figyelő indítása: '{original_device_name}' ({current_address})")
-    last_ping_time = time.time()
     connection_attempts = 0
+    reconnect_reason = "startup"  # miért kell (újra)csatlakozni, a metrikákhoz
+    last_keep_alive_report = clock.wall_time()
+    adapter_paused = False
+    if app.ble:
+        app.ble.target_address = current_address
 
     while True:
         # *** STOP EVENT ELLENŐRZÉSE A CIKLUS ELEJÉN ***
@@ -92,10 +127,27 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
 
             if not current_client or not current_client.is_connected:
                 if app.connection_status != "disconnected":
+                    if app.connection_status == "connected":
+                        reconnect_reason = "link_lost"
+                    _note_link_lost(app, current_address)
                     if hasattr(app, "connection_status_signal"):
                         app.connection_status_signal.emit("disconnected")
                     app.connection_status = "disconnected"
 
+                # Kikapcsolt/eltűnt adapter mellett nem próbálkozunk: megvárjuk a bekapcsolás eseményét
+                adapter = app.ble.adapter_monitor if app.ble else None
+                if adapter is not None and not adapter.available:
+                    if not adapter_paused:
+                        log_event("Bluetooth adapter nem elérhető, csatlakozás és keresés szüneteltetve.")
+                        adapter_paused = True
+                    await adapter.wait_available(timeout=ADAPTER_WAIT_SLICE)
+                    continue
+                if adapter_paused:
+                    log_event("Bluetooth adapter újra elérhető, azonnali újracsatlakozás.")
+                    adapter_paused = False
+                    connection_attempts = 0
+                    reconnect_reason = "adapter_resumed"
+
                 log_event(
                     f"Kapcsolat ellenőrzés: Nincs kapcsolat '{original_device_name}' ({current_address}). Próba #{connection_attempts + 1}..."
                 )
@@ -103,13 +155,15 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
                 # --- Újrakeresés logika ---
                 if connection_attempts >= MAX_CONNECT_ATTEMPTS:
                     log_event("Maximum csatlakozási kísérlet elérve, újrakeresés...")
-                    new_address = await rescan_and_find_device(original_device_name)
+                    METRICS.rescan()
+                    new_address = await rescan_and_find_device(original_device_name, app.ble.scheduler)
 
                     connection_attempts = 0
                     if new_address:
                         if new_address != current_address:
                             log_event(f"Eszköz új címen található: {new_address}")
                             current_address = new_address
+                            app.ble.retarget(current_address)
                             app.selected_device = (
                                 original_device_name,
                                 current_address,
@@ -122,6 +176,14 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
                         continue
 
                 # --- Csatlakozási kísérlet ---
+                # Ha a GUI (vagy az auto-connect) épp ugyanide csatlakozik, nem indítunk párhuzamos kísérletet;
+                # a saját kísérletünket is regisztráljuk, hogy a GUI se indítson egyet mellé
+                if not app.ble.begin_connect(current_address):
+                    log_event("Csatlakozás már folyamatban (GUI), a reconnect loop vár.")
+                    await asyncio.sleep(RECONNECT_DELAY)
+                    continue
+
+                METRICS.reconnect_attempt(reconnect_reason)
                 try:
                     if hasattr(app, "connection_status_signal"):
                         app.connection_status_signal.emit("connecting")
@@ -139,21 +201,33 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
                             log_event(f"Figyelmeztetés: Hiba a régi kliens bontásakor: {disconn_err}")
 
                     log_event(f"Új BleakClient létrehozása és hozzárendelése: {current_address}...")
-                    client = BleakClient(current_address)
+                    client = app.ble.new_client(current_address)
                     app.ble.client = client
 
                     log_event(f"Csatlakozás megkezdése: {current_address} (timeout={CONNECT_TIMEOUT}s)...")
-                    await client.connect(timeout=CONNECT_TIMEOUT)
+                    async with app.ble.scheduler.slot(Priority.KEEPALIVE, "reconnect"):
+                        await client.connect(timeout=CONNECT_TIMEOUT)
+                    app.ble.end_connect(current_address)
 
                     if hasattr(app, "connection_status_signal"):
                         app.connection_status_signal.emit("connected")
                     app.connection_status = "connected"
                     log_event(f"Sikeresen csatlakozva: '{original_device_name}' ({current_address})")
-                    last_ping_time = time.time()
+                    app.ble.on_connected(current_address)
                     connection_attempts = 0
 
+                    # A kívánt állapot visszajátszása (a pufferelt szándékkal együtt)
+                    try:
+                        await app.ble.reconcile()
+                    except Exception as replay_err:
+                        log_event(f"Figyelmeztetés: Állapot visszajátszása sikertelen: {replay_err}")
+
                 except (BleakError, asyncio.TimeoutError, asyncio.CancelledError) as e:
+                    app.ble.end_connect(current_address)
+                    if not isinstance(e, asyncio.CancelledError):
+                        app.ble.on_connect_failed(current_address)
                     log_event(f"Kapcsolódási hiba #{connection_attempts + 1} ({type(e).__name__}): {e}")
+                    reconnect_reason = "connect_error"
                     if hasattr(app, "connection_status_signal"):
                         app.connection_status_signal.emit("disconnected")
                     app.connection_status = "disconnected"
@@ -169,7 +243,7 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
 
                     # gyors címellenőrzés, hátha a hirdetés már elérhető
                     try:
-                        found = await quick_find_by_address(current_address)
+                        found = await quick_find_by_address(current_address, app.ble.scheduler)
                         if found:
                             connection_attempts = 0
                             await asyncio.sleep(RECONNECT_DELAY)
@@ -187,7 +261,10 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
                     continue
 
                 except Exception as e:
+                    app.ble.end_connect(current_address)
+                    app.ble.on_connect_failed(current_address)
                     log_event(f"Általános hiba a kapcsolatban #{connection_attempts + 1}: {e}")
+                    reconnect_reason = "error"
                     log_event(f"Traceback:\n{traceback.format_exc()}")
                     if hasattr(app, "connection_status_signal"):
                         app.connection_status_signal.emit("disconnected")
@@ -195,7 +272,7 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
                     if app.ble:
                         app.ble.client = None
                     try:
-                        found = await quick_find_by_address(current_address)
+                        found = await quick_find_by_address(current_address, app.ble.scheduler)
                         if found:
                             connection_attempts = 0
                             await asyncio.sleep(RECONNECT_DELAY)
@@ -216,35 +293,41 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
             else:  # current_client and current_client.is_connected
                 if app.connection_status != "connected":
                     log_event("Kliens csatlakozva, de app státusz nem 'connected'. Státusz frissítése.")
+                    METRICS.connection_state(True)
                     if hasattr(app, "connection_status_signal"):
                         app.connection_status_signal.emit("connected")
                     app.connection_status = "connected"
 
-                now = time.time()
-                last_input_time = app.last_user_input if hasattr(app, "last_user_input") else now
-                elapsed_since_last_ping = now - last_ping_time
-                elapsed_since_input = now - last_input_time
+                # Bármely sikeres írás élőnek számít; csak tétlen szakaszban pingelünk
+                keep_alive = app.ble.keep_alive
+                if clock.wall_time() - last_keep_alive_report >= KEEP_ALIVE_REPORT_INTERVAL:
+                    last_keep_alive_report = clock.wall_time()
+                    log_event(keep_alive.format_report(current_address))
 
-                should_ping = elapsed_since_last_ping >= PING_INTERVAL or (
-                    elapsed_since_input >= INACTIVITY_PING_THRESHOLD
-                    and elapsed_since_last_ping >= INACTIVITY_PING_THRESHOLD
-                )
-
-                if should_ping:
+                if keep_alive.due(current_address):
                     try:
                         if current_client and current_client.is_connected:
-                            await current_client.write_gatt_char(
-                                CHARACTERISTIC_UUID,
-                                bytes.fromhex(KEEP_ALIVE_COMMAND),
-                                response=False,
-                            )
-                            last_ping_time = time.time()
+                            async with app.ble.scheduler.slot(Priority.KEEPALIVE, "keep-alive") as grant:
+                                # A slotra várva közben más írás is élőnek jelölhette a linket
+                                if keep_alive.due(current_address):
+                                    issued = COMMAND_TRACE.now() if COMMAND_TRACE.enabled else None
+                                    ping_started = time.perf_counter()
+                                    await app.ble.write_keep_alive(KEEP_ALIVE_COMMAND)
+                                    ping_seconds = time.perf_counter() - ping_started
+                                    LATENCY.record("keep-alive", grant.granted - grant.requested, ping_seconds)
+                                    METRICS.write_result(True, ping_seconds)
+                                    keep_alive.note_ping(current_address)
+                                    if issued is not None:
+                                        COMMAND_TRACE.record(KEEP_ALIVE_COMMAND, "keep-alive", current_address, issued)
                             connection_attempts = 0
                         else:
                             log_event("Ping kihagyva, a kliens már nem csatlakozik (pingelés előtt ellenőrizve).")
 
                     except (BleakError, asyncio.CancelledError) as e:
                         log_event(f"Hiba ping küldésekor ({type(e).__name__}): {e}")
+                        METRICS.write_result(False)
+                        _note_link_lost(app, current_address)
+                        reconnect_reason = "ping_failed"
                         if hasattr(app, "connection_status_signal"):
                             app.connection_status_signal.emit("disconnected")
                         app.connection_status = "disconnected"
@@ -265,6 +348,9 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
                         continue
                     except Exception as e:
                         log_event(f"Általános hiba ping küldésekor: {e}")
+                        METRICS.write_result(False)
+                        _note_link_lost(app, current_address)
+                        reconnect_reason = "ping_failed"
                         log_event(f"Traceback:\n{traceback.format_exc()}")
                         if hasattr(app, "connection_status_signal"):
                             app.connection_status_signal.emit("disconnected")
@@ -294,6 +380,8 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
 
         except Exception as e:
             log_event(f"Váratlan hiba a start_ble_connection_loop fő ciklusában: {e}")
+            METRICS.connection_state(False)
+            reconnect_reason = "error"
             log_event(f"Traceback:\n{traceback.format_exc()}")
             if app.ble:
                 app.ble.client = None
@@ -328,5 +416,6 @@ async def start_ble_connection_loop(app, stop_event: threading.Event):
             log_event("Kliens bontva a loop végén.")
         except Exception as final_disconn_err:
             log_event(f"Hiba a kliens bontásakor a loop végén: {final_disconn_err}")
+    METRICS.connection_state(False)
     if app.ble:
         app.ble.client = None
@@ -0,0 +1,221 @@
+"""Minute-resolution simulation of the schedule profiles over a date range (NumPy).
+
+Evaluates the same rules as ``check_profiles`` in ``gui2_schedule_logic``:
+sunrise/sunset with offsets, overnight spans (``off <= on`` ends the next
+day) and, where intervals overlap, the one that started first wins.
+
+The grid is wall-clock time: every simulated day has 1440 minutes, DST
+changes do not shorten or lengthen a day.
+"""
+
+from datetime import date as dt_date, datetime, time as dt_time, timedelta
+
+import numpy as np
+
+from config import DAYS, PALETTE
+
+MINUTES_PER_DAY = 1440
+OFF = -1
+
+
+def sun_provider(lat, lon, tz):
+    """``sun_times(day) -> (sunrise, sunset)`` computed with suntime (without per-day logging)."""
+    import pytz
+    from suntime import Sun
+
+    sun = Sun(lat, lon)
+
+    def sun_times(day):
+        try:
+            sunrise = sun.get_sunrise_time(day, pytz.utc).astimezone(tz)
+            sunset = sun.get_sunset_time(day, pytz.utc).astimezone(tz)
+        except Exception:
+            return None, None
+        return sunrise, sunset
+
+    return sun_times
+
+
+def _clock_minutes(value):
+    try:
+        t = dt_time.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return t.hour * 60 + t.minute
+
+
+def _offset(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _edge(day_data, sun_key, offset_key, time_key):
+    """("sun", offset) | ("clock", perc) | None, mint a ``parse_day_entry`` a check_profiles-ban."""
+    if day_data.get(sun_key):
+        offset = _offset(day_data.get(offset_key, 0))
+        return None if offset is None else ("sun", offset)
+    minutes = _clock_minutes(day_data.get(time_key))
+    return None if minutes is None else ("clock", minutes)
+
+
+def _edge_minutes(edge, sun_minutes, idx):
+    kind, value = edge
+    if kind == "clock":
+        return np.full(len(idx), float(value))
+    return sun_minutes[idx] + value
+
+
+class ScheduleSimulation:
+    """Result of :func:`simulate`: the active color of every minute plus the overlap count."""
+
+    def __init__(self, start, days, colors, grid, coverage, tz=None):
+        self.start = start
+        self.days = days
+        self.colors = colors  # színnevek; a grid ezekre indexel
+        self.grid = grid  # int16 (days * 1440,), OFF = nincs aktív intervallum
+        self.coverage = coverage  # az adott percet lefedő intervallumok száma
+        self.tz = tz
+
+    def _datetime(self, minute):
+        day, minute = divmod(int(minute), MINUTES_PER_DAY)
+        naive = datetime.combine(self.start + timedelta(days=day), dt_time(minute // 60, minute % 60))
+        if self.tz is None:
+            return naive
+        if hasattr(self.tz, "localize"):
+            return self.tz.localize(naive)
+        return naive.replace(tzinfo=self.tz)
+
+    def _name(self, index):
+        return None if index == OFF else self.colors[index]
+
+    def color_at(self, when):
+        """A színnév egy időpontban (``None`` = kikapcsolva vagy a tartományon kívül)."""
+        minute = (when.date() - self.start).days * MINUTES_PER_DAY + when.hour * 60 + when.minute
+        if not 0 <= minute < len(self.grid):
+            return None
+        return self._name(self.grid[minute])
+
+    def transitions(self):
+        """``[(datetime, color name | None), ...]``: the state at the start, then every change."""
+        if not len(self.grid):
+            return []
+        changes = np.flatnonzero(self.grid[1:] != self.grid[:-1]) + 1
+        points = np.concatenate(([0], changes))
+        return [(self._datetime(m), self._name(self.grid[m])) for m in points]
+
+    def daily_on_hours(self):
+        """``{date: {color name: hours}}`` (only colors that were on that day)."""
+        per_day = self.grid.reshape(self.days, MINUTES_PER_DAY)
+        # Színenkénti percszám naponta egyetlen bincount-tal (OFF -> utolsó oszlop)
+        n = len(self.colors) + 1
+        flat = np.where(per_day == OFF, n - 1, per_day) + np.arange(self.days)[:, None] * n
+        counts = np.bincount(flat.ravel(), minlength=self.days * n).reshape(self.days, n)[:, :-1]
+        result = {}
+        for day in range(self.days):
+            result[self.start + timedelta(days=day)] = {
+                self.colors[i]: counts[day, i] / 60.0 for i in np.flatnonzero(counts[day])
+            }
+        return result
+
+    @property
+    def conflict_minutes(self):
+        """Percek, amikor legalább két aktív intervallum fedi egymást."""
+        return int((self.coverage >= 2).sum())
+
+    def daily_conflict_minutes(self):
+        per_day = (self.coverage >= 2).reshape(self.days, MINUTES_PER_DAY).sum(axis=1)
+        return {self.start + timedelta(days=day): int(per_day[day]) for day in range(self.days)}
+
+
+def simulate(profiles, start, end, sun_times=None, palette=PALETTE, tz=None):
+    """Simulates the active ``profiles`` from ``start`` up to (excluding) ``end``.
+
+    ``sun_times(day)`` returns the local ``(sunrise, sunset)`` of a date
+    (see :func:`sun_provider`); it is only needed when a profile uses them,
+    and is called once per day. Entries whose color is not in the palette
+    are skipped, like in ``check_profiles``.
+    """
+    if isinstance(start, datetime):
+        start = start.date()
+    if isinstance(end, datetime):
+        end = end.date()
+    days = max((end - start).days, 0)
+    # Az előző nap is kell: az éjfélen átnyúló intervallumok átlógnak az első napra
+    dates = [start + timedelta(days=i - 1) for i in range(days + 1)]
+    weekdays = np.array([d.weekday() for d in dates], dtype=np.int8)
+    day_base = (np.arange(days + 1, dtype=np.int64) - 1) * MINUTES_PER_DAY
+
+    specs = []  # (hétköznap, on él, off él, színnév)
+    for prof in profiles.values():
+        if not prof.get("active", False):
+            continue
+        schedule = prof.get("schedule", {})
+        for weekday, day_name in enumerate(DAYS):
+            day_data = schedule.get(day_name)
+            if not day_data:
+                continue
+            on_edge = _edge(day_data, "sunrise", "sunrise_offset", "on_time")
+            off_edge = _edge(day_data, "sunset", "sunset_offset", "off_time")
+            color = day_data.get("color", "")
+            if on_edge and off_edge and palette.command_for(color):
+                specs.append((weekday, on_edge, off_edge, color))
+
+    sunrise = sunset = np.full(days + 1, np.nan)
+    if any(on[0] == "sun" or off[0] == "sun" for _, on, off, _ in specs):
+        if sun_times is None:
+            raise ValueError("sun_times is required for sunrise/sunset entries")
+        sunrise, sunset = np.full(days + 1, np.nan), np.full(days + 1, np.nan)
+        for i, d in enumerate(dates):
+            rise, set_ = sun_times(d)
+            if rise is not None:
+                sunrise[i] = rise.hour * 60 + rise.minute
+            if set_ is not None:
+                sunset[i] = set_.hour * 60 + set_.minute
+
+    colors = []
+    color_ids = {}
+    starts, ends, ids = [], [], []
+    for weekday, on_edge, off_edge, color in specs:
+        idx = np.flatnonzero(weekdays == weekday)
+        on = _edge_minutes(on_edge, sunrise, idx)
+        off = _edge_minutes(off_edge, sunset, idx)
+        off = np.where(off <= on, off + MINUTES_PER_DAY, off)
+        valid = ~(np.isnan(on) | np.isnan(off))
+        if color not in color_ids:
+            color_ids[color] = len(colors)
+            colors.append(color)
+        starts.append(day_base[idx][valid] + on[valid].astype(np.int64))
+        ends.append(day_base[idx][valid] + off[valid].astype(np.int64))
+        ids.append(np.full(int(valid.sum()), color_ids[color], dtype=np.int16))
+
+    total = days * MINUTES_PER_DAY
+    grid = np.full(total, OFF, dtype=np.int16)
+    coverage = np.zeros(total, dtype=np.int16)
+    if starts:
+        starts, ends, ids = np.concatenate(starts), np.concatenate(ends), np.concatenate(ids)
+        lo, hi = np.clip(starts, 0, total), np.clip(ends, 0, total)
+        keep = hi > lo
+        delta = np.zeros(total + 1, dtype=np.int32)
+        np.add.at(delta, lo[keep], 1)
+        np.add.at(delta, hi[keep], -1)
+        coverage = np.cumsum(delta[:-1]).astype(np.int16)
+        # A legkorábban kezdődő intervallum nyer: késői kezdéstől visszafelé festünk,
+        # azonos kezdésnél a profilsorrendben elsőt festjük utoljára
+        order = np.lexsort((np.arange(len(starts)), starts))[::-1]
+        for i in order:
+            if keep[i]:
+                first, stop = lo[i], hi[i]
+                grid[first:stop] = ids[i]
+    return ScheduleSimulation(start, days, colors, grid, coverage, tz)
+
+
+def simulate_year(profiles, start=None, **kwargs):
+    """365/366 nap ``start``-tól (alapértelmezés: ma)."""
+    start = start or dt_date.today()
+    try:
+        end = start.replace(year=start.year + 1)
+    except ValueError:  # február 29.
+        end = start + timedelta(days=365)
+    return simulate(profiles, start, end, **kwargs)
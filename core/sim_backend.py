@@ -0,0 +1,103 @@
+"""In-process simulated BLE backend: virtual adapters and LED strips without a radio.
+
+``SimBackend.client`` has the ``BleakClient(address, adapter=...)`` call
+signature, so it can be passed to ``BLEController(client_factory=...)``.
+"""
+
+import asyncio
+
+from bleak import BleakError
+
+DEFAULT_MAX_LINKS = 7
+
+
+class SimDevice:
+    def __init__(self, address, name=None, rssi=None, failing_adapters=()):
+        self.address = address.upper()
+        self.name = name or f"SIM-{self.address[-5:].replace(':', '')}"
+        self.rssi = dict(rssi or {})  # adapter -> dBm
+        self.failing_adapters = set(failing_adapters)
+        self.frames = []  # (adapter, hex)
+
+
+class SimAdapter:
+    def __init__(self, name, max_links=DEFAULT_MAX_LINKS):
+        self.name = name
+        self.max_links = max_links
+        self.links = set()
+        self.writes = 0
+
+
+class SimBackend:
+    """Virtual adapters with a link cap and devices with per-adapter RSSI and failure injection."""
+
+    def __init__(self, adapters=("hci0",), max_links=DEFAULT_MAX_LINKS, connect_delay=0.0, write_delay=0.0):
+        self.adapters = {name: SimAdapter(name, max_links) for name in adapters}
+        self.devices = {}
+        self.connect_delay = connect_delay
+        self.write_delay = write_delay
+        self.connect_attempts = []  # (cím, adapter, siker)
+
+    def add_device(self, address, name=None, rssi=None, failing_adapters=()):
+        device = SimDevice(address, name, rssi, failing_adapters)
+        self.devices[device.address] = device
+        return device
+
+    def adapter_names(self):
+        return list(self.adapters)
+
+    def client(self, address, adapter=None, **kwargs):
+        return SimClient(self, address, adapter or next(iter(self.adapters)))
+
+    def frames(self, address):
+        return [frame for _, frame in self.devices[address.upper()].frames]
+
+    def drop_link(self, address):
+        """A kapcsolat "elvesztése" (pl. az eszköz áramtalanítása)."""
+        for adapter in self.adapters.values():
+            adapter.links.discard(address.upper())
+
+
+class SimClient:
+    def __init__(self, backend, address, adapter):
+        self._backend = backend
+        self.address = address.upper()
+        self.adapter = adapter
+        self.services = None
+
+    @property
+    def is_connected(self):
+        adapter = self._backend.adapters.get(self.adapter)
+        return adapter is not None and self.address in adapter.links
+
+    async def connect(self, timeout=None):
+        backend = self._backend
+        if backend.connect_delay:
+            await asyncio.sleep(backend.connect_delay)
+        device = backend.devices.get(self.address)
+        adapter = backend.adapters.get(self.adapter)
+        ok = (
+            device is not None
+            and adapter is not None
+            and self.adapter not in device.failing_adapters
+            and len(adapter.links) < adapter.max_links
+        )
+        backend.connect_attempts.append((self.address, self.adapter, ok))
+        if not ok:
+            raise BleakError(f"Simulated connect to {self.address} via {self.adapter} failed")
+        adapter.links.add(self.address)
+        return True
+
+    async def disconnect(self):
+        adapter = self._backend.adapters.get(self.adapter)
+        if adapter is not None:
+            adapter.links.discard(self.address)
+        return True
+
+    async def write_gatt_char(self, char_specifier, data, response=False):
+        if not self.is_connected:
+            raise BleakError("Not connected")
+        if self._backend.write_delay:
+            await asyncio.sleep(self._backend.write_delay)
+        self._backend.adapters[self.adapter].writes += 1
+        self._backend.devices[self.address].frames.append((self.adapter, bytes(data).hex()))
@@ -0,0 +1,169 @@
+"""Slow-callback detection for an asyncio loop, with the blocking stack captured mid-call.
+
+:meth:`SlowCallbackMonitor.install` wraps the loop's scheduling entry
+points (``call_soon``, ``call_soon_threadsafe``, ``call_at``, and
+``add_reader``/``add_writer`` where supported). Task steps and future
+callbacks go through these, so every callback run is timed. A sampler
+thread reads the loop thread's stack while a callback is still over the
+threshold. That stack shows the blocking line, not the task's next
+``await``.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque, namedtuple
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy SlowCallbacks]: {msg}")
+
+
+DEFAULT_THRESHOLD = 0.1  # másodperc; ennél tovább blokkoló callback lassúnak számít
+REPORT_INTERVAL = 600.0  # a legrosszabbak összesítése legfeljebb ilyen gyakran kerül a logba
+RECENT = 50
+TOP = 5
+WRAPPED_METHODS = ("call_soon", "call_soon_threadsafe", "call_at", "add_reader", "add_writer")
+
+SlowCallback = namedtuple("SlowCallback", "name duration stack")
+
+
+def callback_name(callback):
+    """Olvasható név: task lépésnél a task (ha el van nevezve) vagy a coroutine neve."""
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        name = owner.get_name()
+        if name.startswith("Task-"):  # alapértelmezett név, a coroutine többet mond
+            name = getattr(owner.get_coro(), "__qualname__", None) or name
+        return f"task {name}"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class SlowCallbackMonitor:
+    """Times every callback run by one loop; slow ones are kept per name with a stack."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, clock=time.perf_counter):
+        self.threshold = threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._current = None  # (callback, kezdés, szál) a futó callbackhez
+        self._sampled = None  # (_current, stack) a mintavevő szálról
+        self._stats = {}  # név -> [darab, összidő, max, első stack]
+        self.recent = deque(maxlen=RECENT)
+        self.total = 0
+        self._reported_total = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- A hurok oldala ---
+    def install(self, loop):
+        """Wraps ``loop``'s scheduling methods and starts the stack sampler thread."""
+        for name in WRAPPED_METHODS:
+            original = getattr(loop, name, None)
+            if original is not None:
+                setattr(loop, name, self._wrapping(original, name))
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, name="asyncio-slow-callbacks", daemon=True)
+            self._thread.start()
+
+    def _wrapping(self, original, method):
+        # call_at(when, callback, ...) - a callback a második pozícionális argumentum
+        index = 1 if method in ("call_at", "add_reader", "add_writer") else 0
+
+        def schedule(*args, **kwargs):
+            args = list(args)
+            args[index] = self._timed(args[index])
+            return original(*args, **kwargs)
+
+        return schedule
+
+    def _timed(self, callback):
+        def run(*args):
+            current = (callback, self._clock(), threading.get_ident())
+            self._current = current
+            try:
+                return callback(*args)
+            finally:
+                self._current = None
+                elapsed = self._clock() - current[1]
+                if elapsed > self.threshold:
+                    self._record(current, elapsed)
+
+        return run
+
+    def _record(self, current, elapsed):
+        sampled = self._sampled
+        stack = sampled[1] if sampled is not None and sampled[0] is current else ""
+        name = callback_name(current[0])
+        with self._lock:
+            stats = self._stats.get(name)
+            first = stats is None
+            if first:
+                stats = self._stats[name] = [0, 0.0, 0.0, stack]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            if not stats[3]:
+                stats[3] = stack
+            self.total += 1
+            self.recent.append(SlowCallback(name, elapsed, stack))
+        message = f"Lassú asyncio callback ({name}): {elapsed * 1000:.0f} ms blokkolta a hurkot."
+        if first and stack:
+            message += f" Stack:\n{stack}"  # névenként csak az első stack kerül a logba
+        log_event(message)
+
+    # --- Mintavevő szál ---
+    def _sample(self):
+        poll = max(self.threshold / 2, 0.005)
+        next_report = self._clock() + REPORT_INTERVAL
+        while not self._stop.wait(poll):
+            current = self._current
+            if current is not None and (self._sampled is None or self._sampled[0] is not current):
+                if self._clock() - current[1] > self.threshold:
+                    frame = sys._current_frames().get(current[2])
+                    if frame is not None:
+                        self._sampled = (current, "".join(traceback.format_stack(frame)))
+            if self._clock() >= next_report:
+                next_report = self._clock() + REPORT_INTERVAL
+                self.log_report()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    # --- Lekérdezés ---
+    def top(self, count=TOP):
+        """A legtöbb összidőt blokkoló callbackek: ``[{"name", "count", "total", "max", "stack"}]``."""
+        with self._lock:
+            items = [
+                {"name": name, "count": s[0], "total": s[1], "max": s[2], "stack": s[3]}
+                for name, s in self._stats.items()
+            ]
+        items.sort(key=lambda item: item["total"], reverse=True)
+        return items[:count]
+
+    def snapshot(self):
+        return {"threshold": self.threshold, "total": self.total, "top": self.top()}
+
+    def format_report(self):
+        parts = [f"{s['name']} ({s['count']}x, max {s['max'] * 1000:.0f} ms)" for s in self.top()]
+        return "Leglassabb asyncio callbackek: " + (", ".join(parts) if parts else "nincs")
+
+    def log_report(self):
+        """Összesítés a logba, ha az előző óta volt új lassú callback."""
+        if self.total != self._reported_total:
+            self._reported_total = self.total
+            log_event(self.format_report())
@@ -0,0 +1,157 @@
+"""Watchdog for the GUI thread: notices event-loop stalls and captures the blocked stack.
+
+The GUI calls :meth:`StallWatchdog.beat` from a periodic timer (every
+``heartbeat`` seconds). A background thread checks how long ago the last
+beat was. Once the gap exceeds the heartbeat plus ``threshold``, it logs
+the monitored thread's current stack, which is where the freeze is. When
+beats resume, the stall duration goes into the histograms.
+"""
+
+import sys
+import threading
+import traceback
+from collections import deque, namedtuple
+
+from core.clock import monotonic, wall_time
+from core.latency_stats import RollingHistogram
+from core.metrics import METRICS
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy StallWatchdog]: {msg}")
+
+
+HEARTBEAT_INTERVAL = 0.05  # a GUI időzítő periódusa (s)
+DEFAULT_THRESHOLD = 0.25  # ennél hosszabb kiesés akadásnak számít
+STALL_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STACK_HISTORY = 20
+
+Stall = namedtuple("Stall", "started duration stack")  # started: fali idő
+
+
+class StallWatchdog:
+    """Heartbeat-based stall detector for one thread (by default the one calling :meth:`start`)."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, heartbeat=HEARTBEAT_INTERVAL, clock=monotonic):
+        self.threshold = threshold
+        self.heartbeat = heartbeat
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_beat = clock()
+        self._pending = None  # (utolsó beat ideje, fali idő, stack) a folyamatban lévő akadáshoz
+        self._thread_id = None
+        self._thread = None
+        self._stop = threading.Event()
+        self.histogram = RollingHistogram(clock=clock)
+        self.buckets = [0] * (len(STALL_BUCKETS) + 1)
+        self.stall_sum = 0.0
+        self.stalls = deque(maxlen=STACK_HISTORY)
+        self.total_stalls = 0
+
+    def beat(self, now=None):
+        """A figyelt szál szívverése; egy lezáruló akadás időtartamát rögzíti."""
+        now = self._clock() if now is None else now
+        with self._lock:
+            gap = now - self._last_beat - self.heartbeat
+            self._last_beat = now
+            pending, self._pending = self._pending, None
+            if gap <= self.threshold:
+                return None
+            stall = Stall(pending[1] if pending else wall_time() - gap, gap, pending[2] if pending else "")
+            self._record(stall)
+        log_event(f"GUI szál akadás vége: {gap * 1000:.0f} ms.")
+        return stall
+
+    def _record(self, stall):
+        self.histogram.add(stall.duration)
+        self.stall_sum += stall.duration
+        self.total_stalls += 1
+        for i, bound in enumerate(STALL_BUCKETS):
+            if stall.duration <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.stalls.append(stall)
+
+    def check(self, now=None):
+        """Egy watchdog kör: akadás elején a figyelt szál stackjét menti; True, ha most kezdődött."""
+        now = self._clock() if now is None else now
+        with self._lock:
+            stalled_for = now - self._last_beat - self.heartbeat
+            if self._pending is not None or stalled_for <= self.threshold:
+                return False
+            stack = self._capture_stack()
+            self._pending = (self._last_beat, wall_time() - stalled_for, stack)
+        log_event(f"GUI szál blokkolva több mint {stalled_for * 1000:.0f} ms óta, a fő szál stackje:\n{stack}")
+        return True
+
+    def _capture_stack(self):
+        frame = sys._current_frames().get(self._thread_id) if self._thread_id is not None else None
+        return "".join(traceback.format_stack(frame)) if frame is not None else ""
+
+    def start(self, thread_id=None):
+        """Figyelés indítása; ``thread_id`` nélkül a hívó szálat figyeli."""
+        if self._thread is not None:
+            return
+        self._thread_id = thread_id or threading.get_ident()
+        with self._lock:
+            self._last_beat = self._clock()
+            self._pending = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gui-stall-watchdog", daemon=True)
+        self._thread.start()
+        log_event(f"GUI akadásfigyelő elindítva (küszöb: {self.threshold * 1000:.0f} ms).")
+
+    def _run(self):
+        poll = max(self.threshold / 4, 0.01)
+        while not self._stop.wait(poll):
+            try:
+                self.check()
+            except Exception as e:
+                log_event(f"Hiba az akadásfigyelőben: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def snapshot(self):
+        """``{"total", "window": RollingHistogram summary, "last": Stall or None}``."""
+        with self._lock:
+            return {
+                "total": self.total_stalls,
+                "window": self.histogram.summary(),
+                "last": self.stalls[-1] if self.stalls else None,
+            }
+
+    def metric_lines(self):
+        """Prometheus sorok (a MetricsRegistry collectoraként)."""
+        with self._lock:
+            buckets, total, stall_sum = list(self.buckets), self.total_stalls, self.stall_sum
+        lines = [
+            "# HELP led_gui_stall_seconds GUI thread stalls longer than the watchdog threshold.",
+            "# TYPE led_gui_stall_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(STALL_BUCKETS, buckets):
+            cumulative += count
+            lines.append(f'led_gui_stall_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'led_gui_stall_seconds_bucket{{le="+Inf"}} {total}')
+        lines.append(f"led_gui_stall_seconds_sum {stall_sum:.6f}")
+        lines.append(f"led_gui_stall_seconds_count {total}")
+        return lines
+
+
+# Az alkalmazás GUI szál figyelője (a főablak indítja, ha a beállítás engedi)
+STALL_WATCHDOG = StallWatchdog()
+METRICS.add_collector(STALL_WATCHDOG.metric_lines)
@@ -0,0 +1,107 @@
+"""Lightweight click-to-light trace spans exported as Chrome trace-event JSON."""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+MAX_EVENTS = 100_000
+
+# Az éppen futó (asyncio task-hoz vagy szálhoz kötött) span
+_current_span = contextvars.ContextVar("led_trace_span", default=None)
+
+
+def now_us():
+    return time.perf_counter_ns() // 1000
+
+
+class Span:
+    """One timed section of a trace; finished spans become ``X`` events."""
+
+    __slots__ = ("tracer", "name", "trace_id", "start_us", "args", "tid")
+
+    def __init__(self, tracer, name, trace_id, args, start_us=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.start_us = now_us() if start_us is None else start_us
+        self.args = args
+        self.tid = threading.get_ident()
+
+    def child(self, name, start_us=None, **args):
+        return Span(self.tracer, name, self.trace_id, args, start_us)
+
+    def end(self, **args):
+        if args:
+            self.args.update(args)
+        self.tracer._emit(self, now_us())
+
+
+class Tracer:
+    """Collects spans in memory while ``enabled``.
+
+    Instrumented code checks ``TRACER.enabled`` (or a ``None`` span) before
+    doing any work, so a disabled tracer costs a single branch per call site.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self._events = deque(maxlen=max_events)
+        self._ids = itertools.count(1)
+        self._pid = os.getpid()
+
+    def start_trace(self, name, **args):
+        """Új trace gyökér span-je, vagy ``None``, ha a tracer ki van kapcsolva."""
+        if not self.enabled:
+            return None
+        return Span(self, name, next(self._ids), args)
+
+    def _emit(self, span, end_us):
+        # deque.append szálbiztos, nem kell külön zár
+        self._events.append(
+            {
+                "name": span.name,
+                "cat": "led",
+                "ph": "X",
+                "ts": span.start_us,
+                "dur": max(0, end_us - span.start_us),
+                "pid": self._pid,
+                "tid": span.tid,
+                "args": dict(span.args, trace_id=span.trace_id),
+            }
+        )
+
+    def clear(self):
+        self._events.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+    def chrome_trace(self):
+        """The collected spans as a Chrome trace-event document (dict)."""
+        return {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path):
+        """Kiírja a trace-t JSON-ba (chrome://tracing / Perfetto betölthető)."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return len(self._events)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def set_current_span(span):
+    """Span beállítása az aktuális kontextusban; a visszaadott tokennel állítható vissza."""
+    return _current_span.set(span)
+
+
+def reset_current_span(token):
+    _current_span.reset(token)
+
+
+TRACER = Tracer()
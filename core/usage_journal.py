@@ -0,0 +1,275 @@
+"""Append-only binary journal of effective LED state changes, with NumPy usage aggregation.
+
+Each record is a fixed-width 24 byte struct (see ``RECORD``) written with a
+single ``O_APPEND`` write, so the file stays readable while the app runs and
+a crash can at most leave a torn last record, which is dropped on the next
+open. Reading memory-maps the file as a NumPy structured array.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+from datetime import datetime, time as dt_time, timedelta
+
+from core.clock import wall_time
+from core.device_shadow import COLOR_PREFIX, UNKNOWN_STATE
+
+# Logolás importálása
+try:
+    from .reconnect_handler import log_event
+except ImportError:
+    try:
+        from core.reconnect_handler import log_event
+    except Exception:
+
+        def log_event(msg):
+            """Fallback logger if imports fail."""
+            print(f"[LOG - Dummy UsageJournal]: {msg}")
+
+
+USAGE_JOURNAL_FILE = "usage_journal.bin"
+MAGIC = b"LEDJRNL1"
+# időbélyeg (unix s), eszköz, szín (RGB), power, fényerő, ok (+1 bájt kitöltés)
+RECORD = struct.Struct("<dQIbbBx")
+RECORD_FIELDS = [
+    ("ts", "<f8"),
+    ("device", "<u8"),
+    ("color", "<u4"),
+    ("power", "i1"),
+    ("brightness", "i1"),
+    ("cause", "u1"),
+    ("pad", "u1"),
+]
+CAUSES = ("other", "user", "schedule", "replay", "unknown")  # "unknown": kapcsolatvesztés vagy kilépés
+NO_COLOR = 0xFFFFFFFF
+UNKNOWN = -1
+
+
+def device_id(address):
+    """64 bites eszközazonosító: MAC címnél maga a cím, egyébként (macOS UUID) egy hash."""
+    address = address.upper()
+    digits = address.replace(":", "")
+    if len(digits) == 12:
+        try:
+            return int(digits, 16)
+        except ValueError:
+            pass
+    return int.from_bytes(hashlib.blake2b(address.encode(), digest_size=8).digest(), "little") | (1 << 63)
+
+
+def color_rgb(frame):
+    if frame and frame.lower().startswith(COLOR_PREFIX):
+        start = len(COLOR_PREFIX)
+        end = start + 6
+        return int(frame[start:end], 16)
+    return NO_COLOR
+
+
+def color_frame(rgb):
+    return f"{COLOR_PREFIX}{int(rgb):06x}00ef"
+
+
+def _tri(value):
+    return UNKNOWN if value is None else int(value)
+
+
+class UsageJournal:
+    """Writer side; ``record`` is a no-op until :meth:`open` is called (the app opens it at startup)."""
+
+    def __init__(self, path=None, clock=wall_time):
+        self.path = str(path) if path else None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._fd = None
+        self.records = 0
+
+    @property
+    def enabled(self):
+        return self._fd is not None
+
+    def open(self, path=None):
+        """Opens (creates) the journal for appending; False if the file is not a journal."""
+        path = str(path or self.path)
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        with self._lock:
+            if self._fd is not None:
+                return True
+            try:
+                size = os.path.getsize(path) if os.path.exists(path) else 0
+                if size:
+                    with open(path, "rb") as f:
+                        if f.read(len(MAGIC)) != MAGIC:
+                            log_event(f"Használati napló: ismeretlen fájlformátum, nem írjuk ({path}).")
+                            return False
+                    torn = (size - len(MAGIC)) % RECORD.size
+                    if torn:
+                        os.truncate(path, size - torn)
+                        log_event(f"Használati napló: csonka utolsó rekord eldobva ({torn} bájt).")
+                self._fd = os.open(path, flags, 0o644)
+                if not size:
+                    os.write(self._fd, MAGIC)
+            except OSError as e:
+                log_event(f"Hiba a használati napló megnyitásakor ({path}): {e}")
+                self._fd = None
+                return False
+            self.path = path
+            return True
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def record(self, address, state, cause="user", when=None):
+        """Egy tényleges állapotváltozás (``DeviceState``) rögzítése."""
+        if self._fd is None or not address:
+            return False
+        cause_code = CAUSES.index(cause) if cause in CAUSES else 0
+        data = RECORD.pack(
+            self._clock() if when is None else when,
+            device_id(address),
+            color_rgb(state.color),
+            _tri(state.power),
+            _tri(state.brightness),
+            cause_code,
+        )
+        with self._lock:
+            if self._fd is None:
+                return False
+            try:
+                os.write(self._fd, data)
+            except OSError as e:
+                log_event(f"Hiba a használati napló írásakor: {e}")
+                return False
+            self.records += 1
+        return True
+
+    def mark_unknown(self, address, when=None):
+        """Innentől ismeretlen állapot (kapcsolatvesztés, kilépés); a riport itt abbahagyja a számolást."""
+        return self.record(address, UNKNOWN_STATE, "unknown", when)
+
+
+def load(path):
+    """A napló rekordjai NumPy struktúrált tömbként (memóriába leképezve, csak olvasásra)."""
+    import numpy as np
+
+    dtype = np.dtype(RECORD_FIELDS)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    count = max(size - len(MAGIC), 0) // RECORD.size
+    if not count:
+        return np.zeros(0, dtype=dtype)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a usage journal: {path}")
+    return np.memmap(path, dtype=dtype, mode="r", offset=len(MAGIC), shape=(count,))
+
+
+class UsageReport:
+    """Aggregations over journal records (``load()`` output) by local calendar day.
+
+    A state holds from its record until the device's next record (the last
+    one until ``until``, default: now). An "unknown" record (link loss, app
+    exit) ends the previous state and is not counted as a state change.
+    ``tz`` is a pytz/zoneinfo zone; by default the system's local time is used.
+    """
+
+    def __init__(self, records, tz=None, until=None):
+        import numpy as np
+
+        self._np = np
+        order = np.argsort(records["ts"], kind="stable")
+        self.records = records[order]
+        self.tz = tz
+        self.until = wall_time() if until is None else until
+
+    def _date(self, ts):
+        return datetime.fromtimestamp(ts, self.tz).date()
+
+    def _midnight(self, day):
+        naive = datetime.combine(day, dt_time())
+        if self.tz is None:
+            return naive.timestamp()
+        if hasattr(self.tz, "localize"):
+            return self.tz.localize(naive).timestamp()
+        return naive.replace(tzinfo=self.tz).timestamp()
+
+    def _days(self, end_ts):
+        """(napok, éjfél időbélyegek napok+1 határral) a rekordok első napjától."""
+        np = self._np
+        first, last = self._date(float(self.records["ts"][0])), self._date(end_ts)
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        edges = np.array([self._midnight(d) for d in days] + [self._midnight(last + timedelta(days=1))])
+        return days, edges
+
+    def _device_mask(self, device):
+        if device is None:
+            return self._np.ones(len(self.records), dtype=bool)
+        return self.records["device"] == device_id(device)
+
+    def on_time_per_day(self, device=None):
+        """``{date: {color frame: seconds on}}``; with ``device=None`` summed over all devices."""
+        np = self._np
+        if not len(self.records):
+            return {}
+        days, edges = self._days(max(self.until, float(self.records["ts"][-1])))
+        totals = {}
+        mask = self._device_mask(device)
+        for dev in np.unique(self.records["device"][mask]):
+            recs = self.records[self.records["device"] == dev]
+            starts = recs["ts"]
+            ends = np.append(starts[1:], max(self.until, starts[-1]))
+            lengths = ends - starts
+            on = (recs["power"] == 1) & (recs["color"] != NO_COLOR)
+            # Napi bontás: F(t) = a t-ig összegyűlt bekapcsolt idő, napi érték = F(éjfél_k+1) - F(éjfél_k)
+            j = np.searchsorted(starts, edges, side="right") - 1
+            jc = np.clip(j, 0, None)
+            partial = np.clip(edges - starts[jc], 0, lengths[jc])
+            for rgb in np.unique(recs["color"][on]):
+                seg = on & (recs["color"] == rgb)
+                cum = np.concatenate(([0.0], np.cumsum(np.where(seg, lengths, 0.0))))
+                upto = np.where(j >= 0, cum[jc] + np.where(seg[jc], partial, 0.0), 0.0)
+                per_day = np.diff(upto)
+                key = color_frame(rgb)
+                for i in np.flatnonzero(per_day > 0):
+                    day = totals.setdefault(days[i], {})
+                    day[key] = day.get(key, 0.0) + float(per_day[i])
+        return totals
+
+    def cause_counts_per_day(self, device=None):
+        """``{date: {cause: state changes}}``."""
+        np = self._np
+        recs = self.records[self._device_mask(device) & (self.records["cause"] != CAUSES.index("unknown"))]
+        if not len(recs):
+            return {}
+        days, edges = self._days(float(recs["ts"][-1]))
+        day_idx = np.searchsorted(edges, recs["ts"], side="right") - 1
+        counts = np.zeros((len(days), len(CAUSES)), dtype=np.int64)
+        np.add.at(counts, (day_idx, recs["cause"].astype(np.int64)), 1)
+        return {
+            days[i]: {CAUSES[c]: int(counts[i, c]) for c in np.flatnonzero(counts[i])}
+            for i in np.flatnonzero(counts.sum(axis=1))
+        }
+
+    def manual_overrides_per_day(self):
+        """``{date: n}``: user changes made while the device was in a schedule-set state."""
+        np = self._np
+        if not len(self.records):
+            return {}
+        order = np.lexsort((self.records["ts"], self.records["device"]))
+        recs = self.records[order]
+        same_device = recs["device"][1:] == recs["device"][:-1]
+        user_after_schedule = (
+            same_device & (recs["cause"][1:] == CAUSES.index("user")) & (recs["cause"][:-1] == CAUSES.index("schedule"))
+        )
+        hits = recs["ts"][1:][user_after_schedule]
+        if not len(hits):
+            return {}
+        days, edges = self._days(float(hits.max()))
+        counts = np.bincount(np.searchsorted(edges, hits, side="right") - 1, minlength=len(days))
+        return {days[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+
+# Az alkalmazás naplója (a főablak nyitja meg a BASE_DIR alatt)
+USAGE_JOURNAL = UsageJournal()
@@ -0,0 +1,104 @@
+"""Warm-start auto-connect: adapter readiness probing instead of fixed sleeps."""
+
+import asyncio
+import time
+
+from bleak import BleakScanner
+
+from core import clock
+from core.ble_scheduler import Priority
+from core.reconnect_handler import log_event, quick_find_by_address
+
+ADAPTER_PROBE_TIMEOUT = 5.0  # legfeljebb ennyit várunk, hogy a Bluetooth adapter elérhető legyen
+ADAPTER_PROBE_INTERVAL = 0.1
+WARM_CONNECT_ATTEMPTS = 3
+WARM_RETRY_DELAY = 0.3  # a sikertelen kísérletek közt fut a célzott keresés
+
+
+class StartupTimer:
+    """Milestones (ms since process start) for the startup report; each stage is kept once."""
+
+    def __init__(self, clock=time.perf_counter, origin=None):
+        self._clock = clock
+        self.origin = clock() if origin is None else origin
+        self.stages = {}
+
+    def mark(self, stage):
+        """Rögzíti a szakaszt; True, ha most először."""
+        if stage in self.stages:
+            return False
+        self.stages[stage] = (self._clock() - self.origin) * 1000.0
+        return True
+
+    def format_report(self):
+        parts = [f"{stage} {ms:.0f} ms" for stage, ms in sorted(self.stages.items(), key=lambda item: item[1])]
+        return "Indítási idők: " + (", ".join(parts) if parts else "nincs adat")
+
+
+# A main.py korán importálja, így az origó nagyjából a folyamat indulása
+STARTUP = StartupTimer()
+
+
+def note_first_command():
+    """A BLEController első sikeres írásakor hívódik: time-to-first-command naplózása."""
+    if STARTUP.mark("first_command"):
+        log_event(STARTUP.format_report())
+
+
+async def _probe_once():
+    scanner = BleakScanner()
+    await scanner.start()
+    await scanner.stop()
+
+
+async def wait_for_adapter(ble, timeout=ADAPTER_PROBE_TIMEOUT, interval=ADAPTER_PROBE_INTERVAL):
+    """Waits until the adapter accepts a scan, instead of sleeping a fixed time.
+
+    Returns True once the adapter is ready. Returns False on timeout, or on an
+    error that does not mean "Bluetooth is off"; the connect attempt then
+    reports the real problem.
+    """
+    monitor = ble.adapter_monitor
+    if monitor.powered is not None:
+        # Eseményforrás (BlueZ) mellett nem kell próbálgatni, elég a bekapcsolásra várni
+        ready = await monitor.wait_available(timeout)
+        if ready:
+            STARTUP.mark("adapter_ready")
+        return ready
+    deadline = clock.monotonic() + timeout
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            async with ble.scheduler.slot(Priority.SCAN, "adapter-probe"):
+                await _probe_once()
+            STARTUP.mark("adapter_ready")
+            log_event(f"Bluetooth adapter kész ({attempts}. próba).")
+            return True
+        except Exception as e:
+            if not ble._is_bluetooth_off_error(e):
+                log_event(f"Adapter próba hiba ({type(e).__name__}): {e}, csatlakozás próbálása így is.")
+                return False
+            if clock.monotonic() >= deadline:
+                log_event(f"Bluetooth adapter {timeout:.0f}s után sem elérhető.")
+                return False
+        await asyncio.sleep(interval)
+
+
+async def warm_connect(ble, address):
+    """Connects to the persisted address right away, with a targeted scan alongside.
+
+    The scan is preemptible: it only gets the adapter while a connect attempt
+    backs off, and refreshes the OS device cache for the next attempt.
+    """
+    scan = asyncio.ensure_future(quick_find_by_address(address, ble.scheduler))
+    try:
+        connected = await ble.connect_with_retry(address, attempts=WARM_CONNECT_ATTEMPTS, delay=WARM_RETRY_DELAY)
+    finally:
+        if not scan.done():
+            scan.cancel()
+        await asyncio.gather(scan, return_exceptions=True)
+    if connected:
+        STARTUP.mark("connected")
+        log_event(STARTUP.format_report())
+    return connected
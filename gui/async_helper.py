@@ -2,11 +2,16 @@
 
 import asyncio
 import threading
+import time
 import traceback
 from concurrent.futures import Future
 
 from PySide6.QtCore import Signal
 
+from core.latency_stats import LATENCY
+from core.slow_callbacks import DEFAULT_THRESHOLD as SLOW_CALLBACK_THRESHOLD, SlowCallbackMonitor
+from core.tracing import now_us, reset_current_span, set_current_span
+
 # Logolás importálása
 try:
     from core.reconnect_handler import log_event
@@ -21,18 +26,30 @@ except ImportError:
             print(f"[LOG - Dummy AsyncHelper]: {msg}")
 
 
+LOOP_LAG_PROBE_INTERVAL = 0.5  # másodperc
+
+
 class AsyncHelper:
     """Segédosztály az aszinkron műveletek kezelésére."""
 
-    def __init__(self, app_instance):
+    def __init__(self, app_instance, slow_callback_threshold=SLOW_CALLBACK_THRESHOLD):
         """
         Inicializálás.
 
         Args:
             app_instance: A fő LEDApp_BaseWindow példány.
+            slow_callback_threshold: Ennél (mp) tovább blokkoló callbackek rögzítése; 0/None = ki.
         """
         self.app = app_instance  # Referencia a fő alkalmazásra
         self.loop = asyncio.new_event_loop()
+        self.latency = LATENCY
+        self.slow_callbacks = None
+        if slow_callback_threshold:
+            self.slow_callbacks = SlowCallbackMonitor(slow_callback_threshold)
+            self.slow_callbacks.install(self.loop)
+        self._inflight = {}  # kulcs -> futó Future (single-flight / latest-wins)
+        self._inflight_lock = threading.Lock()
+        self.loop.call_soon_threadsafe(lambda: self.loop.create_task(self._loop_lag_probe()))
         self.event_loop_thread = threading.Thread(target=self._run_dedicated_asyncio_loop, daemon=True)
         self.event_loop_thread.start()
 
@@ -81,9 +98,67 @@ class AsyncHelper:
                     log_event(f"RuntimeError during final sleep before loop close: {e}")
             log_event("Closing asyncio event loop.")
             self.loop.close()
+            if self.slow_callbacks is not None:
+                self.slow_callbacks.stop()
+                self.slow_callbacks.log_report()
             log_event("Asyncio event loop thread finished.")
 
-    def run_async_task(self, coro, callback_success_signal=None, callback_error_signal=None):
+    async def _loop_lag_probe(self):
+        """Méri, mennyit késik az eseményhurok egy időzített ébredéshez képest."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_PROBE_INTERVAL)
+            self.latency.record_loop_lag(time.perf_counter() - started - LOOP_LAG_PROBE_INTERVAL)
+
+    async def _timed(self, coro, kind, submitted, trace=None, submitted_us=0):
+        """A coroutine várakozási és futási idejének rögzítése (és trace span-jei)."""
+        started = time.perf_counter()
+        # A task neve a tényleges coroutine (a lassú callback riportban ez látszik, nem a _timed)
+        asyncio.current_task().set_name(f"{kind}:{getattr(coro, '__qualname__', type(coro).__name__)}")
+        if trace is not None:
+            trace.child("async.queue", start_us=submitted_us).end()
+            exec_span = trace.child(f"async.{kind}")
+            token = set_current_span(exec_span)
+        failed = True
+        try:
+            result = await coro
+            failed = False
+            return result
+        finally:
+            self.latency.record(kind, started - submitted, time.perf_counter() - started, failed=failed)
+            if trace is not None:
+                exec_span.end(failed=failed)
+                reset_current_span(token)
+
+    def latency_snapshot(self):
+        """Az eddigi mérések összesítése (lásd ``LatencyRecorder.snapshot``)."""
+        return self.latency.snapshot()
+
+    def slow_callback_snapshot(self):
+        """A hurkot blokkoló leglassabb callbackek (lásd ``SlowCallbackMonitor.snapshot``), vagy None."""
+        return self.slow_callbacks.snapshot() if self.slow_callbacks is not None else None
+
+    def in_flight(self, key):
+        """True, ha a kulcshoz tartozó task még fut."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            return future is not None and not future.done()
+
+    def _forget(self, key, future):
+        with self._inflight_lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def run_async_task(
+        self,
+        coro,
+        callback_success_signal=None,
+        callback_error_signal=None,
+        kind="other",
+        trace=None,
+        key=None,
+        policy="join",
+    ):
         """
         Futtat egy coroutine-t és signalokat bocsát ki az eredménnyel/hibával.
 
@@ -91,6 +166,12 @@ class AsyncHelper:
             coro: A futtatandó asyncio coroutine.
             callback_success_signal: A sikeres végrehajtáskor kibocsátandó Signal objektum.
             callback_error_signal: Hiba esetén kibocsátandó Signal objektum.
+            kind: A művelet típusa a késleltetés-statisztikához (scan, connect, write, ...).
+            trace: Opcionális ``core.tracing.Span``, amely alá a várakozás és a futás kerül;
+                a helper zárja le, amikor a Future befejeződik (nem a beküldéskor).
+            key: Ha meg van adva, egy kulcshoz egyszerre legfeljebb egy task fut.
+            policy: ``"join"`` - a futó taskhoz csatlakozik (az új coroutine nem indul el);
+                ``"latest"`` - a futó taskot megszakítja és az újat indítja.
 
         Returns:
             A Future objektum, vagy None, ha a hurok nem fut.
@@ -102,11 +183,72 @@ class AsyncHelper:
                 callback_error_signal.emit(error_msg)
             else:
                 log_event(f"HIBA: Nem található vagy nem Signal a megadott error callback: {callback_error_signal}")
+            if trace is not None:
+                trace.end(failed=True)
             return None
 
-        future: Future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        done_callback = self._make_done_callback(callback_success_signal, callback_error_signal)
+        if key is None:
+            future = self._submit(coro, kind, trace)
+            self._end_trace_when_done(future, trace)
+            future.add_done_callback(done_callback)
+            return future
+
+        # A zár alatt csak a táblát módosítjuk: a cancel()/add_done_callback() szinkronban
+        # lefuttathatja a _forget callbacket, ami ugyanezt a zárat kérné
+        superseded = None
+        with self._inflight_lock:
+            existing = self._inflight.get(key)
+            if existing is not None and not existing.done() and policy == "join":
+                joined = existing
+            else:
+                joined = None
+                superseded = existing if existing is not None and not existing.done() else None
+                future = self._submit(coro, kind, trace)
+                self._inflight[key] = future
+        if joined is not None:
+            coro.close()
+            log_event(f"AsyncHelper: '{key}' már folyamatban, csatlakozás a futó taskhoz.")
+            self._end_trace_when_done(joined, trace)
+            joined.add_done_callback(done_callback)
+            return joined
+        if superseded is not None:
+            log_event(f"AsyncHelper: '{key}' felülírva, a korábbi task megszakítása.")
+            superseded.cancel()
+        future.add_done_callback(lambda f: self._forget(key, f))
+        self._end_trace_when_done(future, trace)
+        future.add_done_callback(done_callback)
+        return future
+
+    def _submit(self, coro, kind, trace):
+        submitted_us = now_us() if trace is not None else 0
+        future: Future = asyncio.run_coroutine_threadsafe(
+            self._timed(coro, kind, time.perf_counter(), trace, submitted_us), self.loop
+        )
+        return future
+
+    @staticmethod
+    def _end_trace_when_done(future, trace):
+        """A gyökér span a Future befejeződésekor zárul, így a teljes kattintás-írás időt fedi."""
+        if trace is None:
+            return
+
+        def end_trace(f):
+            if f.cancelled():
+                trace.end(cancelled=True)
+            else:
+                trace.end(failed=f.exception() is not None)
+
+        future.add_done_callback(end_trace)
+
+    @staticmethod
+    def _make_done_callback(callback_success_signal, callback_error_signal):
+        """A Future eredményét a megadott signalokra továbbító callback."""
 
         def done_callback(f):
+            if f.cancelled():
+                log_event("Asyncio task cancelled.")
+                return
             try:
                 result = f.result()
                 log_event(f"AsyncHelper: Task successful. Result type: {type(result)}, Value: {result}")
@@ -137,8 +279,7 @@ class AsyncHelper:
                 # else: # Ezt a logot kikommentezhetjük, ha zavaró
                 #    log_event(f"HIBA: Nem található vagy nem Signal a megadott error callback: {callback_error_signal}")
 
-        future.add_done_callback(done_callback)
-        return future
+        return done_callback
 
     def stop_loop(self):
         """Leállítja az asyncio eseményhurkot."""
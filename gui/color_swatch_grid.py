@@ -0,0 +1,176 @@
+from PySide6.QtWidgets import QWidget, QSizePolicy, QToolTip
+from PySide6.QtCore import Qt, Signal, QRect, QSize, QEvent
+from PySide6.QtGui import QColor, QFont, QPainter, QPen
+
+# Logolás importálása, ha kell
+try:
+    from core.reconnect_handler import log_event
+except ImportError:
+    # Dummy logger
+    def log_event(msg):
+        print(f"[LOG - Dummy ColorSwatchGrid]: {msg}")
+
+
+def contrasting_text_color(color: QColor) -> QColor:
+    """Fekete vagy fehér szöveg a háttér érzékelt fényereje alapján."""
+    brightness = (color.red() * 299 + color.green() * 587 + color.blue() * 114) / 1000
+    return QColor("white") if brightness < 128 else QColor("black")
+
+
+def shade(color: QColor, amount: int) -> QColor:
+    """Világosabb/sötétebb árnyalat (komponensenként ``amount``-tal eltolva)."""
+    return QColor(
+        max(0, min(255, color.red() + amount)),
+        max(0, min(255, color.green() + amount)),
+        max(0, min(255, color.blue() + amount)),
+    )
+
+
+class ColorSwatchGrid(QWidget):
+    """Single custom-painted widget drawing every palette color as a clickable swatch.
+
+    Replaces the per-color ``QPushButton`` + stylesheet grid: swatches are
+    painted straight from palette data and clicks are hit-tested here.
+    """
+
+    colorClicked = Signal(str)  # a kiválasztott szín parancsa
+
+    CELL_WIDTH = 100
+    CELL_HEIGHT = 40
+    SPACING = 5
+    PRESSED_SHADE = -30
+
+    def __init__(self, palette, columns=4, parent=None):
+        super().__init__(parent)
+        self._palette = palette
+        self._columns = max(1, columns)
+        self._cells = []  # (entry, fill, text, pressed) a paletta sorrendjében
+        self._pressed_index = -1
+        self._border_pen = QPen(QColor("#555555"))
+        self.setFont(QFont("Arial", 12))
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.rebuild()
+        palette.subscribe(self._on_palette_event)
+
+    # --- Adatok ---
+    def _make_cell(self, entry):
+        fill = QColor(entry.hex)
+        if not fill.isValid():
+            log_event(f"Érvénytelen szín a palettán ({entry.name}: {entry.hex}), fehér használata.")
+            fill = QColor("white")
+        return (entry, fill, contrasting_text_color(fill), shade(fill, self.PRESSED_SHADE))
+
+    def rebuild(self):
+        """Az összes cella újraszámítása a paletta alapján."""
+        self._cells = [self._make_cell(entry) for entry in self._palette]
+        self._pressed_index = -1
+        self.updateGeometry()
+        self.update()
+
+    def detach(self):
+        """Leiratkozik a paletta eseményekről."""
+        self._palette.unsubscribe(self._on_palette_event)
+
+    def _on_palette_event(self, event):
+        if event.kind == "added":
+            self._cells.insert(event.index, self._make_cell(event.entry))
+            self.updateGeometry()
+            self._update_from(event.index)
+        elif event.kind == "removed":
+            del self._cells[event.index]
+            self._pressed_index = -1
+            self.updateGeometry()
+            self._update_from(event.index)
+        elif event.kind == "renamed":
+            self._cells[event.index] = self._make_cell(event.entry)
+            self.update(self.cell_rect(event.index))
+
+    def _update_from(self, index):
+        """Az ``index``-től kezdődő (eltolódott) cellák újrarajzolása."""
+        first_row = index // self._columns
+        top = first_row * (self.CELL_HEIGHT + self.SPACING)
+        self.update(QRect(0, top, self.width(), max(0, self.height() - top)))
+
+    # --- Geometria ---
+    def sizeHint(self):
+        count = len(self._cells)
+        cols = min(self._columns, count) if count else 0
+        rows = (count + self._columns - 1) // self._columns
+        width = cols * self.CELL_WIDTH + max(0, cols - 1) * self.SPACING
+        height = rows * self.CELL_HEIGHT + max(0, rows - 1) * self.SPACING
+        return QSize(width, height)
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def cell_rect(self, index):
+        row, col = divmod(index, self._columns)
+        return QRect(
+            col * (self.CELL_WIDTH + self.SPACING),
+            row * (self.CELL_HEIGHT + self.SPACING),
+            self.CELL_WIDTH,
+            self.CELL_HEIGHT,
+        )
+
+    def index_at(self, pos):
+        """A ponton lévő cella indexe, vagy -1 (térköz vagy üres terület)."""
+        x, y = pos.x(), pos.y()
+        if x < 0 or y < 0:
+            return -1
+        col, x_in = divmod(x, self.CELL_WIDTH + self.SPACING)
+        row, y_in = divmod(y, self.CELL_HEIGHT + self.SPACING)
+        if col >= self._columns or x_in >= self.CELL_WIDTH or y_in >= self.CELL_HEIGHT:
+            return -1
+        index = row * self._columns + col
+        return index if index < len(self._cells) else -1
+
+    # --- Rajzolás és események ---
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        dirty = event.rect()
+        row_pitch = self.CELL_HEIGHT + self.SPACING
+        first = max(0, dirty.top() // row_pitch) * self._columns
+        last = min(len(self._cells), (dirty.bottom() // row_pitch + 1) * self._columns)
+        for index in range(first, last):
+            rect = self.cell_rect(index)
+            if not rect.intersects(dirty):
+                continue
+            entry, fill, text, pressed = self._cells[index]
+            painter.setPen(self._border_pen)
+            painter.setBrush(pressed if index == self._pressed_index else fill)
+            painter.drawRoundedRect(rect.adjusted(0, 0, -1, -1), 3, 3)
+            painter.setPen(text)
+            label = painter.fontMetrics().elidedText(entry.name, Qt.TextElideMode.ElideRight, rect.width() - 8)
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, label)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton:
+            super().mousePressEvent(event)
+            return
+        self._pressed_index = self.index_at(event.position().toPoint())
+        if self._pressed_index >= 0:
+            self.update(self.cell_rect(self._pressed_index))
+
+    def mouseReleaseEvent(self, event):
+        pressed = self._pressed_index
+        if pressed < 0 or event.button() != Qt.MouseButton.LeftButton:
+            super().mouseReleaseEvent(event)
+            return
+        self._pressed_index = -1
+        self.update(self.cell_rect(pressed))
+        if self.index_at(event.position().toPoint()) == pressed:
+            self.colorClicked.emit(self._cells[pressed][0].command)
+
+    def event(self, event):
+        if event.type() == QEvent.Type.ToolTip:
+            index = self.index_at(event.pos())
+            if index >= 0:
+                QToolTip.showText(event.globalPos(), self._cells[index][0].name, self)
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
@@ -8,6 +8,7 @@ from PySide6.QtWidgets import (
     QListWidgetItem,
     QColorDialog,
     QLineEdit,
+    QMessageBox,
 )
 from PySide6.QtGui import QColor
 
@@ -59,7 +60,11 @@ class CustomColorDialog(QDialog):
         name = self.name_edit.text().strip()
         if not name:
             return
-        add_custom_color(name, self.selected_hex)
+        try:
+            add_custom_color(name, self.selected_hex)
+        except ValueError as e:
+            QMessageBox.warning(self, "Hiba", str(e))
+            return
         self.name_edit.clear()
         self.refresh_list()
 
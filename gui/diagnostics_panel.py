@@ -0,0 +1,145 @@
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QCheckBox,
+    QFileDialog,
+    QMessageBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+from PySide6.QtCore import Qt, QTimer
+
+from core.latency_stats import LATENCY
+from core.stall_watchdog import STALL_WATCHDOG
+from core.tracing import TRACER
+
+REFRESH_INTERVAL_MS = 1000
+COLUMNS = (
+    "Művelet",
+    "Darab",
+    "Hiba",
+    "Várakozás p50",
+    "p95",
+    "p99",
+    "Futás p50",
+    "p95",
+    "p99",
+)
+
+
+def format_ms(seconds):
+    """Másodperc -> ``12.3 ms`` (vagy ``-``, ha nincs minta)."""
+    return "-" if seconds is None else f"{seconds * 1000:.1f} ms"
+
+
+class DiagnosticsPanel(QDialog):
+    """Non-modal window listing queue/execution percentiles per operation kind."""
+
+    def __init__(self, recorder=LATENCY, tracer=TRACER, watchdog=STALL_WATCHDOG, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnosztika")
+        self.recorder = recorder
+        self.tracer = tracer
+        self.watchdog = watchdog
+        self.resize(760, 300)
+
+        layout = QVBoxLayout(self)
+        self.lag_label = QLabel()
+        layout.addWidget(self.lag_label)
+        self.stall_label = QLabel()
+        layout.addWidget(self.stall_label)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table)
+
+        btn_layout = QHBoxLayout()
+        reset_btn = QPushButton("Nullázás")
+        reset_btn.clicked.connect(self.reset_stats)
+        close_btn = QPushButton("Bezárás")
+        close_btn.clicked.connect(self.close)
+        self.trace_checkbox = QCheckBox("Trace rögzítése")
+        self.trace_checkbox.setChecked(self.tracer.enabled)
+        self.trace_checkbox.toggled.connect(self.set_tracing)
+        export_btn = QPushButton("Trace mentése...")
+        export_btn.clicked.connect(self.export_trace)
+        btn_layout.addWidget(reset_btn)
+        btn_layout.addWidget(self.trace_checkbox)
+        btn_layout.addWidget(export_btn)
+        btn_layout.addStretch(1)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def reset_stats(self):
+        self.recorder.reset()
+        self.refresh()
+
+    def set_tracing(self, enabled):
+        self.tracer.enabled = enabled
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Trace mentése", "led_trace.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            count = self.tracer.export_chrome(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Hiba", f"A trace nem menthető:\n{e}")
+            return
+        QMessageBox.information(self, "Trace mentve", f"{count} span mentve ide:\n{path}")
+
+    def refresh(self):
+        snapshot = self.recorder.snapshot()
+        lag = snapshot["loop_lag"]
+        self.lag_label.setText(
+            f"Eseményhurok késés: p50 {format_ms(lag['p50'])}, p95 {format_ms(lag['p95'])}, "
+            f"p99 {format_ms(lag['p99'])}, max {format_ms(lag['max'])}"
+        )
+        stalls = self.watchdog.snapshot()
+        window = stalls["window"]
+        self.stall_label.setText(
+            f"GUI szál akadások: {stalls['total']} összesen, {window['count']} az utóbbi 10 percben "
+            f"(p95 {format_ms(window['p95'])}, max {format_ms(window['max'])})"
+        )
+
+        kinds = sorted(snapshot["kinds"].items())
+        self.table.setRowCount(len(kinds))
+        for row, (kind, stats) in enumerate(kinds):
+            queue, execution = stats["queue"], stats["exec"]
+            values = [
+                kind,
+                str(queue["count"]),
+                str(stats["errors"]),
+                format_ms(queue["p50"]),
+                format_ms(queue["p95"]),
+                format_ms(queue["p99"]),
+                format_ms(execution["p50"]),
+                format_ms(execution["p95"]),
+                format_ms(execution["p99"]),
+            ]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, col, item)
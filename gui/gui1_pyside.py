@@ -16,6 +16,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Slot
 from PySide6.QtGui import QFont
 
+from core.ble_controller import connect_key
+
 # Logolás importálása
 try:
     from core.reconnect_handler import log_event
@@ -139,6 +141,8 @@ class GUI1_Widget(QWidget):
             self.main_app.ble.scan(),
             self.main_app.scan_results_signal,
             self.main_app.scan_error_signal,
+            kind="scan",
+            key="scan",
         )
 
     @Slot(object)
@@ -187,6 +191,8 @@ class GUI1_Widget(QWidget):
             self.main_app.ble.connect_with_retry(address),
             self.main_app.connect_results_signal,
             self.main_app.connect_error_signal,
+            kind="connect",
+            key=connect_key(address),
         )
 
     @Slot(bool)
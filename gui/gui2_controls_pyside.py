@@ -6,17 +6,18 @@ from PySide6.QtWidgets import (
     QPushButton,
     QHBoxLayout,
     QVBoxLayout,
-    QGridLayout,
     QSizePolicy,
     QLabel,
     QSlider,
     QColorDialog,
 )
 from PySide6.QtCore import Qt, Slot
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtGui import QFont
 
-from config import COLORS  # Importáljuk a színeket
+from config import PALETTE  # Importáljuk a színeket
 import core.config_manager as config_manager
+from gui.color_swatch_grid import ColorSwatchGrid
+from core.tracing import TRACER
 
 # Logolás importálása, ha kell
 try:
@@ -37,11 +38,9 @@ class GUI2_ControlsWidget(QWidget):
         main_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.setSpacing(20)
 
-        # --- Színes Gombok Rácsa ---
-        self.color_grid_widget = QWidget()
-        self.color_grid_layout = QGridLayout(self.color_grid_widget)
-        self.color_grid_layout.setSpacing(5)
-        self.build_color_buttons()
+        # --- Színes Gombok Rácsa (egyetlen, sajátrajzolású widget) ---
+        self.color_grid_widget = ColorSwatchGrid(PALETTE, columns=4)
+        self.color_grid_widget.colorClicked.connect(self.send_color_command)
         main_layout.addWidget(self.color_grid_widget, 0, Qt.AlignmentFlag.AlignTop)
 
         # --- Ki/Bekapcsoló Gombok ---
@@ -54,7 +53,7 @@ class GUI2_ControlsWidget(QWidget):
         self.power_off_btn.setFont(font_power)
         self.power_off_btn.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
         self.power_off_btn.setMinimumSize(100, 40)
-        self.power_off_btn.clicked.connect(self.turn_off_led)
+        self.power_off_btn.clicked.connect(lambda: self.turn_off_led())
         power_layout.addWidget(self.power_off_btn)
 
         self.power_on_btn = QPushButton("Bekapcsol")
@@ -85,59 +84,13 @@ class GUI2_ControlsWidget(QWidget):
 
         self.update_power_buttons()
 
-    def get_contrasting_text_color(self, bg_hex):
-        try:
-            color = QColor(bg_hex)
-            brightness = (color.red() * 299 + color.green() * 587 + color.blue() * 114) / 1000
-            return "white" if brightness < 128 else "black"
-        except Exception as e:
-            log_event(f"Hiba a kontraszt szín számításakor ({bg_hex}): {e}")
-            return "black"
-
-    def adjust_color(self, hex_color, amount):
-        try:
-            color = QColor(hex_color)
-            r = max(0, min(255, color.red() + amount))
-            g = max(0, min(255, color.green() + amount))
-            b = max(0, min(255, color.blue() + amount))
-            return f"#{r:02x}{g:02x}{b:02x}"
-        except Exception as e:
-            log_event(f"Hiba a szín igazításakor ({hex_color}): {e}")
-            return hex_color
-
     def build_color_buttons(self):
-        while self.color_grid_layout.count():
-            item = self.color_grid_layout.takeAt(0)
-            w = item.widget()
-            if w:
-                w.deleteLater()
-
-        colors_per_row = 4
-        for i, (name, tk_color, hex_code) in enumerate(COLORS):
-            row = i // colors_per_row
-            col = i % colors_per_row
-            btn = QPushButton(name)
-            font = QFont("Arial", 12)
-            btn.setFont(font)
-            btn.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
-            btn.setMinimumSize(100, 40)
-            btn.setStyleSheet(
-                f"""
-                QPushButton {{
-                    background-color: {tk_color};
-                    color: {self.get_contrasting_text_color(tk_color)};
-                    border: 1px solid #555;
-                    border-radius: 3px;
-                }}
-                QPushButton:pressed {{
-                    background-color: {self.adjust_color(tk_color, -30)};
-                }}
-            """
-            )
-            btn.clicked.connect(lambda checked=False, h=hex_code: self.send_color_command(h))
-            self.color_grid_layout.addWidget(btn, row, col)
-        total_rows = (len(COLORS) + colors_per_row - 1) // colors_per_row
-        self.color_grid_layout.setRowStretch(total_rows, 0)
+        """Újraépíti a színrácsot a teljes paletta alapján."""
+        self.color_grid_widget.rebuild()
+
+    def detach_palette(self):
+        """Leiratkozik a paletta eseményekről (widget lebontásakor)."""
+        self.color_grid_widget.detach()
 
     def pick_custom_color(self):
         """Megnyit egy színválasztó párbeszédablakot és elküldi a kiválasztott színt."""
@@ -146,42 +99,59 @@ class GUI2_ControlsWidget(QWidget):
             hex_code = f"7e000503{color.red():02x}{color.green():02x}{color.blue():02x}00ef"
             self.send_color_command(hex_code)
 
-    def send_color_command(self, hex_code):
-        """Elküldi a színváltás parancsot."""
+    def send_color_command(self, hex_code, cause="user"):
+        """Elküldi a színváltás parancsot (``cause``: user vagy schedule)."""
+        span = TRACER.start_trace("ui.send_color_command", color=hex_code)
         self.main_app.last_user_input = time.time()
         self.main_app.last_color_hex = hex_code
         self.main_app.is_led_on = True
         self.update_power_buttons()
         # Aszinkron parancsküldés a helperen keresztül, a command_error_signal-t használva
         self.main_app.async_helper.run_async_task(
-            self.main_app.ble.send_command(hex_code),
+            self.main_app.ble.apply_state(power=True, color=hex_code, cause=cause),
             callback_error_signal=self.main_app.command_error_signal,  # Signal objektum átadása
+            kind="write",
+            trace=span,
+            key="led-power",
+            policy="latest",
         )
 
-    def turn_off_led(self):
-        """Elküldi a kikapcsolás parancsot."""
+    def turn_off_led(self, cause="user"):
+        """Elküldi a kikapcsolás parancsot (``cause``: user vagy schedule)."""
+        span = TRACER.start_trace("ui.turn_off_led")
         self.main_app.last_user_input = time.time()
         self.main_app.is_led_on = False
         self.update_power_buttons()
         # Aszinkron parancsküldés a helperen keresztül, a command_error_signal-t használva
         self.main_app.async_helper.run_async_task(
-            self.main_app.ble.send_command("7e00050300000000ef"),
+            self.main_app.ble.apply_state(power=False, cause=cause),
             callback_error_signal=self.main_app.command_error_signal,  # Signal objektum átadása
+            kind="write",
+            trace=span,
+            key="led-power",
+            policy="latest",
         )
 
     def turn_on_led(self):
         """Elküldi a bekapcsolás parancsot (utolsó színnel)."""
+        span = TRACER.start_trace("ui.turn_on_led")
         self.main_app.last_user_input = time.time()
         if self.main_app.last_color_hex:
             self.main_app.is_led_on = True
             self.update_power_buttons()
             # Aszinkron parancsküldés a helperen keresztül, a command_error_signal-t használva
             self.main_app.async_helper.run_async_task(
-                self.main_app.ble.send_command(self.main_app.last_color_hex),
+                self.main_app.ble.apply_state(power=True, color=self.main_app.last_color_hex),
                 callback_error_signal=self.main_app.command_error_signal,  # Signal objektum átadása
+                kind="write",
+                trace=span,
+                key="led-power",
+                policy="latest",
             )
         else:
             log_event("Figyelmeztetés: Nincs utoljára használt szín a bekapcsoláshoz.")
+            if span is not None:
+                span.end()
 
     def update_power_buttons(self):
         """Frissíti a ki/bekapcsoló gombok állapotát és stílusát."""
@@ -207,10 +177,13 @@ class GUI2_ControlsWidget(QWidget):
     @Slot(int)
     def change_brightness(self, value: int):
         """Fényerő módosítása a csúszkáról."""
-        hex_val = f"{max(0, min(100, value)):02x}"
-        cmd = f"7e0001{hex_val}00000000ef"
+        span = TRACER.start_trace("ui.change_brightness", value=value)
         self.main_app.async_helper.run_async_task(
-            self.main_app.ble.send_command(cmd),
+            self.main_app.ble.apply_state(brightness=value),
             callback_error_signal=self.main_app.command_error_signal,
+            kind="write",
+            trace=span,
+            key="led-brightness",
+            policy="latest",
         )
         config_manager.set_setting("brightness_level", value)
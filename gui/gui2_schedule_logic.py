@@ -9,9 +9,13 @@ import pytz
 from PySide6.QtWidgets import QMessageBox
 
 # Importáljuk a szükséges konfigurációs és backend/core elemeket
-from config import COLORS, DAYS, CONFIG_FILE, PROFILES_FILE
+from config import COLORS, PALETTE, DAYS, CONFIG_FILE, PROFILES_FILE, PROFILES_DB
 from core.sun_logic import DAYS_HU, get_local_sun_info as _core_get_local_sun_info
 from core.location_utils import get_sun_times  # noqa: F401
+from core.metrics import METRICS
+from core.file_io import FILE_IO
+from core.profile_store import ProfileStore
+from core import clock
 
 # --- Időzóna Definíció ---
 # Biztosítjuk, hogy a LOCAL_TZ létezzen
@@ -57,73 +61,131 @@ def get_default_schedule():
     }
 
 
-def load_profiles_from_file(main_app):
-    """Betölti az ütemezési profilokat."""
+_STORE = None
+
+
+def _profile_store():
+    """A PROFILES_DB tároló (megnyitja, ha még nincs nyitva vagy az útvonal változott); hiba esetén None."""
+    global _STORE
+    if _STORE is not None and _STORE.path == PROFILES_DB:
+        return _STORE
+    close_profile_store()
+    try:
+        _STORE = ProfileStore(PROFILES_DB)
+    except Exception as e:
+        print(f"Hiba a profil adatbázis megnyitásakor: {e}")
+    return _STORE
+
+
+def close_profile_store():
+    """Lezárja a profil adatbázist (kilépéskor; a következő hozzáférés újra megnyitja)."""
+    global _STORE
+    if _STORE is not None:
+        _STORE.close()
+        _STORE = None
+
+
+def _merge_schedule(loaded, default_schedule):
+    """A beolvasott napokat az alapértelmezésre fésüli (hibás típusú értékek helyett az alapérték marad)."""
+    merged = {}
+    for day in DAYS:
+        d = default_schedule[day].copy()
+        if day in loaded and isinstance(loaded[day], dict):
+            for key in d:
+                if key in loaded[day]:
+                    val = loaded[day][key]
+                    if key.endswith("_offset"):
+                        try:
+                            d[key] = int(val)
+                        except (ValueError, TypeError):
+                            d[key] = 0
+                    elif isinstance(val, type(d[key])):
+                        d[key] = val
+        merged[day] = d
+    return merged
+
+
+def _load_json_profiles():
+    """A régi JSON fájlok profiljai: (profilok, forrásfájl, hibátlan).
+
+    ``hibátlan`` False, ha egy létező fájl nem olvasható; ilyenkor a migráció nem zárható le.
+    """
     default_schedule = get_default_schedule()
+    complete = True
 
     if os.path.exists(PROFILES_FILE):
         try:
-            with open(PROFILES_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            profiles = {}
-            for name, prof in data.items():
-                active = bool(prof.get("active", True))
-                sched = prof.get("schedule", {})
-                merged = {}
-                for day in DAYS:
-                    d = default_schedule[day].copy()
-                    if day in sched and isinstance(sched[day], dict):
-                        for key in d:
-                            if key in sched[day]:
-                                val = sched[day][key]
-                                if key.endswith("_offset"):
-                                    try:
-                                        d[key] = int(val)
-                                    except (ValueError, TypeError):
-                                        d[key] = 0
-                                elif isinstance(val, type(d[key])):
-                                    d[key] = val
-                    merged[day] = d
-                profiles[name] = {"active": active, "schedule": merged}
-
+            data = FILE_IO.load_json(PROFILES_FILE)  # egy függő mentés után olvas
+            profiles = {
+                name: {
+                    "active": bool(prof.get("active", True)),
+                    "schedule": _merge_schedule(prof.get("schedule", {}), default_schedule),
+                }
+                for name, prof in data.items()
+            }
             if profiles:
-                main_app.profiles = profiles
-                return
+                return profiles, PROFILES_FILE, True
         except Exception as e:
             print(f"Hiba a profilok betöltésekor: {e}")
+            complete = False
 
     # Visszafelé kompatibilitás: régi egyprofilos fájl
-    single_schedule = default_schedule.copy()
     if os.path.exists(CONFIG_FILE):
         try:
             with open(CONFIG_FILE, "r", encoding="utf-8") as f:
                 loaded = json.load(f)
-            for day in DAYS:
-                d = single_schedule[day].copy()
-                if day in loaded and isinstance(loaded[day], dict):
-                    for key in d:
-                        if key in loaded[day]:
-                            val = loaded[day][key]
-                            if key.endswith("_offset"):
-                                try:
-                                    d[key] = int(val)
-                                except (ValueError, TypeError):
-                                    d[key] = 0
-                            elif isinstance(val, type(d[key])):
-                                d[key] = val
-                single_schedule[day] = d
+            schedule = _merge_schedule(loaded, default_schedule)
+            return {"Alapértelmezett": {"active": True, "schedule": schedule}}, CONFIG_FILE, complete
         except Exception as e:
             print(f"Hiba a régi ütemezés betöltésekor: {e}")
+            complete = False
+    return {}, "", complete
 
-    main_app.profiles = {"Alapértelmezett": {"active": True, "schedule": single_schedule}}
 
+def load_profiles_from_file(main_app):
+    """Betölti az ütemezési profilokat.
 
-def _save_profiles_to_file(main_app):
-    """Segédfüggvény a profilok mentéséhez."""
+    A profilok az SQLite tárolóból jönnek; az első indításkor a régi JSON fájlok (profilfájl, ennek
+    hiányában a régi egyprofilos ütemezés) egyszer átkerülnek oda. Ha egy régi fájl nem olvasható, a
+    migráció nem zárul le: a fájl megmarad, és a következő indítás újra megpróbálja. Az inaktív
+    profilok napjai csak az első hozzáféréskor töltődnek be.
+    """
+    store = _profile_store()
+    profiles = {}
+    if store is None:
+        profiles, _, _ = _load_json_profiles()  # adatbázis nélkül a régi fájlokból
+    else:
+        try:
+            pending = {}
+            if not store.migrated:
+                pending, source, complete = _load_json_profiles()
+                if complete:
+                    store.migrate(pending, source)
+                else:
+                    print("A régi profilfájl nem olvasható; az átemelést a következő indítás újra megpróbálja.")
+            profiles = store.load(get_default_schedule) or pending
+        except Exception as e:
+            print(f"Hiba a profilok betöltésekor: {e}")
+
+    main_app.profiles = profiles or {"Alapértelmezett": {"active": True, "schedule": get_default_schedule()}}
+
+
+def _save_profiles_to_file(main_app, name=None):
+    """Segédfüggvény a profilok mentéséhez.
+
+    ``name`` megadásakor csak az adott profil sorai íródnak (ha már nincs a profilok között, törlődik),
+    különben az összes profil egy tranzakcióban. True, ha a mentés sikerült.
+    """
+    store = _profile_store()
     try:
-        with open(PROFILES_FILE, "w", encoding="utf-8") as f:
-            json.dump(main_app.profiles, f, ensure_ascii=False, indent=4)
+        if store is None:
+            return FILE_IO.save_json(PROFILES_FILE, main_app.profiles)
+        if name is None:
+            store.sync(main_app.profiles)
+        elif name in main_app.profiles:
+            store.upsert(name, main_app.profiles[name])
+        else:
+            store.delete(name)
         return True
     except Exception as e:
         print(f"Hiba a profilok mentésekor: {e}")
@@ -185,6 +247,14 @@ def check_profile_conflicts(main_app, target_name):
     return conflicts
 
 
+def simulate_schedule(main_app, start, end):
+    """Az aktív profilok percre pontos szimulációja [start, end) között (lásd core.schedule_sim)."""
+    from core.schedule_sim import simulate, sun_provider
+
+    sun_times = sun_provider(main_app.latitude, main_app.longitude, LOCAL_TZ)
+    return simulate(main_app.profiles, start, end, sun_times=sun_times, palette=PALETTE, tz=LOCAL_TZ)
+
+
 def get_profile_day_intervals(main_app, profile_name):
     """Return schedule intervals in minutes for drawing a timeline."""
 
@@ -194,7 +264,7 @@ def get_profile_day_intervals(main_app, profile_name):
 
     result = {}
     schedule = profile.get("schedule", {})
-    today = datetime.now(LOCAL_TZ).date()
+    today = clock.now(LOCAL_TZ).date()
     today_idx = today.weekday()
 
     for idx, day in enumerate(DAYS):
@@ -241,7 +311,7 @@ def get_profile_day_intervals(main_app, profile_name):
             end_min = off_dt.hour * 60 + off_dt.minute
 
             color_name = data.get("color", "")
-            color_hex = next((c[1] for c in COLORS if c[0] == color_name), "#ffffff")
+            color_hex = PALETTE.hex_for(color_name, "#ffffff")
 
             if end_min > 24 * 60:
                 intervals.append((start_min, 24 * 60, color_hex))
@@ -337,7 +407,7 @@ def save_profile(gui_widget):
             return
 
         gui_widget.main_app.profiles[profile_name]["schedule"] = schedule_to_save
-        if _save_profiles_to_file(gui_widget.main_app):
+        if _save_profiles_to_file(gui_widget.main_app, profile_name):
             QMessageBox.information(gui_widget, "Mentés sikeres", "Az ütemezés sikeresen elmentve.")
             gui_widget.main_app.schedule = schedule_to_save
             gui_widget.unsaved_changes = False
@@ -349,7 +419,7 @@ def save_profile(gui_widget):
 
 def check_profiles(gui_widget):
     """Aktív ütemezési profilok ellenőrzése és LED vezérlése."""
-    now_local = datetime.now(LOCAL_TZ)
+    now_local = clock.now(LOCAL_TZ)
     today_date = now_local.date()
     today_name_hu = DAYS_HU.get(now_local.strftime("%A"), now_local.strftime("%A"))
 
@@ -428,7 +498,7 @@ def check_profiles(gui_widget):
 
                 schedule_entries_found = True
                 target_color_name = day_data.get("color", "")
-                target_color_hex = next((c[2] for c in COLORS if c[0] == target_color_name), None)
+                target_color_hex = PALETTE.command_for(target_color_name)
                 if not target_color_hex:
                     continue
 
@@ -444,10 +514,12 @@ def check_profiles(gui_widget):
         if desired_hex:
             if not main_app.is_led_on or main_app.last_color_hex != desired_hex:
                 if gui_widget.controls_widget:
-                    gui_widget.controls_widget.send_color_command(desired_hex)
+                    METRICS.schedule_transition("color")
+                    gui_widget.controls_widget.send_color_command(desired_hex, cause="schedule")
         else:
             if schedule_entries_found and main_app.is_led_on and gui_widget.controls_widget:
-                gui_widget.controls_widget.turn_off_led()
+                METRICS.schedule_transition("off")
+                gui_widget.controls_widget.turn_off_led(cause="schedule")
 
     except Exception as e:
         print(f"Váratlan hiba a profilok ellenőrzésekor: {e}")
@@ -1,6 +1,5 @@
 # LEDapp/gui/gui2_schedule_pyside.py (Visszaállított kinézettel)
 
-from datetime import datetime
 import traceback
 import pytz
 
@@ -34,9 +33,10 @@ except ImportError:
 
 # --- Modul Importok ---
 try:
-    from config import COLORS, DAYS
+    from config import COLORS, PALETTE, DAYS
     import core.config_manager as config_manager
     import core.registry_utils as registry_utils
+    from core import clock
     from core.sun_logic import DAYS_HU
     from core.location_utils import LOCAL_TZ
     from gui import gui2_schedule_logic as logic
@@ -466,7 +466,11 @@ class GUI2_Widget(QWidget):
         self.check_schedule_timer.timeout.connect(lambda: logic.check_profiles(self))
         self.check_schedule_timer.start(30000)
         self.update_time()
-        QTimer.singleShot(500, lambda: logic.check_profiles(self))
+        # Azonnal (a konstruktor után) ellenőrizzük, hogy auto-connectnél az első parancs ne késsen
+        QTimer.singleShot(0, lambda: logic.check_profiles(self))
+
+        # A színválasztók a paletta eseményei alapján frissülnek
+        PALETTE.subscribe(self._on_palette_event)
 
     # --- Slot Metódusok (változatlanok) ---
     def stop_timers(self):
@@ -478,6 +482,9 @@ class GUI2_Widget(QWidget):
             self.check_schedule_timer.stop()
         if hasattr(self, "timeline_widget") and hasattr(self.timeline_widget, "timer"):
             self.timeline_widget.timer.stop()
+        PALETTE.unsubscribe(self._on_palette_event)
+        if hasattr(self.controls_widget, "detach_palette"):
+            self.controls_widget.detach_palette()
         log_event("GUI2 Timers stopped.")
 
     @Slot()
@@ -589,7 +596,7 @@ class GUI2_Widget(QWidget):
         }
         self.profile_combo.addItem(name)
         self.profile_combo.setCurrentText(name)
-        logic._save_profiles_to_file(self.main_app)
+        logic._save_profiles_to_file(self.main_app, name)
 
     @Slot()
     def delete_profile(self):
@@ -606,10 +613,11 @@ class GUI2_Widget(QWidget):
         )
         if reply != QMessageBox.StandardButton.Yes:
             return
-        del self.main_app.profiles[self.current_profile_name]
+        deleted = self.current_profile_name
+        del self.main_app.profiles[deleted]
         idx = self.profile_combo.currentIndex()
         self.profile_combo.removeItem(idx)
-        logic._save_profiles_to_file(self.main_app)
+        logic._save_profiles_to_file(self.main_app, deleted)
         self.unsaved_changes = False
         new_name = self.profile_combo.currentText()
         if new_name:
@@ -635,7 +643,7 @@ class GUI2_Widget(QWidget):
                 self.profile_active_checkbox.setChecked(False)
                 self.profile_active_checkbox.blockSignals(False)
                 return
-        logic._save_profiles_to_file(self.main_app)
+        logic._save_profiles_to_file(self.main_app, self.current_profile_name)
 
     @Slot()
     def reset_schedule_gui(self):
@@ -741,7 +749,7 @@ class GUI2_Widget(QWidget):
         """Frissíti a GUI-n megjelenő időt."""
         try:
             # Használjuk a logic modulban definiált időzónát
-            now = datetime.now(logic.LOCAL_TZ)
+            now = clock.now(logic.LOCAL_TZ)
             magyar_nap = DAYS_HU.get(now.strftime("%A"), now.strftime("%A"))
             self.time_label.setText(f"{now.strftime('%Y.%m.%d')} | {magyar_nap} | {now.strftime('%H:%M:%S')}")
         except Exception as e:
@@ -752,8 +760,25 @@ class GUI2_Widget(QWidget):
     def open_custom_colors(self):
         dialog = CustomColorDialog(self)
         dialog.exec()
-        self.controls_widget.build_color_buttons()
-        self.refresh_color_inputs()
+        # A gombok és a színválasztók a paletta eseményeiből már frissültek
+        if hasattr(self, "timeline_widget"):
+            self.timeline_widget.refresh()
+
+    def _on_palette_event(self, event):
+        """Csak az érintett színválasztó elemet módosítja (0. elem: 'Nincs kiválasztva')."""
+        item_index = event.index + 1
+        for widgets in self.schedule_widgets.values():
+            cb = widgets["color"]
+            cb.blockSignals(True)
+            if event.kind == "added":
+                cb.insertItem(item_index, event.entry.name)
+            elif event.kind == "removed":
+                if cb.currentIndex() == item_index:
+                    cb.setCurrentIndex(0)
+                cb.removeItem(item_index)
+            elif event.kind == "renamed":
+                cb.setItemText(item_index, event.entry.name)
+            cb.blockSignals(False)
 
     def refresh_color_inputs(self):
         names = ["Nincs kiválasztva"] + [c[0] for c in COLORS]
@@ -173,6 +173,36 @@ class GuiManager:
             log_event("clear_window_content: Nem volt aktuális widget referencia, layout ürítése fallbackként.")
             self._clear_layout(self.main_layout)  # Fallback
 
+    def release_gui_for_tray(self):
+        """Lebontja a rejtett GUI widgetfát, a reconnect loop futva marad.
+
+        Returns:
+            bool: True, ha volt lebontható widget.
+        """
+        current_widget = self.app._current_gui_widget
+        if current_widget is None:
+            return False
+        log_event(f"release_gui_for_tray: Widget lebontása: {current_widget.objectName()}")
+        if hasattr(current_widget, "stop_timers") and callable(current_widget.stop_timers):
+            try:
+                current_widget.stop_timers()
+            except Exception as e:
+                log_event(f"Hiba a {current_widget.objectName()} stop_timers hívásakor: {e}")
+        current_widget.setParent(None)
+        current_widget.deleteLater()
+        self.app._current_gui_widget = None
+        # A központi stíluslapot is elengedjük, újraépítéskor visszakerül
+        self.app.setStyleSheet("")
+        return True
+
+    def rebuild_gui_from_tray(self, was_gui2):
+        """Újraépíti a korábban lebontott GUI-t a tálcáról való megjelenítéskor."""
+        log_event("rebuild_gui_from_tray: GUI újraépítése...")
+        self._apply_stylesheet()
+        if was_gui2 and self.app.selected_device and self.load_gui2():
+            return
+        self.load_gui1()
+
     def load_gui1(self):
         """Betölti az első képernyőt."""
         self.clear_window_content()  # Ez leállítja a reconnect loopot is, ha kell
@@ -198,8 +228,8 @@ class GuiManager:
 
         self.clear_window_content()  # Ez most GUI1-et töröl, nem állít le loopot
         self.app.setWindowTitle(f"LED-Irányító 2000 - {self.app.selected_device[0]}")
-        # Default width adjusted so the schedule view still fits comfortably
-        self.app.resize(950, 700)
+        # Default width adjusted so the schedule view still fits comfortably
+        self.app.resize(950, 700)
 
         widget = GUI2_Widget(self.app)  # Fő app példány átadása
         self.main_layout.addWidget(widget)
@@ -232,7 +262,9 @@ class GuiManager:
     @staticmethod
     def _run_reconnect_loop_target(app_instance, stop_event):
         """Külön szálon futó asyncio hurok a kapcsolattartáshoz."""
-        loop = asyncio.new_event_loop()
+        from core import clock
+
+        loop = clock.new_event_loop()  # virtuális órával teszteléskor az alvások azonnal lefutnak
         asyncio.set_event_loop(loop)
         try:
             log_event("Reconnect loop indítása...")
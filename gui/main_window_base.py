@@ -24,11 +24,12 @@ from PySide6.QtCore import (
     Signal,
     Slot,
     QMetaObject,
+    QTimer,
 )
 
 # Importáljuk a szükséges konfigurációs és backend elemeket
 try:
-    from config import COLORS, DAYS
+    from config import BASE_DIR, COLORS, DAYS
     from core.ble_controller import BLEController
     from core.reconnect_handler import log_event  # Logolás
     from gui.async_helper import AsyncHelper
@@ -37,9 +38,16 @@ try:
     # GUI Widget importok itt is kellenek az isinstance miatt
     from gui.gui1_pyside import GUI1_Widget
     from gui.gui2_schedule_pyside import GUI2_Widget
+    from gui import gui2_schedule_logic
 
     # Új import a config kezelőhöz
     from core import config_manager
+    from core.metrics import METRICS, METRICS_FILE, MetricsExporter
+    from core.adapter_monitor import ADAPTER_MONITOR, BluezAdapterWatcher, watcher_supported
+    from core.usage_journal import USAGE_JOURNAL, USAGE_JOURNAL_FILE
+    from core.command_trace import COMMAND_TRACE, COMMAND_TRACE_FILE
+    from core.stall_watchdog import STALL_WATCHDOG
+    from core.file_io import FILE_IO
 except ImportError as e:
     print(f"Hiba az importálás során main_window_base.py-ben: {e}")
 
@@ -88,6 +96,7 @@ class LEDApp_BaseWindow(QMainWindow):
     connect_results_signal = Signal(bool)
     connect_error_signal = Signal(str)
     command_error_signal = Signal(str)
+    file_save_error_signal = Signal(str, str)  # útvonal, hibaüzenet (a FILE_IO szálról)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -103,10 +112,44 @@ class LEDApp_BaseWindow(QMainWindow):
         # ********************************************
 
         # --- Segédosztályok Inicializálása ---
-        self.async_helper = AsyncHelper(self)
+        self.async_helper = AsyncHelper(self, (config_manager.get_setting("slow_callback_ms") or 0) / 1000.0)
+        # Bluetooth adapter be/kikapcsolás események (Linux/BlueZ); máshol marad a hiba-heurisztika
+        self._adapter_watch_future = None
+        if watcher_supported():
+            self._adapter_watch_future = self.async_helper.run_async_task(
+                BluezAdapterWatcher(ADAPTER_MONITOR).run(), kind="adapter-monitor"
+            )
         # Fontos, hogy a GuiManager megkapja az app példányt, amiben az event van
         self.gui_manager = GuiManager(self)
 
+        # Kapcsolat- és forgalmi metrikák exportja (felügyelet nélküli gépekhez)
+        self.metrics_exporter = None
+        if config_manager.get_setting("metrics_export"):
+            self.metrics_exporter = MetricsExporter(
+                METRICS,
+                BASE_DIR / METRICS_FILE,
+                http_port=config_manager.get_setting("metrics_http_port"),
+            )
+            self.metrics_exporter.start()
+        # Használati napló (bekapcsolási idő színenként, kézi/ütemezett váltások)
+        if config_manager.get_setting("usage_journal"):
+            USAGE_JOURNAL.open(BASE_DIR / USAGE_JOURNAL_FILE)
+        # Profil/szín/beállítás mentések a GUI szál helyett a FILE_IO szálán
+        FILE_IO.start()
+        FILE_IO.add_listener(self._on_file_saved)
+        # Parancs trace (visszajátszható a szimulált backenden: tests/benchmarks/trace_replay.py)
+        if config_manager.get_setting("command_trace"):
+            COMMAND_TRACE.open(BASE_DIR / COMMAND_TRACE_FILE)
+        # GUI szál akadásfigyelő: a szívverést ennek a szálnak az időzítője adja
+        self.stall_heartbeat = None
+        stall_ms = config_manager.get_setting("stall_watchdog_ms")
+        if stall_ms:
+            STALL_WATCHDOG.threshold = stall_ms / 1000.0
+            self.stall_heartbeat = QTimer(self)
+            self.stall_heartbeat.timeout.connect(STALL_WATCHDOG.beat)
+            self.stall_heartbeat.start(int(STALL_WATCHDOG.heartbeat * 1000))
+            STALL_WATCHDOG.start()
+
         # --- Változók ---
         self.last_user_input = time.time()
         self.devices = []  # Kezdetben üres lista
@@ -159,6 +202,7 @@ class LEDApp_BaseWindow(QMainWindow):
         self.connect_results_signal.connect(self._handle_connect_results)
         self.connect_error_signal.connect(self._handle_connect_error)
         self.command_error_signal.connect(self._handle_command_error)
+        self.file_save_error_signal.connect(self._handle_file_save_error)
 
     # *** ÚJ SLOT a disconnect utáni GUI1 töltéshez ***
     @Slot()
@@ -206,7 +250,7 @@ class LEDApp_BaseWindow(QMainWindow):
                 QMetaObject.invokeMethod(self, "_load_gui1_slot", Qt.ConnectionType.QueuedConnection)
 
         # Aszinkron disconnect indítása az AsyncHelperrel
-        self.async_helper.run_async_task(do_disconnect(), None, self.command_error_signal)
+        self.async_helper.run_async_task(do_disconnect(), None, self.command_error_signal, kind="disconnect")
 
         # Azonnal frissítjük a GUI1 gombjait és listáját (ha éppen az látható)
         self.update_button_states_if_gui1()
@@ -375,12 +419,38 @@ class LEDApp_BaseWindow(QMainWindow):
                 # Vagy hagyatkozunk a státuszjelzőre és a reconnect loopra.
                 pass
 
+    def _on_file_saved(self, path, error):
+        """FILE_IO visszajelzés (az I/O szálon fut): hiba esetén signal a GUI szálra."""
+        if error:
+            self.file_save_error_signal.emit(path, error)
+
+    @Slot(str, str)
+    def _handle_file_save_error(self, path, error):
+        log_event(f"Mentési hiba jelezve a felhasználónak: {path}: {error}")
+        QMessageBox.warning(self, "Mentési hiba", f"Nem sikerült a mentés:\n{path}\n\n{error}")
+
     def base_cleanup(self):
         """Alapvető cleanup műveletek kilépéskor."""
         log_event("Base cleanup műveletek indítása (kilépés)...")
+        # A leállítás blokkoló lépései ne számítsanak akadásnak
+        if self.stall_heartbeat:
+            self.stall_heartbeat.stop()
+        STALL_WATCHDOG.stop()
         # Jelezzük a reconnect loopnak (ha még futna), hogy álljon le
         self._stop_reconnect_event.set()
+        if self._adapter_watch_future:
+            self._adapter_watch_future.cancel()
         # Async hurok leállítását kérjük
         self.async_helper.stop_loop()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+        if self.ble:
+            self.ble.journal_shutdown()  # a zárt alkalmazás ideje ne számítson bekapcsolt időnek
+        USAGE_JOURNAL.close()
+        COMMAND_TRACE.close()
+        # A függő mentések kiírása (a kilépés ne veszítsen el profilt/beállítást)
+        FILE_IO.remove_listener(self._on_file_saved)
+        FILE_IO.stop()
+        gui2_schedule_logic.close_profile_store()
         log_event("Base cleanup (stop kérések) befejezve.")
         # A szálak leállása és a loop bezárása a háttérben történik meg (daemon=True, stop())
@@ -11,18 +11,22 @@ from PySide6.QtCore import (
     QMetaObject,
     Q_ARG,
 )  # QMetaObject és Q_ARG hozzáadva
-from PySide6.QtGui import QIcon, QAction
+from PySide6.QtGui import QIcon, QAction, QKeySequence, QShortcut
 
 # Importáljuk az alap ablak osztályt és a GUI managert
 try:
     # Próbáljuk meg relatívan importálni
     from .main_window_base import LEDApp_BaseWindow, log_event
     from .gui_manager import GuiManager  # GuiManager importálása
+    from .tray_residency import TrayResidencyPolicy
+    from .diagnostics_panel import DiagnosticsPanel
 
     # GUI widgetek importálása az isinstance és egyéb hivatkozások miatt
 except ImportError:
     # Ha nem a 'gui' mappából futtatjuk
     from main_window_base import LEDApp_BaseWindow, log_event
+    from tray_residency import TrayResidencyPolicy
+    from diagnostics_panel import DiagnosticsPanel
 
 
 class LEDApp_PySide(LEDApp_BaseWindow):
@@ -31,6 +35,11 @@ class LEDApp_PySide(LEDApp_BaseWindow):
         self._force_quit = False
         self._start_hidden = start_hidden  # Indítási állapot tárolása
         self._initial_gui_loaded = False  # Segédfalg, hogy tudjuk, betöltöttük-e már a GUI-t
+        self._diagnostics_panel = None
+
+        # Diagnosztikai ablak gyorsbillentyűje
+        self._diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self._diagnostics_shortcut.activated.connect(self.show_diagnostics)
 
         # ----- Rendszer Tálca Ikon Létrehozása -----
         self.tray_icon = None
@@ -61,12 +70,15 @@ class LEDApp_PySide(LEDApp_BaseWindow):
 
             tray_menu = QMenu(self)
             show_action = QAction("Megjelenítés", self)
+            diagnostics_action = QAction("Diagnosztika", self)
             exit_action = QAction("Kilépés", self)
 
             show_action.triggered.connect(self.show_window_from_tray)
+            diagnostics_action.triggered.connect(self.show_diagnostics)
             exit_action.triggered.connect(self.quit_application)
 
             tray_menu.addAction(show_action)
+            tray_menu.addAction(diagnostics_action)
             tray_menu.addSeparator()
             tray_menu.addAction(exit_action)
 
@@ -84,6 +96,9 @@ class LEDApp_PySide(LEDApp_BaseWindow):
                 self._start_hidden = False  # Nem tud rejtve indulni ikon nélkül
         # ----- Rendszer Tálca Ikon Vége -----
 
+        # Tálcán töltött idő alatti memóriatakarékos mód (opt-in)
+        self.tray_residency = TrayResidencyPolicy(self)
+
         # GUI betöltésének késleltetése, hogy az AsyncHelper elindulhasson
         if not self._start_hidden:
             # Normál esetben várjunk egy kicsit
@@ -94,6 +109,7 @@ class LEDApp_PySide(LEDApp_BaseWindow):
             # Az automatikus csatlakozást a main.py indítja el
             # Frissítsük a tooltipet az induláskor ismert állapottal
             self.update_connection_status_gui(self.connection_status)
+            self.tray_residency.on_hidden()
 
     def load_initial_gui(self):
         """Betölti a kezdeti GUI-t (GUI1 vagy GUI2 a kapcsolat állapota szerint)."""
@@ -131,6 +147,9 @@ class LEDApp_PySide(LEDApp_BaseWindow):
             self.tray_icon.hide()  # Elrejtjük a tálca ikont, amikor az ablak megjelenik
             log_event("Tálca ikon elrejtve (show_window_from_tray).")
 
+        # Ha a memóriatakarékos mód lebontotta a GUI-t, itt épül újra
+        self.tray_residency.on_shown()
+
         # Ha a GUI még nem volt betöltve (mert rejtve indult)
         if not self._initial_gui_loaded:
             self.load_initial_gui()  # Betölti a megfelelő GUI-t az aktuális állapot alapján
@@ -140,6 +159,15 @@ class LEDApp_PySide(LEDApp_BaseWindow):
         self.activateWindow()
         log_event("Főablak megjelenítve a tálcáról.")
 
+    @Slot()
+    def show_diagnostics(self):
+        """Megnyitja (vagy előtérbe hozza) a késleltetés-diagnosztikai ablakot."""
+        if self._diagnostics_panel is None:
+            self._diagnostics_panel = DiagnosticsPanel(parent=self)
+        self._diagnostics_panel.show()
+        self._diagnostics_panel.raise_()
+        self._diagnostics_panel.activateWindow()
+
     @Slot(QSystemTrayIcon.ActivationReason)
     def handle_tray_activation(self, reason):
         """Kezeli a tálca ikonra kattintást."""
@@ -192,6 +220,7 @@ class LEDApp_PySide(LEDApp_BaseWindow):
                 self.hide()
                 self.tray_icon.setVisible(True)  # Biztosítjuk, hogy látható legyen
                 self.tray_icon.show()
+                self.tray_residency.on_hidden()
                 # Üzenet megjelenítése csak akkor, ha nem épp most indult rejtve
                 if not self._start_hidden:
                     self.tray_icon.showMessage(
@@ -2,9 +2,8 @@ from PySide6.QtWidgets import QWidget
 from PySide6.QtCore import QTimer, QRectF
 from PySide6.QtGui import QColor, QPainter, QPen
 
-from datetime import datetime
-
 from config import DAYS
+from core import clock
 from gui import gui2_schedule_logic as logic
 
 
@@ -56,7 +55,7 @@ class TimelineWidget(QWidget):
                 painter.fillRect(rect, QColor(color))
 
         # current time indicator
-        now = datetime.now(logic.LOCAL_TZ)
+        now = clock.now(logic.LOCAL_TZ)
         total_min = now.hour * 60 + now.minute
         x = left_margin + width * total_min / (24 * 60)
         pen = QPen(QColor("red"))
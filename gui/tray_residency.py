@@ -0,0 +1,147 @@
+# LEDapp/gui/tray_residency.py
+
+import gc
+
+from PySide6.QtCore import QObject, QTimer
+
+import core.config_manager as config_manager
+from core import clock
+from core.memory_utils import log_rss
+
+try:
+    from core.reconnect_handler import log_event
+except ImportError:
+
+    def log_event(msg):
+        print(f"[LOG - Dummy TrayResidency]: {msg}")
+
+
+SCHEDULE_CHECK_INTERVAL_MS = 30_000
+RSS_SETTLE_DELAY_MS = 1_000  # deleteLater feldolgozására várunk a mérés előtt
+
+
+class HeadlessScheduleHost:
+    """Stand-in for ``GUI2_Widget`` that lets ``check_profiles`` run without a widget tree."""
+
+    def __init__(self, main_app):
+        self.main_app = main_app
+        self.controls_widget = self
+        self._sun_date = None
+
+    def refresh_sun_times(self):
+        """Recompute today's sunrise/sunset from the stored coordinates (no network)."""
+        from core.location_utils import LOCAL_TZ, get_sun_times
+
+        today = clock.now(LOCAL_TZ).date()
+        if today == self._sun_date:
+            return
+        sunrise, sunset = get_sun_times(self.main_app.latitude, self.main_app.longitude)
+        if sunrise and sunset:
+            self.main_app.sunrise = sunrise
+            self.main_app.sunset = sunset
+        self._sun_date = today
+
+    def send_color_command(self, hex_code, cause="schedule"):
+        self.main_app.last_color_hex = hex_code
+        self.main_app.is_led_on = True
+        self.main_app.async_helper.run_async_task(
+            self.main_app.ble.apply_state(power=True, color=hex_code, cause=cause),
+            callback_error_signal=self.main_app.command_error_signal,
+            kind="write",
+            key="led-power",
+            policy="latest",
+        )
+
+    def turn_off_led(self, cause="schedule"):
+        self.main_app.is_led_on = False
+        self.main_app.async_helper.run_async_task(
+            self.main_app.ble.apply_state(power=False, cause=cause),
+            callback_error_signal=self.main_app.command_error_signal,
+            kind="write",
+            key="led-power",
+            policy="latest",
+        )
+
+
+class TrayResidencyPolicy(QObject):
+    """Opt-in policy that releases the hidden widget tree after an idle period in the tray.
+
+    Only the BLE reconnect loop and a headless schedule check stay alive while
+    the UI is released; ``on_shown`` rebuilds the previous screen.
+    """
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.window = main_window
+        self.released = False
+        self._released_gui2 = False
+        self.headless_host = None
+
+        self.release_timer = QTimer(self)
+        self.release_timer.setSingleShot(True)
+        self.release_timer.timeout.connect(self._release_if_idle)
+
+        self.schedule_timer = QTimer(self)
+        self.schedule_timer.timeout.connect(self._run_headless_schedule)
+
+    @staticmethod
+    def is_enabled():
+        return bool(config_manager.get_setting("tray_memory_saver"))
+
+    @staticmethod
+    def _delay_ms():
+        minutes = config_manager.get_setting("tray_release_delay_minutes")
+        if not isinstance(minutes, int) or minutes < 0:
+            minutes = 10
+        return minutes * 60_000
+
+    def on_hidden(self):
+        """Az ablak a tálcára került."""
+        log_rss("tálcára rejtve")
+        if self.is_enabled() and not self.released:
+            self.release_timer.start(self._delay_ms())
+
+    def on_shown(self):
+        """Az ablak a tálcáról újra megjelenik; szükség esetén újraépíti a GUI-t."""
+        self.release_timer.stop()
+        if not self.released:
+            return
+        self.schedule_timer.stop()
+        self.headless_host = None
+        self.released = False
+        self.window.gui_manager.rebuild_gui_from_tray(self._released_gui2)
+        log_rss("GUI újraépítve")
+
+    def _release_if_idle(self):
+        if not self.window.isHidden() or not self.is_enabled():
+            return
+        from gui.gui2_schedule_pyside import GUI2_Widget
+
+        was_gui2 = isinstance(self.window._current_gui_widget, GUI2_Widget)
+        if not self.window.gui_manager.release_gui_for_tray():
+            # Rejtett induláskor a GUI később töltődhet be, ezért újra próbálkozunk
+            self.release_timer.start(self._delay_ms())
+            return
+
+        self.released = True
+        self._released_gui2 = was_gui2
+        if was_gui2:
+            self.headless_host = HeadlessScheduleHost(self.window)
+            self.schedule_timer.start(SCHEDULE_CHECK_INTERVAL_MS)
+        log_event(f"Tálca memóriatakarékos mód: GUI lebontva (GUI2 volt: {was_gui2}).")
+        QTimer.singleShot(RSS_SETTLE_DELAY_MS, self._log_released_rss)
+
+    def _log_released_rss(self):
+        gc.collect()
+        log_rss("GUI lebontva")
+
+    def _run_headless_schedule(self):
+        if not self.headless_host:
+            return
+        from gui import gui2_schedule_logic as logic
+
+        try:
+            self.headless_host.refresh_sun_times()
+        except Exception as e:
+            log_event(f"Hiba a napkelte/napnyugta frissítésekor (tálca mód): {e}")
+        logic.check_profiles(self.headless_host)
@@ -18,6 +18,9 @@ try:
     from gui.main_window_pyside import LEDApp_PySide
     from core import config_manager
     from core.reconnect_handler import log_event
+    from core.tracing import TRACER
+    from core.ble_controller import connect_key
+    from core.warm_start import STARTUP, wait_for_adapter, warm_connect
 except ImportError as e:
 
     def log_event(msg):
@@ -41,11 +44,6 @@ async def attempt_auto_connect(app_instance):
     # meghatározhatjuk a kapcsolat sikerességét is.
 
     try:
-        # *** Opcionális extra késleltetés az újraindítás után ***
-        log_event("Rövid várakozás az auto-connect előtt (Bluetooth inicializálás)...")
-        await asyncio.sleep(2.0)  # Adjunk 2 másodpercet (ez állítható)
-        # ****************************************************
-
         last_addr = config_manager.get_setting("last_device_address")
         last_name = config_manager.get_setting("last_device_name")
 
@@ -62,12 +60,17 @@ async def attempt_auto_connect(app_instance):
             Q_ARG(str, "connecting"),
         )
 
-        # Csatlakozási kísérlet indítása az AsyncHelper segítségével
-        # Az eredményt a done_callback fogja kezelni és a signalokat kibocsátani
+        # Fix várakozás helyett addig próbáljuk az adaptert, amíg kész nem lesz (Bluetooth inicializálás)
+        await wait_for_adapter(app_instance.ble)
+
+        # Csatlakozási kísérlet indítása az AsyncHelper segítségével (közvetlenül a mentett címre,
+        # mellette célzott kereséssel). Az eredményt a done_callback kezeli és bocsátja ki a signalokat.
         future = app_instance.async_helper.run_async_task(
-            app_instance.ble.connect_with_retry(last_addr),
+            warm_connect(app_instance.ble, last_addr),
             app_instance.connect_results_signal,
             app_instance.connect_error_signal,
+            kind="connect",
+            key=connect_key(last_addr),
         )
 
         # !!! A HIBÁS RÉSZ ELTÁVOLÍTVA !!!
@@ -111,7 +114,13 @@ if __name__ == "__main__":
     # --- Parancssori argumentumok feldolgozása ---
     parser = argparse.ArgumentParser()
     parser.add_argument("--tray", action="store_true", help="Indítás rejtve a tálcára.")
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Trace span-ek rögzítése és kilépéskor Chrome trace JSON-ként mentése.",
+    )
     args = parser.parse_args()
+    TRACER.enabled = bool(args.trace)
 
     # --- Qt Alkalmazás Inicializálása ---
     qt_app = QApplication(sys.argv)
@@ -188,14 +197,12 @@ if __name__ == "__main__":
         if config_manager.get_setting("auto_connect_on_startup"):
 
             async def delayed_autoconnect():
-                """Indít egy rövid késleltetés után automatikus csatlakozást."""
-                # Rövid várakozás az eseményhurok stabilizálódására
-                await asyncio.sleep(0.5)
-                # Elindítja a csatlakozást
+                """Automatikus csatlakozás indítása (az adapter készenlétét az attempt_auto_connect várja meg)."""
+                STARTUP.mark("autoconnect_start")
                 await attempt_auto_connect(main_window)
 
             # Az asyncio task futtatása az AsyncHelperen keresztül
-            main_window.async_helper.run_async_task(delayed_autoconnect())
+            main_window.async_helper.run_async_task(delayed_autoconnect(), kind="autoconnect", key="autoconnect")
         else:
             log_event("Automatikus csatlakozás kihagyva (beállítás szerint le van tiltva).")
             # Jelöljük, hogy nem kell várni
@@ -208,4 +215,11 @@ if __name__ == "__main__":
         main_window.show()
 
     # --- Qt Eseményhurok Indítása ---
-    sys.exit(qt_app.exec())
+    exit_code = qt_app.exec()
+    if args.trace:
+        try:
+            count = TRACER.export_chrome(args.trace)
+            log_event(f"Trace mentve: {args.trace} ({count} span)")
+        except OSError as e:
+            log_event(f"Hiba a trace mentésekor: {e}")
+    sys.exit(exit_code)
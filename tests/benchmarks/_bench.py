@@ -0,0 +1,169 @@
+"""Shared runner for the headless benchmark suites: timing, JSON results and baseline gating.
+
+Each suite script defines its cases and calls :func:`main`; run e.g.::
+
+    python tests/benchmarks/schedule_logic_bench.py --output results.json
+    python tests/benchmarks/schedule_logic_bench.py --update-baseline
+
+The exit code is 1 when a tracked operation is slower than the stored
+baseline by more than ``--threshold``, or the process peak RSS grew by more
+than ``--memory-threshold``. The gate compares the fastest round
+(``min_ms``), scaled by a fixed pure-Python reference workload measured in
+the same run, so a slower or throttled machine does not read as a regression.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_THRESHOLD = 1.5  # ennyiszeres lassulás már regresszió
+DEFAULT_MEMORY_THRESHOLD = 1.25  # a folyamat csúcs RSS-ére
+MIN_DELTA_MS = 0.05  # ez alatti eltérés mérési zaj
+ROUND_SECONDS = 0.05
+ROUNDS = 5
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core.memory_utils import format_bytes, get_peak_rss_bytes, get_rss_bytes  # noqa: E402
+
+
+def stub_pyside():
+    """Minimal PySide6 stand-in (as in the unit tests) when the real one is not installed."""
+    try:
+        import PySide6.QtWidgets  # noqa: F401
+
+        return False
+    except ImportError:
+        pass
+    widgets = types.SimpleNamespace(
+        QMessageBox=types.SimpleNamespace(
+            critical=lambda *a, **k: None,
+            information=lambda *a, **k: None,
+            warning=lambda *a, **k: None,
+        )
+    )
+    sys.modules["PySide6"] = types.ModuleType("PySide6")
+    sys.modules["PySide6.QtWidgets"] = widgets
+    sys.modules["PySide6.QtCore"] = types.SimpleNamespace(Qt=object())
+    return True
+
+
+def measure(fn, rounds=ROUNDS, round_seconds=ROUND_SECONDS):
+    """Per-call seconds of ``fn``: calls per round are calibrated like ``timeit.autorange``."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= round_seconds or number >= 1 << 16:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(rounds - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return samples, number
+
+
+def _reference_workload():
+    data = list(range(2000, 0, -1))
+    return sum(sorted(str(x) for x in data).index("1999") for _ in range(5))
+
+
+def reference_ms(quick=False):
+    """A gép aktuális sebessége: egy rögzített referencia munka legjobb ideje (ms)."""
+    samples, _ = measure(_reference_workload, rounds=2 if quick else ROUNDS)
+    return round(min(samples) * 1000.0, 4)
+
+
+def run_cases(cases, quick=False):
+    """``cases``: ``[(name, fn)]`` -> ``{name: {"median_ms", "min_ms", "calls", "rss_bytes"}}``."""
+    results = {}
+    for name, fn in cases:
+        gc.collect()  # az előző eset szemete ne ennél takaruljon
+        samples, number = measure(fn, rounds=2 if quick else ROUNDS, round_seconds=0.0 if quick else ROUND_SECONDS)
+        results[name] = {
+            "median_ms": round(statistics.median(samples) * 1000.0, 4),
+            "min_ms": round(min(samples) * 1000.0, 4),
+            "calls": number * len(samples),
+            "rss_bytes": get_rss_bytes(),  # a folyamat RSS-e az eset után
+        }
+        print(f"{name:<48} {results[name]['min_ms']:10.3f} ms (medián {results[name]['median_ms']:.3f})")
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta_ms=MIN_DELTA_MS, speed=1.0):
+    """Regressions as ``[(name, baseline ms, current ms, ratio)]``; untracked names are ignored.
+
+    ``speed`` is current/baseline reference time; current timings are divided by it.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        before, now = base["min_ms"], current["min_ms"] / speed
+        if now - before > min_delta_ms and now > before * threshold:
+            regressions.append((name, before, now, now / before if before else float("inf")))
+    return regressions
+
+
+def main(suite, cases, argv=None):
+    parser = argparse.ArgumentParser(description=f"{suite} benchmark")
+    parser.add_argument("--output", help="eredmények JSON fájlba (alapértelmezés: stdout)")
+    parser.add_argument("--baseline", default=str(BASELINE_DIR / f"{suite}.json"))
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true", help="az eredmény lesz az új baseline")
+    parser.add_argument("--quick", action="store_true", help="egy-egy hívás, csak a futás ellenőrzésére")
+    args = parser.parse_args(argv)
+
+    results = run_cases(cases(), quick=args.quick)
+    report = {
+        "suite": suite,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "reference_ms": reference_ms(quick=args.quick),
+        "peak_rss_bytes": get_peak_rss_bytes(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(text + "\n", encoding="utf-8")
+        print(f"Baseline frissítve: {baseline_path}")
+        return 0
+    if args.quick:
+        return 0
+    if not baseline_path.exists():
+        print(f"Nincs baseline ({baseline_path}), összehasonlítás kihagyva.")
+        return 0
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    speed = report["reference_ms"] / baseline.get("reference_ms", report["reference_ms"])
+    print(f"Gép sebesség a baseline-hoz képest: {1 / speed:.2f}x")
+    regressions = compare(results, baseline["results"], args.threshold, speed=speed)
+    for name, before, now, ratio in regressions:
+        print(f"REGRESSZIÓ {name}: {before:.3f} ms -> {now:.3f} ms ({ratio:.2f}x)")
+    before_rss, now_rss = baseline.get("peak_rss_bytes"), report["peak_rss_bytes"]
+    memory_regressed = bool(before_rss and now_rss and now_rss > before_rss * args.memory_threshold)
+    if memory_regressed:
+        print(f"REGRESSZIÓ csúcs memória: {format_bytes(before_rss)} -> {format_bytes(now_rss)}")
+    return 1 if regressions or memory_regressed else 0
@@ -0,0 +1,135 @@
+"""Offscreen GUI benchmarks (``QT_QPA_PLATFORM=offscreen``): schedule page build, profile switch, palette and timeline.
+
+Needs the real PySide6; the schedule data comes from the schedule-logic suite's generator.
+Paint cost is measured with ``QWidget.render`` into a pixmap, which runs ``paintEvent``
+synchronously without a visible window.
+"""
+
+import importlib
+import json
+import os
+import sys
+import tempfile
+import types
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import _bench  # noqa: E402
+import schedule_logic_bench  # noqa: E402
+
+PROFILE_COUNT = 100
+PALETTE_SIZES = (16, 64, 256, 1024)
+TIMELINE_SIZES = ((400, 160), (1000, 400), (2000, 800))
+NOW = datetime(2024, 6, 3, 21, 30)
+_ALIVE = []
+
+
+def _main_app(profiles):
+    return types.SimpleNamespace(
+        profiles=profiles,
+        selected_device=("BENCH-LED", "AA:BB:CC:DD:EE:FF"),
+        is_led_on=False,
+        last_color_hex=None,
+        connected=False,
+        connection_status="disconnected",
+    )
+
+
+def _grow_palette(palette, size):
+    """A paletta feltöltése ``size`` színig szintetikus színekkel."""
+    i = len(palette)
+    while len(palette) < size:
+        palette.add(f"Bench {i:04d}", f"#{(i * 2654435761) & 0xFFFFFF:06x}")
+        i += 1
+
+
+def cases():
+    try:
+        from PySide6.QtGui import QPixmap
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        raise SystemExit("A GUI benchmarkhoz a PySide6 szükséges.")
+
+    logic = schedule_logic_bench.load_logic()
+    try:
+        importlib.import_module("core.registry_utils")
+    except ImportError:
+        # winreg csak Windowson van; az indítási beállítás nem része a mérésnek
+        sys.modules["core.registry_utils"] = types.SimpleNamespace(
+            add_to_startup=lambda: False, remove_from_startup=lambda: False, is_in_startup=lambda: False
+        )
+    app = QApplication.instance() or QApplication([])
+    from config import PALETTE
+    from core import clock
+    from gui.gui2_schedule_pyside import GUI2_Widget
+    from gui.timeline_widget import TimelineWidget
+
+    clock.set_clock(clock.VirtualClock(logic.LOCAL_TZ.localize(NOW)))
+    # Hálózati helymeghatározás helyett fix koordináták és napkelte/napnyugta
+    sunrise, sunset = schedule_logic_bench._fake_sun_times(47.4338, 19.1931, NOW)
+    logic.get_local_sun_info = lambda: {
+        "latitude": 47.4338,
+        "longitude": 19.1931,
+        "sunrise": sunrise,
+        "sunset": sunset,
+        "located": True,
+    }
+    profiles = schedule_logic_bench.generate_profiles(PROFILE_COUNT)
+    tmp = Path(tempfile.mkdtemp(prefix="led-gui-bench-"))
+    profiles_file = tmp / "profiles.json"
+    profiles_file.write_text(json.dumps(profiles, ensure_ascii=False), encoding="utf-8")
+    logic.PROFILES_FILE = str(profiles_file)
+    logic.PROFILES_DB = str(tmp / "profiles.db")
+    logic._save_profiles_to_file = lambda main_app, name=None: True  # a benchmark ne írjon fájlt
+
+    def build():
+        widget = GUI2_Widget(_main_app({}))
+        widget.stop_timers()
+        widget.setParent(None)
+        return widget
+
+    def construct():
+        build()  # a Python referencia megszűnésével a Qt objektum is törlődik
+
+    page = build()
+    names = list(page.main_app.profiles)
+    toggle = {"i": 0}
+
+    def change_profile():
+        toggle["i"] ^= 1
+        page.unsaved_changes = False  # a mentési kérdés modális ablaka nem nyílhat meg
+        page.change_profile(names[toggle["i"]])
+
+    result = [
+        (f"GUI2_Widget.__init__[profiles={PROFILE_COUNT}]", construct),
+        (f"change_profile[profiles={PROFILE_COUNT}]", change_profile),
+        (f"refresh_color_inputs[palette={len(PALETTE)}]", page.refresh_color_inputs),
+    ]
+
+    controls = page.controls_widget
+    for size in PALETTE_SIZES:
+        _grow_palette(PALETTE, size)
+        result.append((f"build_color_buttons[palette={len(PALETTE)}]", controls.build_color_buttons))
+    result.append((f"refresh_color_inputs[palette={len(PALETTE)}]", page.refresh_color_inputs))
+
+    timeline = TimelineWidget(page.main_app)
+    timeline.timer.stop()
+    for width, height in TIMELINE_SIZES:
+        timeline.resize(width, height)
+        target = QPixmap(width, height)
+
+        def paint(width=width, height=height, target=target):
+            if timeline.width() != width or timeline.height() != height:
+                timeline.resize(width, height)
+            timeline.render(target)  # szinkron paintEvent a pixmapra (képernyő nélkül)
+
+        result.append((f"TimelineWidget.paintEvent[{width}x{height}]", paint))
+    _ALIVE.extend((app, page, timeline))  # a mérések végéig élniük kell
+    return result
+
+
+if __name__ == "__main__":
+    sys.exit(_bench.main("gui", cases))
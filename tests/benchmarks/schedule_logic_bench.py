@@ -0,0 +1,124 @@
+"""Schedule-logic benchmarks over synthetic profile sets (1 to 1,000 profiles), headless."""
+
+import importlib
+import json
+import random
+import sys
+import tempfile
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import _bench  # noqa: E402
+
+SIZES = (1, 10, 100, 1000)
+SEED = 2024
+_LOGIC = None
+
+
+def _fake_sun_times(lat, lon, now=None):
+    day = (now or datetime(2024, 6, 3)).date()
+    tz = _LOGIC.LOCAL_TZ
+    sunrise = tz.localize(datetime.combine(day, datetime.min.time()) + timedelta(hours=5, minutes=47))
+    return sunrise, sunrise + timedelta(hours=14, minutes=58)
+
+
+def load_logic():
+    """gui2_schedule_logic betöltése Qt és hálózat nélkül (a unit tesztek csonkolási módszerével)."""
+    global _LOGIC
+    _bench.stub_pyside()
+    try:
+        importlib.import_module("core.location_utils")
+    except ImportError:
+        # requests/suntime nélkül a helymeghatározás helyett fix napkelte/napnyugta
+        sys.modules["core.location_utils"] = types.SimpleNamespace(
+            get_sun_times=lambda *a, **k: _fake_sun_times(*a, **k),
+            get_coordinates=lambda *a, **k: (47.4338, 19.1931),
+        )
+    _LOGIC = importlib.import_module("gui.gui2_schedule_logic")
+    _LOGIC.get_sun_times = _fake_sun_times
+    return _LOGIC
+
+
+def generate_profiles(count, seed=SEED, colors=None):
+    """Synthetic profiles: fixed and sun-based entries, overnight spans, a tenth of them inactive."""
+    rng = random.Random(seed + count)
+    colors = colors or _LOGIC.PALETTE.names()
+    profiles = {}
+    for i in range(count):
+        schedule = {}
+        for day in _LOGIC.DAYS:
+            kind = rng.random()
+            on_minute = rng.randrange(0, 24 * 60, 5)
+            length = rng.randrange(30, 10 * 60, 5)
+            off_minute = (on_minute + length) % (24 * 60)  # átnyúlhat éjfélen
+            schedule[day] = {
+                "color": rng.choice(colors),
+                "on_time": f"{on_minute // 60:02d}:{on_minute % 60:02d}",
+                "off_time": f"{off_minute // 60:02d}:{off_minute % 60:02d}",
+                "sunrise": kind < 0.2,
+                "sunrise_offset": rng.randrange(-60, 61, 5),
+                "sunset": 0.1 < kind < 0.4,
+                "sunset_offset": rng.randrange(-60, 61, 5),
+            }
+        profiles[f"Profil {i:04d}"] = {"active": rng.random() >= 0.1, "schedule": schedule}
+    return profiles
+
+
+def _app(profiles, now):
+    sunrise, sunset = _fake_sun_times(47.4338, 19.1931, now)
+    return types.SimpleNamespace(
+        profiles=profiles,
+        sunrise=sunrise,
+        sunset=sunset,
+        latitude=47.4338,
+        longitude=19.1931,
+        is_led_on=True,
+        last_color_hex=None,
+    )
+
+
+def cases():
+    logic = load_logic()
+    from core import clock
+
+    now = datetime(2024, 6, 3, 21, 30)
+    clock.set_clock(clock.VirtualClock(logic.LOCAL_TZ.localize(now)))
+    controls = types.SimpleNamespace(send_color_command=lambda *a, **k: None, turn_off_led=lambda *a, **k: None)
+    tmp = Path(tempfile.mkdtemp(prefix="led-bench-"))
+    result = []
+    for size in SIZES:
+        profiles = generate_profiles(size)
+        path = tmp / f"profiles_{size}.json"
+        path.write_text(json.dumps(profiles, ensure_ascii=False), encoding="utf-8")
+        app = _app(profiles, now)
+        widget = types.SimpleNamespace(main_app=app, controls_widget=controls)
+        first = next(iter(profiles))
+
+        db = str(tmp / f"profiles_{size}.db")  # az első betöltés ebbe migrálja a JSON fájlt
+
+        def load(path=path, db=db):
+            logic.PROFILES_FILE, logic.PROFILES_DB = str(path), db
+            logic.load_profiles_from_file(_app({}, now))
+
+        def save(app=app, first=first, db=db):
+            logic.PROFILES_DB = db
+            logic._save_profiles_to_file(app, first)
+
+        result += [
+            (f"load_profiles_from_file[n={size}]", load),
+            (f"_save_profiles_to_file[n={size}]", save),
+            (f"check_profiles[n={size}]", lambda widget=widget: logic.check_profiles(widget)),
+            (
+                f"check_profile_conflicts[n={size}]",
+                lambda app=app, first=first: logic.check_profile_conflicts(app, first),
+            ),
+            (f"get_all_profiles_day_intervals[n={size}]", lambda app=app: logic.get_all_profiles_day_intervals(app)),
+        ]
+    return result
+
+
+if __name__ == "__main__":
+    sys.exit(_bench.main("schedule_logic", cases))
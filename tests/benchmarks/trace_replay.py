@@ -0,0 +1,90 @@
+"""Replays a captured command trace through ``BLEController`` against the simulated backend.
+
+Capture a trace by enabling the ``command_trace`` setting (the app writes
+``command_trace.jsonl`` under its data directory), then::
+
+    python tests/benchmarks/trace_replay.py command_trace.jsonl             # real time
+    python tests/benchmarks/trace_replay.py command_trace.jsonl --speed 10
+    python tests/benchmarks/trace_replay.py command_trace.jsonl --max --write-delay 0.015
+
+Prints the issue-to-completion lag distribution (or writes it as JSON with
+``--output``), so queueing changes can be compared on real interaction patterns.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core import command_trace  # noqa: E402
+from core.adapter_pool import AdapterPool  # noqa: E402
+from core.ble_controller import BLEController  # noqa: E402
+from core.sim_backend import SimBackend  # noqa: E402
+
+SIM_ADDRESS = "AA:BB:CC:DD:EE:01"
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def summarize(result):
+    lag_ms = [lag * 1000.0 for lag in result.lag]
+    return {
+        "sent": result.sent,
+        "failed": result.failed,
+        "duration_s": round(result.duration, 3),
+        "lag_ms": {
+            "median": round(statistics.median(lag_ms), 3) if lag_ms else 0.0,
+            "p95": round(_percentile(lag_ms, 0.95), 3),
+            "max": round(max(lag_ms, default=0.0), 3),
+        },
+    }
+
+
+async def run(records, speed, write_delay):
+    sim = SimBackend(write_delay=write_delay)
+    address = next((r.address for r in records if r.address), SIM_ADDRESS)
+    sim.add_device(address)
+    controller = BLEController(
+        client_factory=sim.client,
+        adapter_pool=AdapterPool(sim.adapter_names()),
+        command_trace=command_trace.CommandTrace(),  # a visszajátszás ne kerüljön az alkalmazás trace-ébe
+    )
+    await controller.connect_with_retry(address, attempts=1)
+    controller.target_address = address
+    try:
+        return await command_trace.replay(controller, records, speed=speed)
+    finally:
+        await controller.disconnect()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="parancs trace visszajátszása szimulált backenden")
+    parser.add_argument("trace", help="a rögzített command_trace.jsonl")
+    parser.add_argument("--speed", type=float, default=1.0, help="gyorsítás (1 = valós idő)")
+    parser.add_argument("--max", action="store_true", help="szünetek nélkül, amilyen gyorsan csak lehet")
+    parser.add_argument("--write-delay", type=float, default=0.0, help="szimulált írási idő (s)")
+    parser.add_argument("--output", help="összegzés JSON fájlba")
+    args = parser.parse_args(argv)
+
+    header, records = command_trace.load(args.trace)
+    result = asyncio.run(run(records, None if args.max else args.speed, args.write_delay))
+    summary = summarize(result)
+    summary["trace"] = {"started": header.get("started"), "records": len(records)}
+    text = json.dumps(summary, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
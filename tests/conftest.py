@@ -0,0 +1,15 @@
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def dummy_bleak(monkeypatch):
+    """Create a dummy bleak module if bleak is missing."""
+    if "bleak" not in sys.modules:
+        dummy = types.ModuleType("bleak")
+        dummy.BleakError = type("BleakError", (Exception,), {})
+        dummy.BleakClient = object
+        dummy.BleakScanner = object
+        monkeypatch.setitem(sys.modules, "bleak", dummy)
@@ -0,0 +1,111 @@
+import asyncio
+import shutil
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.adapter_monitor import (  # noqa: E402
+    ADAPTER_INTERFACE,
+    OBJECT_MANAGER_INTERFACE,
+    PROPERTIES_INTERFACE,
+    AdapterMonitor,
+    BluezAdapterWatcher,
+)
+
+
+def test_waiter_is_woken_from_another_thread():
+    monitor = AdapterMonitor()
+    assert monitor.available  # ismeretlen állapot nem blokkol
+    monitor.set_powered(False)
+
+    async def scenario():
+        assert not await monitor.wait_available(timeout=0.01)
+        threading.Timer(0.05, monitor.set_powered, args=(True,)).start()
+        return await monitor.wait_available(timeout=2)
+
+    assert asyncio.run(scenario())
+    assert monitor.powered is True
+
+
+def test_watcher_maps_bluez_signals():
+    monitor = AdapterMonitor()
+    watcher = BluezAdapterWatcher(monitor)
+    path = "/org/bluez/hci0"
+
+    def changed(props, on=path):
+        return watcher.handle_signal(PROPERTIES_INTERFACE, "PropertiesChanged", on, [ADAPTER_INTERFACE, props, []])
+
+    assert changed({"Powered": False})
+    assert not monitor.available
+    assert not changed({"Alias": "x"})
+    assert not changed({"Powered": True}, on="/org/bluez/hci1")
+    added = [path, {ADAPTER_INTERFACE: {"Powered": True}}]
+    assert watcher.handle_signal(OBJECT_MANAGER_INTERFACE, "InterfacesAdded", "/", added)
+    assert monitor.powered is True
+    assert watcher.handle_signal(OBJECT_MANAGER_INTERFACE, "InterfacesRemoved", "/", [path, [ADAPTER_INTERFACE]])
+    assert monitor.powered is False
+
+
+def test_watcher_against_local_dbus_stand_in():
+    pytest.importorskip("dbus_fast")
+    if not shutil.which("dbus-daemon"):
+        pytest.skip("dbus-daemon nem elérhető")
+    from dbus_fast.aio import MessageBus
+    from dbus_fast.service import PropertyAccess, ServiceInterface, dbus_property
+
+    class FakeAdapter(ServiceInterface):
+        def __init__(self):
+            super().__init__(ADAPTER_INTERFACE)
+            self._powered = True
+
+        @dbus_property(access=PropertyAccess.READ)
+        def Powered(self) -> "b":  # noqa: F821
+            return self._powered
+
+        def set_powered(self, value):
+            self._powered = value
+            self.emit_properties_changed({"Powered": value})
+
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        address = daemon.stdout.readline().strip()
+
+        async def until(predicate):
+            for _ in range(200):
+                if predicate():
+                    return True
+                await asyncio.sleep(0.01)
+            return False
+
+        async def scenario():
+            bus = await MessageBus(bus_address=address).connect()
+            adapter = FakeAdapter()
+            bus.export("/org/bluez/hci0", adapter)
+            await bus.request_name("org.bluez")
+            monitor = AdapterMonitor()
+            task = asyncio.ensure_future(BluezAdapterWatcher(monitor, bus_address=address).run())
+            try:
+                assert await until(lambda: monitor.powered is True)
+                adapter.set_powered(False)
+                assert await until(lambda: monitor.powered is False)
+                adapter.set_powered(True)
+                assert await monitor.wait_available(timeout=2)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                bus.disconnect()
+            assert monitor.powered is None
+
+        asyncio.run(scenario())
+    finally:
+        daemon.terminate()
+        daemon.wait(5)
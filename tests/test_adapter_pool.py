@@ -0,0 +1,69 @@
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _modules():
+    return (
+        importlib.import_module("core.ble_controller"),
+        importlib.import_module("core.adapter_pool"),
+        importlib.import_module("core.sim_backend"),
+    )
+
+
+def _address(i):
+    return f"AA:BB:CC:DD:EE:{i:02X}"
+
+
+def test_devices_are_spread_across_virtual_adapters(dummy_bleak):
+    bc, ap, sim_backend = _modules()
+    sim = sim_backend.SimBackend(adapters=("hci0", "hci1", "hci2"), max_links=3)
+    pool = ap.AdapterPool(sim.adapter_names(), max_links=3)
+    controllers = []
+    for i in range(6):
+        sim.add_device(_address(i))
+        controllers.append(bc.BLEController(client_factory=sim.client, adapter_pool=pool))
+
+    async def scenario():
+        for i, controller in enumerate(controllers):
+            assert await controller.connect_with_retry(_address(i), attempts=1)
+            controller.target_address = _address(i)
+            await controller.send_command("7e000503ff000000ef")
+
+    asyncio.run(scenario())
+    snap = pool.snapshot()
+    assert [snap[a]["links"] for a in ("hci0", "hci1", "hci2")] == [2, 2, 2]
+    assert [len(sim.adapters[a].links) for a in ("hci0", "hci1", "hci2")] == [2, 2, 2]
+    assert sum(s["writes"] for s in snap.values()) == 6
+    assert 'led_adapter_links{adapter="hci1"} 2' in pool.metric_lines()
+
+
+def test_rssi_breaks_ties_between_equally_loaded_adapters(dummy_bleak):
+    _, ap, _ = _modules()
+    pool = ap.AdapterPool(["hci0", "hci1"])
+    pool.note_rssi(_address(1), "hci0", -85)
+    pool.note_rssi(_address(1), "hci1", -60)
+    assert pool.assign(_address(1)) == "hci1"
+    assert pool.assign(_address(2)) == "hci0"  # a terhelés előbb számít
+
+
+def test_repeated_failures_migrate_device_to_another_adapter(dummy_bleak):
+    bc, ap, sim_backend = _modules()
+    sim = sim_backend.SimBackend(adapters=("hci0", "hci1"))
+    sim.add_device(_address(7), failing_adapters={"hci0"})
+    pool = ap.AdapterPool(sim.adapter_names(), migrate_after=3)
+    controller = bc.BLEController(client_factory=sim.client, adapter_pool=pool)
+
+    assert asyncio.run(controller.connect_with_retry(_address(7), attempts=4, delay=0))
+    assert [(adapter, ok) for _, adapter, ok in sim.connect_attempts] == [
+        ("hci0", False),
+        ("hci0", False),
+        ("hci0", False),
+        ("hci1", True),
+    ]
+    assert controller.adapter == "hci1"
+    assert pool.migrations == 1
+    assert pool.snapshot()["hci1"]["links"] == 1
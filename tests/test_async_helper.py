@@ -0,0 +1,133 @@
+import asyncio
+import importlib
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class _Signal:
+    def __init__(self):
+        self.emitted = []
+        self.event = threading.Event()
+
+    def emit(self, value):
+        self.emitted.append(value)
+        self.event.set()
+
+
+def _helper(monkeypatch):
+    core = types.ModuleType("PySide6.QtCore")
+    core.Signal = _Signal
+    monkeypatch.setitem(sys.modules, "PySide6", types.ModuleType("PySide6"))
+    monkeypatch.setitem(sys.modules, "PySide6.QtCore", core)
+    monkeypatch.delitem(sys.modules, "gui.async_helper", raising=False)
+    module = importlib.import_module("gui.async_helper")
+    helper = module.AsyncHelper(None)
+    deadline = time.time() + 2
+    while not helper.loop.is_running() and time.time() < deadline:
+        time.sleep(0.01)
+    return helper
+
+
+def test_same_key_joins_in_flight_task(monkeypatch):
+    helper = _helper(monkeypatch)
+    runs = []
+
+    async def scan():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return ["dev"]
+
+    first, second = _Signal(), _Signal()
+    try:
+        f1 = helper.run_async_task(scan(), first, key="scan")
+        f2 = helper.run_async_task(scan(), second, key="scan")
+        assert f1 is f2
+        assert first.event.wait(2) and second.event.wait(2)
+    finally:
+        helper.stop_loop()
+    assert runs == [1]
+    assert first.emitted == second.emitted == [["dev"]]
+    assert not helper.in_flight("scan")
+
+
+def test_latest_wins_cancels_superseded_task(monkeypatch):
+    helper = _helper(monkeypatch)
+    done = []
+
+    async def write(value):
+        await asyncio.sleep(0.05)
+        done.append(value)
+        return value
+
+    old_ok, old_err, new_ok = _Signal(), _Signal(), _Signal()
+    try:
+        old = helper.run_async_task(write(10), old_ok, old_err, key="led-brightness", policy="latest")
+        new = helper.run_async_task(write(90), new_ok, key="led-brightness", policy="latest")
+        assert new_ok.event.wait(2)
+    finally:
+        helper.stop_loop()
+    assert old.cancelled()
+    assert new.result(timeout=1) == 90
+    assert done == [90]
+    assert not old_ok.emitted and not old_err.emitted
+
+
+def _format_report_synchronously():
+    time.sleep(0.2)  # pl. szinkron traceback formázás a hurok szálán
+
+
+def test_slow_callback_is_recorded_with_coroutine_and_stack(monkeypatch):
+    helper = _helper(monkeypatch)
+    helper.slow_callbacks.threshold = 0.05
+
+    async def save_settings():
+        await asyncio.sleep(0)
+        _format_report_synchronously()
+        return True
+
+    async def fast():
+        await asyncio.sleep(0.01)
+
+    done = _Signal()
+    try:
+        helper.run_async_task(fast())
+        helper.run_async_task(save_settings(), done)
+        assert done.event.wait(2)
+    finally:
+        helper.stop_loop()
+    top = helper.slow_callback_snapshot()["top"]
+    assert len(top) == 1
+    assert top[0]["name"].startswith("task other:") and top[0]["name"].endswith(".save_settings")
+    assert top[0]["count"] == 1 and top[0]["max"] >= 0.2
+    assert "_format_report_synchronously" in top[0]["stack"]
+
+
+def test_root_span_ends_when_task_completes(monkeypatch):
+    from core.tracing import Tracer
+
+    helper = _helper(monkeypatch)
+    tracer = Tracer()
+    tracer.enabled = True
+    root = tracer.start_trace("ui.send_color_command")
+    ok = _Signal()
+
+    async def write():
+        await asyncio.sleep(0.1)
+        return True
+
+    try:
+        future = helper.run_async_task(write(), ok, kind="write", trace=root)
+        assert "ui.send_color_command" not in {e["name"] for e in tracer.chrome_trace()["traceEvents"]}
+        assert future.result(timeout=2) is True
+        assert ok.event.wait(2)
+    finally:
+        helper.stop_loop()
+    events = {e["name"]: e for e in tracer.chrome_trace()["traceEvents"]}
+    assert set(events) == {"async.queue", "async.write", "ui.send_color_command"}
+    assert events["ui.send_color_command"]["args"]["failed"] is False
+    assert events["ui.send_color_command"]["dur"] >= events["async.write"]["dur"] >= 100_000
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent / "benchmarks"))
+
+import _bench  # noqa: E402
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {
+        "fast": {"min_ms": 0.01},
+        "stable": {"min_ms": 10.0},
+        "slower": {"min_ms": 10.0},
+        "removed": {"min_ms": 1.0},
+    }
+    results = {"fast": {"min_ms": 0.05}, "stable": {"min_ms": 12.0}, "slower": {"min_ms": 20.0}}
+    # a "fast" 5x lassabb, de az eltérés a zajküszöb alatt marad
+    assert [r[0] for r in _bench.compare(results, baseline)] == ["slower"]
+    # kétszer lassabb gépen a kétszeres idő nem regresszió
+    assert _bench.compare(results, baseline, speed=2.0) == []
+
+
+def test_measure_calibrates_calls_per_round():
+    calls = []
+    samples, number = _bench.measure(lambda: calls.append(1), rounds=3, round_seconds=0.001)
+    assert len(samples) == 3
+    assert number > 1
+    assert len(calls) >= number * 3
@@ -1,30 +1,17 @@
+import importlib
 import sys
-import types
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
-
-def _ensure_dummy_bleak(monkeypatch):
-    """Create a dummy bleak module if bleak is missing."""
-    if "bleak" not in sys.modules:
-        dummy = types.ModuleType("bleak")
-        dummy.BleakError = type("BleakError", (Exception,), {})
-        dummy.BleakClient = object
-        dummy.BleakScanner = object
-        monkeypatch.setitem(sys.modules, "bleak", dummy)
-
-
-import importlib  # noqa: E402
+import pytest
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def setup_module(module):
-    # ensure bleak dummy present and reload controller
-    from _pytest.monkeypatch import MonkeyPatch
 
-    mp = MonkeyPatch()
-    _ensure_dummy_bleak(mp)
-    module.bc = importlib.import_module("core.ble_controller")
+@pytest.fixture(autouse=True)
+def _controller_module(dummy_bleak):
+    # bleak csonk (ha hiányzik), majd a controller modul betöltése
+    global bc
+    bc = importlib.import_module("core.ble_controller")
 
 
 def test_is_bluetooth_off_error_by_winerror():
@@ -42,3 +29,63 @@ def test_is_bluetooth_off_error_by_message():
         else Exception("Bluetooth adapter is off")
     )
     assert controller._is_bluetooth_off_error(err)
+
+
+def test_connect_waits_for_foreign_attempt_instead_of_racing():
+    import asyncio
+
+    controller = bc.BLEController()  # noqa: F821
+    assert controller.begin_connect("aa:bb")  # pl. a reconnect loop szála
+    assert not controller.begin_connect("AA:BB")
+
+    class Connected:
+        address = "AA:BB"
+        is_connected = True
+
+    async def scenario():
+        waiter = asyncio.ensure_future(controller.connect("AA:BB"))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        controller.client = Connected()
+        controller.end_connect("aa:bb")
+        return await waiter
+
+    assert asyncio.run(scenario()) is True
+    assert not controller.connect_in_flight("AA:BB")
+
+
+def test_user_command_preempts_manual_scan(monkeypatch):
+    import asyncio
+
+    class Scanner:
+        @staticmethod
+        async def discover(timeout=None):
+            await asyncio.sleep(timeout)
+            return []
+
+    class Client:
+        is_connected = True
+        writes = []
+
+        async def write_gatt_char(self, char, data, response=False):
+            self.writes.append(data)
+
+    monkeypatch.setattr(bc, "BleakScanner", Scanner)
+    controller = bc.BLEController()
+    controller.fast_writer = None
+    controller.client = Client()
+    preemptions = controller.scheduler.preemptions
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        scan = asyncio.ensure_future(controller.scan())
+        await asyncio.sleep(0.01)
+        started = loop.time()
+        await controller.send_command("7e000503ff000000ef")
+        waited = loop.time() - started
+        return await scan, waited
+
+    devices, waited = asyncio.run(scenario())
+    assert devices == [] and waited < 1.0
+    assert Client.writes == [bytes.fromhex("7e000503ff000000ef")]
+    assert controller.scheduler.preemptions == preemptions + 1
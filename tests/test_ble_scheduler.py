@@ -0,0 +1,100 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.ble_scheduler import OperationPreempted, OperationScheduler, Priority  # noqa: E402
+from core.latency_stats import LatencyRecorder  # noqa: E402
+
+
+def _scheduler():
+    return OperationScheduler("test", recorder=LatencyRecorder())
+
+
+def test_waiters_are_served_by_priority():
+    sched = _scheduler()
+    order = []
+
+    async def op(priority, label):
+        async with sched.slot(priority, label):
+            order.append(label)
+            await asyncio.sleep(0)
+
+    async def scenario():
+        async with sched.slot(Priority.KEEPALIVE, "holder"):
+            tasks = [
+                asyncio.ensure_future(op(Priority.SCAN, "scan")),
+                asyncio.ensure_future(op(Priority.KEEPALIVE, "ping")),
+                asyncio.ensure_future(op(Priority.SCHEDULE, "schedule")),
+                asyncio.ensure_future(op(Priority.USER, "user")),
+            ]
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order == ["user", "schedule", "ping", "scan"]
+    assert sched.snapshot()["wait"]["USER"]["count"] == 1
+
+
+def test_user_command_preempts_background_scan():
+    sched = _scheduler()
+    result = {}
+
+    async def background_scan():
+        try:
+            async with sched.slot(Priority.SCAN, "rescan", preemptible=True) as grant:
+                await grant.run(asyncio.sleep(10))
+        except OperationPreempted:
+            result["scan"] = "preempted"
+
+    async def user_write():
+        await asyncio.sleep(0.01)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with sched.slot(Priority.USER, "write"):
+            result["wait"] = loop.time() - started
+
+    async def scenario():
+        await asyncio.gather(background_scan(), user_write())
+
+    asyncio.run(scenario())
+    assert result["scan"] == "preempted"
+    assert result["wait"] < 1.0
+    assert sched.preemptions == 1
+
+
+def test_handoff_between_event_loops():
+    sched = _scheduler()
+    held = threading.Event()
+    release = threading.Event()
+    got = []
+
+    def other_loop():
+        async def hold():
+            async with sched.slot(Priority.KEEPALIVE, "keep-alive"):
+                held.set()
+                while not release.is_set():
+                    await asyncio.sleep(0.005)
+
+        asyncio.run(hold())
+
+    thread = threading.Thread(target=other_loop)
+    thread.start()
+    held.wait(2)
+
+    async def user():
+        async with sched.slot(Priority.USER, "write"):
+            got.append("user")
+
+    async def scenario():
+        task = asyncio.ensure_future(user())
+        await asyncio.sleep(0.02)
+        assert not got
+        release.set()
+        await asyncio.wait_for(task, 2)
+
+    asyncio.run(scenario())
+    thread.join(2)
+    assert got == ["user"] and not sched.busy
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.bluez_write import AcquiredWriter, acquire_write_fd  # noqa: E402
+
+CHAR_PATH = "/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF/service000c/char000d"
+FRAME = bytes.fromhex("7e000503ff000000ef")
+
+
+class Char:
+    path = CHAR_PATH
+
+
+def test_frames_go_to_acquired_socket_and_fall_back_when_broken():
+    device_end, app_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    acquired = []
+
+    async def acquire(path):
+        acquired.append(path)
+        return os.dup(app_end.fileno()), 23
+
+    writer = AcquiredWriter(acquire)
+    client = object()
+
+    async def scenario():
+        assert await writer.write(client, Char(), FRAME)
+        assert not await writer.write(client, Char(), b"\x00" * 21)  # nem fér bele az MTU-ba
+        assert not writer.active  # a bleak írás előtt elengedve
+        assert await writer.write(client, Char(), FRAME)  # újra megszerzi
+        assert [device_end.recv(64) for _ in range(2)] == [FRAME, FRAME]
+        device_end.close()
+        return [await writer.write(client, Char(), FRAME) for _ in range(2)]
+
+    assert asyncio.run(scenario()) == [False, False]
+    app_end.close()
+    assert acquired == [CHAR_PATH, CHAR_PATH]
+    assert not writer.active
+    assert (writer.frames, writer.fallbacks) == (2, 3)
+
+
+def test_refused_acquire_is_not_retried_for_same_client():
+    calls = []
+
+    async def acquire(path):
+        calls.append(path)
+        raise OSError("org.bluez.Error.NotPermitted: Write acquired")
+
+    writer = AcquiredWriter(acquire)
+    client = object()
+
+    async def scenario():
+        return [await writer.write(client, Char(), FRAME) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [False, False, False]
+    assert len(calls) == 1
+
+
+def test_acquire_write_against_local_dbus_stand_in(tmp_path):
+    pytest.importorskip("dbus_fast")
+    if not shutil.which("dbus-daemon"):
+        pytest.skip("dbus-daemon nem elérhető")
+    from dbus_fast.aio import MessageBus
+    from dbus_fast.service import ServiceInterface, method
+
+    device_end, app_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+
+    class FakeCharacteristic(ServiceInterface):
+        def __init__(self):
+            super().__init__("org.bluez.GattCharacteristic1")
+
+        @method()
+        def AcquireWrite(self, options: "a{sv}") -> "hq":  # noqa: F722,F821
+            return [app_end.fileno(), 185]
+
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        address = daemon.stdout.readline().strip()
+
+        async def scenario():
+            service_bus = await MessageBus(bus_address=address, negotiate_unix_fd=True).connect()
+            service_bus.export(CHAR_PATH, FakeCharacteristic())
+            await service_bus.request_name("org.bluez")
+            try:
+                fd, mtu = await acquire_write_fd(CHAR_PATH, bus_address=address)
+                os.write(fd, FRAME)
+                os.close(fd)
+                return mtu
+            finally:
+                service_bus.disconnect()
+
+        assert asyncio.run(scenario()) == 185
+        assert device_end.recv(64) == FRAME
+    finally:
+        daemon.terminate()
+        daemon.wait(5)
+        device_end.close()
+        app_end.close()
+
+
+def test_keep_alive_goes_through_acquired_socket(dummy_bleak):
+    import importlib
+    import threading
+    import types
+
+    bc = importlib.import_module("core.ble_controller")
+    rh = importlib.import_module("core.reconnect_handler")
+    device_end, app_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+
+    async def acquire(path):
+        return os.dup(app_end.fileno()), 23
+
+    class Client:
+        address = "AA:BB:CC:DD:EE:FF"
+        is_connected = True
+        bleak_writes = []
+
+        async def write_gatt_char(self, char, data, response=False):
+            if controller.fast_writer.active:
+                raise bc.BleakError("[org.bluez.Error.NotPermitted] Write acquired")
+            self.bleak_writes.append(data)
+
+        async def disconnect(self):
+            self.is_connected = False
+
+    controller = bc.BLEController()
+    controller.fast_writer = AcquiredWriter(acquire)
+    controller.client = client = Client()
+    controller._write_char = (client, Char())
+    stop = threading.Event()
+    note_ping = controller.keep_alive.note_ping
+    controller.keep_alive.note_ping = lambda address: (note_ping(address), stop.set())
+    app = types.SimpleNamespace(selected_device=("LED", client.address), ble=controller, connection_status="connected")
+    oversized = "7e" + "00" * 30 + "ef"
+
+    async def scenario():
+        await controller.send_command(FRAME.hex())  # megszerzi a descriptort
+        await controller.send_command(oversized)  # bleak írás, előtte elengedve
+        await controller.send_command(FRAME.hex())  # újra megszerzi
+        await rh.start_ble_connection_loop(app, stop)  # egy ping, majd kilép
+
+    try:
+        asyncio.run(scenario())
+        frames = [device_end.recv(64) for _ in range(3)]
+        assert frames == [FRAME, FRAME, bytes.fromhex(rh.KEEP_ALIVE_COMMAND)]
+    finally:
+        device_end.close()
+        app_end.close()
+        controller.fast_writer.close()
+    assert controller.keep_alive.report(client.address)["pings"] == 1
+    assert client.bleak_writes == [bytes.fromhex(oversized)]
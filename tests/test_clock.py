@@ -0,0 +1,67 @@
+import asyncio
+import importlib
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core import clock  # noqa: E402
+
+
+def _modules():
+    return (
+        importlib.import_module("core.ble_controller"),
+        importlib.import_module("core.adapter_pool"),
+        importlib.import_module("core.sim_backend"),
+    )
+
+
+def test_virtual_loop_sleeps_instantly_in_order():
+    virtual = clock.VirtualClock(datetime(2024, 1, 1, tzinfo=timezone.utc))
+    loop = virtual.new_event_loop()
+    woke = []
+
+    async def sleeper(name, seconds):
+        await asyncio.sleep(seconds)
+        woke.append((name, virtual.monotonic()))
+
+    async def scenario():
+        await asyncio.gather(sleeper("nap", 86400), sleeper("óra", 3600), sleeper("hét", 7 * 86400))
+        try:
+            await asyncio.wait_for(asyncio.Event().wait(), timeout=30)
+        except asyncio.TimeoutError:
+            woke.append(("timeout", virtual.monotonic()))
+
+    started = time.perf_counter()
+    try:
+        loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+    assert time.perf_counter() - started < 1.0
+    assert woke == [("óra", 3600), ("nap", 86400), ("hét", 7 * 86400), ("timeout", 7 * 86400 + 30)]
+    assert virtual.now(timezone.utc) == datetime(2024, 1, 8, 0, 0, 30, tzinfo=timezone.utc)
+
+
+def test_reconnect_storm_runs_in_virtual_time(monkeypatch, dummy_bleak):
+    bc, ap, sim_backend = _modules()
+    virtual = clock.VirtualClock()
+    monkeypatch.setattr(clock, "_current", virtual)
+    sim = sim_backend.SimBackend(adapters=("hci0", "hci1"), connect_delay=2.0)
+    sim.add_device("AA:BB:CC:DD:EE:01", failing_adapters=("hci0", "hci1"))
+    controller = bc.BLEController(client_factory=sim.client, adapter_pool=ap.AdapterPool(sim.adapter_names()))
+
+    loop = virtual.new_event_loop()
+    started = time.perf_counter()
+    try:
+        with pytest.raises(sim_backend.BleakError):
+            loop.run_until_complete(controller.connect_with_retry("AA:BB:CC:DD:EE:01", attempts=200, delay=60))
+    finally:
+        loop.close()
+    assert len(sim.connect_attempts) == 200
+    assert {adapter for _, adapter, _ in sim.connect_attempts} == {"hci0", "hci1"}
+    assert virtual.monotonic() == 200 * 2.0 + 199 * 60
+    assert time.perf_counter() - started < 5.0
@@ -0,0 +1,87 @@
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core import clock  # noqa: E402
+
+ADDR = "AA:BB:CC:DD:EE:01"
+RED = "7e000503ff000000ef"
+BLUE = "7e0005030000ff00ef"
+
+
+def _modules():
+    return (
+        importlib.import_module("core.ble_controller"),
+        importlib.import_module("core.adapter_pool"),
+        importlib.import_module("core.sim_backend"),
+        importlib.import_module("core.command_trace"),
+    )
+
+
+def _controller(bc, ap, sim, trace):
+    sim.add_device(ADDR)
+    return bc.BLEController(
+        client_factory=sim.client, adapter_pool=ap.AdapterPool(sim.adapter_names()), command_trace=trace
+    )
+
+
+def test_capture_and_replay_in_virtual_time(dummy_bleak, tmp_path):
+    bc, ap, sim_backend, command_trace = _modules()
+    virtual = clock.VirtualClock()
+    path = tmp_path / "trace.jsonl"
+    trace = command_trace.CommandTrace(clock=virtual.monotonic)
+    sim = sim_backend.SimBackend(write_delay=0.5)
+    controller = _controller(bc, ap, sim, trace)
+
+    async def capture():
+        await controller.connect_with_retry(ADDR, attempts=1)
+        controller.target_address = ADDR
+        assert trace.open(path)
+        await controller.apply_state(power=True, color=RED, cause="schedule")
+        await asyncio.sleep(10)
+        await asyncio.gather(controller.send_command(BLUE), controller.send_command(RED))
+        trace.close()
+        await controller.send_command(BLUE)  # lezárt trace: nem kerül bele
+
+    loop = virtual.new_event_loop()
+    try:
+        loop.run_until_complete(capture())
+    finally:
+        loop.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"t": 12.0, "fra')  # félbeszakadt utolsó sor
+
+    header, records = command_trace.load(path)
+    assert header["format"] == command_trace.TRACE_FORMAT
+    assert [(r.cause, r.frame) for r in records] == [
+        ("schedule", RED),
+        ("user", BLUE),
+        ("user", RED),
+    ]
+    assert [r.t for r in records] == [0.0, 10.5, 10.5]
+    assert [r.w for r in records] == [0.0, 10.5, 11.0]  # a második a slotra várt
+    assert all(r.ok and r.address == ADDR for r in records)
+
+    replay_clock = clock.VirtualClock()
+    replay_sim = sim_backend.SimBackend(write_delay=0.5)
+    target = _controller(bc, ap, replay_sim, command_trace.CommandTrace())
+
+    async def replay(speed):
+        await target.connect_with_retry(ADDR, attempts=1)
+        target.target_address = ADDR
+        return await command_trace.replay(target, records, speed=speed)
+
+    loop = replay_clock.new_event_loop()
+    try:
+        real_time = loop.run_until_complete(replay(1.0))
+        as_fast = loop.run_until_complete(replay(None))
+    finally:
+        loop.close()
+    assert real_time.sent == 3 and real_time.failed == 0
+    assert real_time.lag == [0.5, 0.5, 1.0]  # a két azonos idejű frame sorban áll
+    assert real_time.duration == 11.5
+    assert as_fast.duration == 1.5
+    assert replay_sim.frames(ADDR) == [r.frame for r in records] * 2
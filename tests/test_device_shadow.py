@@ -0,0 +1,79 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.device_shadow import OFF_COMMAND, DeviceShadow, brightness_command  # noqa: E402
+
+RED = "7e000503ff000000ef"
+GREEN = "7e00050300ff0000ef"
+
+
+def test_identical_writes_are_suppressed():
+    shadow = DeviceShadow("AA")
+    assert shadow.set_desired(power=True, color=RED) == [RED]
+    shadow.acknowledge(RED)
+    assert shadow.set_desired(power=True, color=RED) == []
+    assert shadow.set_desired(power=False) == [OFF_COMMAND]
+    shadow.acknowledge(OFF_COMMAND)
+    assert shadow.set_desired(power=False) == []
+    assert shadow.suppressed_writes == 2
+
+
+def test_reconcile_replays_single_frame_after_link_loss():
+    now = [0.0]
+    shadow = DeviceShadow("AA", intent_grace=5.0, clock=lambda: now[0])
+    shadow.acknowledge(shadow.set_desired(power=True, color=RED)[0])
+    shadow.mark_link_lost()
+
+    frames = shadow.set_desired(color=GREEN)
+    assert shadow.buffer_intent(frames) == 0.0
+    now[0] = 3.0
+    assert shadow.buffer_intent(shadow.set_desired(color=GREEN)) == 3.0
+
+    assert shadow.reconcile_frames() == [GREEN]
+    assert shadow.reconcile_frames() == [GREEN]
+
+
+def test_reconcile_includes_buffered_brightness():
+    shadow = DeviceShadow("AA")
+    shadow.set_desired(power=False)
+    shadow.buffer_intent(shadow.set_desired(brightness=40))
+    assert shadow.reconcile_frames() == [OFF_COMMAND, brightness_command(40)]
+
+
+def _controller():
+    import importlib
+
+    bc = importlib.import_module("core.ble_controller")
+    return bc.BLEController()
+
+
+class FakeClient:
+    address = "AA"
+
+    def __init__(self):
+        self.is_connected = True
+        self.writes = []
+
+    async def write_gatt_char(self, uuid, data, response=False):
+        self.writes.append(data.hex())
+
+
+def test_controller_apply_state_writes_only_changes(dummy_bleak):
+    controller = _controller()
+    controller.target_address = "AA"
+    controller.client = FakeClient()
+
+    async def scenario():
+        assert await controller.apply_state(power=True, color=RED)
+        assert not await controller.apply_state(power=True, color=RED)
+        controller.client.is_connected = False
+        controller.on_link_lost()
+        assert not await controller.apply_state(power=False)
+        controller.client.is_connected = True
+        assert await controller.reconcile()
+
+    asyncio.run(scenario())
+    assert controller.client.writes == [RED, OFF_COMMAND]
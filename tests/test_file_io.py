@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core import file_io  # noqa: E402
+
+
+def test_queued_saves_coalesce_and_use_snapshots(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.json"
+    service = file_io.FileIOService()
+    writing, release = threading.Event(), threading.Event()
+    written = []
+    real_write = file_io.write_atomic
+
+    def slow_write(target, text):
+        writing.set()
+        release.wait(2)  # az első írás alatt gyűlnek a további mentések
+        written.append(json.loads(text))
+        real_write(target, text)
+
+    monkeypatch.setattr(file_io, "write_atomic", slow_write)
+    results = []
+    service.start()
+    try:
+        profiles = {"Este": {"active": True}}
+        service.save_json(path, profiles, on_done=lambda p, e: results.append(("first", e)))
+        assert writing.wait(2)
+        for i in range(5):
+            profiles["Este"]["n"] = i
+            service.save_json(path, profiles, on_done=lambda p, e: results.append(("later", e)))
+        profiles["Este"]["n"] = 99  # a már sorba állított pillanatképet nem érinti
+        release.set()
+        assert service.flush(path, timeout=2)
+    finally:
+        service.stop()
+    assert len(written) == 2 and service.coalesced == 4
+    assert json.loads(path.read_text(encoding="utf-8")) == {"Este": {"active": True, "n": 4}}
+    assert results == [("first", None)] + [("later", None)] * 5
+    assert [p.name for p in tmp_path.iterdir()] == ["profiles.json"]  # nem maradt .tmp
+
+
+def test_failed_write_keeps_old_file_and_reports(tmp_path, monkeypatch):
+    path = tmp_path / "led_settings.json"
+    path.write_text('{"brightness_level": 80}', encoding="utf-8")
+    service = file_io.FileIOService()
+    errors = []
+    service.add_listener(lambda p, e: errors.append((os.path.basename(p), e)))
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(file_io.os, "replace", failing_replace)
+    assert not service.save_json(path, {"brightness_level": 10})  # nem indult el: szinkron
+    assert errors == [("led_settings.json", "disk full")]
+    assert json.loads(path.read_text(encoding="utf-8")) == {"brightness_level": 80}
+    assert [p.name for p in tmp_path.iterdir()] == ["led_settings.json"]
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.gatt_cache import GattCache  # noqa: E402
+
+UUID = "0000fff3-0000-1000-8000-00805f9b34fb"
+
+
+class Char:
+    def __init__(self, handle, uuid):
+        self.handle = handle
+        self.uuid = uuid
+        self.service_uuid = "0000fff0-0000-1000-8000-00805f9b34fb"
+
+
+class Services:
+    def __init__(self, chars):
+        self.chars = {c.handle: c for c in chars}
+        self.uuid_lookups = 0
+
+    def get_characteristic(self, specifier):
+        if isinstance(specifier, int):
+            return self.chars.get(specifier)
+        self.uuid_lookups += 1
+        return next((c for c in self.chars.values() if c.uuid == specifier), None)
+
+
+class Client:
+    def __init__(self, chars):
+        self.services = Services(chars)
+
+
+def test_handle_is_persisted_and_reused(tmp_path):
+    path = str(tmp_path / "gatt_cache.json")
+    first = GattCache(path).resolve(Client([Char(12, UUID)]), "aa:bb", UUID)
+    assert first.handle == 12
+
+    cache = GattCache(path)
+    client = Client([Char(12, UUID)])
+    assert cache.resolve(client, "AA:BB", UUID).handle == 12
+    assert client.services.uuid_lookups == 0
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_stale_handle_falls_back_to_uuid(tmp_path):
+    path = str(tmp_path / "gatt_cache.json")
+    GattCache(path).resolve(Client([Char(12, UUID)]), "AA:BB", UUID)
+
+    cache = GattCache(path)
+    assert cache.resolve(Client([Char(12, "other"), Char(14, UUID)]), "AA:BB", UUID).handle == 14
+    assert cache.get("AA:BB")["handle"] == 14
@@ -0,0 +1,130 @@
+import asyncio
+import importlib
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.device_shadow import UNKNOWN_STATE  # noqa: E402
+from core.keep_alive import MIN_INTERVAL, KeepAliveScheduler  # noqa: E402
+
+ADDR = "AA:BB"
+
+
+def test_any_write_postpones_keep_alive():
+    ka = KeepAliveScheduler(initial_interval=5.0)
+    ka.note_connected(ADDR, now=0.0)
+    assert not ka.due(ADDR, now=4.0)
+    ka.note_write(ADDR, now=4.0)
+    assert not ka.due(ADDR, now=8.0)
+    assert ka.due(ADDR, now=9.0)
+
+
+def test_interval_grows_until_learned_ceiling():
+    ka = KeepAliveScheduler(initial_interval=5.0)
+    now = 0.0
+    ka.note_connected(ADDR, now=now)
+    for _ in range(9):
+        now += ka.interval(ADDR)
+        ka.note_ping(ADDR, now=now)
+    grown = ka.interval(ADDR)
+    assert grown > 5.0
+
+    # Tétlen bontás: a plafon a bontást megelőző tétlen idő alá kerül
+    ka.note_disconnect(ADDR, now=now + 8.0)
+    assert ka.interval(ADDR) <= 8.0 * 0.8
+    ka.note_connected(ADDR, now=100.0)
+    now = 100.0
+    for _ in range(30):
+        now += ka.interval(ADDR)
+        ka.note_ping(ADDR, now=now)
+    assert MIN_INTERVAL <= ka.interval(ADDR) <= 8.0 * 0.8
+
+
+def test_busy_link_drop_does_not_lower_ceiling():
+    ka = KeepAliveScheduler(initial_interval=10.0)
+    ka.note_connected(ADDR, now=0.0)
+    ka.note_write(ADDR, now=50.0)
+    ka.note_disconnect(ADDR, now=51.0)
+    report = ka.report(ADDR, now=51.0)
+    assert report["ceiling"] is None and report["supervision_drops"] == 0
+    # Csatlakozás nélküli (sikertelen próbálkozás utáni) bontás sem tanít semmit
+    ka.note_disconnect(ADDR, now=500.0)
+    assert ka.report(ADDR)["ceiling"] is None
+
+
+def test_report_counts_writes_saved():
+    ka = KeepAliveScheduler(initial_interval=20.0)
+    ka.note_connected(ADDR, now=0.0)
+    for t in range(20, 3601, 20):
+        ka.note_ping(ADDR, now=float(t))
+    report = ka.report(ADDR, now=3600.0)
+    assert report["writes_saved_per_hour"] >= 720 - report["pings"] - 1
+    assert "megspórolt" in ka.format_report(ADDR, now=3600.0)
+
+
+def test_controller_connect_starts_keep_alive_session(monkeypatch, dummy_bleak):
+    bc = importlib.import_module("core.ble_controller")
+
+    class Client:
+        def __init__(self, address):
+            self.address = address
+            self.is_connected = False
+
+        async def connect(self, timeout=None):
+            self.is_connected = True
+
+    monkeypatch.setattr(bc, "BleakClient", Client)
+    now = [0.0]
+    controller = bc.BLEController()
+    controller.keep_alive = KeepAliveScheduler(clock=lambda: now[0])
+    assert asyncio.run(controller.connect_with_retry(ADDR))
+    now[0] = 30.0
+    assert controller.keep_alive.report(ADDR)["connected_seconds"] == 30.0
+
+
+@pytest.mark.parametrize("error", ["BleakError", "RuntimeError"])
+def test_failed_ping_marks_link_lost(dummy_bleak, error):
+    bc = importlib.import_module("core.ble_controller")
+    rh = importlib.import_module("core.reconnect_handler")
+    stop = threading.Event()
+
+    class Client:
+        address = ADDR
+        is_connected = True
+
+        async def write_gatt_char(self, char, data, response=False):
+            stop.set()  # a hibaág után a loop kilép
+            raise bc.BleakError("Not connected") if error == "BleakError" else RuntimeError("dbus hiba")
+
+        async def disconnect(self):
+            self.is_connected = False
+
+    class Writer:
+        closed = 0
+
+        async def write(self, client, char, data):
+            return False  # nincs megszerzett descriptor, bleak írás
+
+        def close(self):
+            self.closed += 1
+
+    controller = bc.BLEController()
+    controller.fast_writer = writer = Writer()
+    controller.client = Client()
+    controller.target_address = ADDR
+    controller.shadow_for().acknowledge("7e000503ff000000ef")
+    events = []
+    controller.adapter_pool.note_disconnected = lambda address: events.append(("pool", address))
+    controller.keep_alive.note_disconnect = lambda address: events.append(("keep-alive", address))
+    app = types.SimpleNamespace(selected_device=("LED", ADDR), ble=controller, connection_status="connected")
+
+    asyncio.run(rh.start_ble_connection_loop(app, stop))
+    assert app.connection_status == "disconnected" and controller.client is None
+    assert controller.shadow_for().reported == UNKNOWN_STATE  # az új parancsok pufferelődnek
+    assert writer.closed == 1
+    assert sorted(events) == [("keep-alive", ADDR), ("pool", ADDR)]
@@ -0,0 +1,50 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.latency_stats import LatencyRecorder, RollingHistogram, percentile  # noqa: E402
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) is None
+
+
+def test_histogram_drops_samples_outside_window():
+    now = [0.0]
+    hist = RollingHistogram(window=10.0, clock=lambda: now[0])
+    hist.add(1.0)
+    now[0] = 5.0
+    hist.add(3.0)
+    now[0] = 12.0
+    summary = hist.summary()
+    assert summary["count"] == 1 and summary["p50"] == 3.0
+    assert hist.total_count == 2
+
+
+def test_recorder_snapshot_per_kind_from_threads():
+    rec = LatencyRecorder()
+
+    def worker():
+        for i in range(100):
+            rec.record("write", 0.001, i / 1000.0, failed=(i == 0))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    rec.record("scan", 0.0, 2.0)
+    rec.record_loop_lag(0.004)
+
+    snap = rec.snapshot()
+    assert set(snap["kinds"]) == {"write", "scan"}
+    write = snap["kinds"]["write"]
+    assert write["total"] == 400 and write["errors"] == 4
+    assert write["exec"]["p99"] >= write["exec"]["p50"]
+    assert snap["loop_lag"]["count"] == 1
@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import core.memory_utils as mu  # noqa: E402
+
+
+def test_get_rss_bytes_positive():
+    rss = mu.get_rss_bytes()
+    assert rss is None or rss > 0
+
+
+def test_peak_rss_not_below_current():
+    rss, peak = mu.get_rss_bytes(), mu.get_peak_rss_bytes()
+    assert peak is None or rss is None or peak >= rss
+
+
+def test_format_bytes():
+    assert mu.format_bytes(None) == "N/A"
+    assert mu.format_bytes(512) == "512 B"
+    assert mu.format_bytes(3 * 1024 * 1024) == "3.0 MiB"
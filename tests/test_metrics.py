@@ -0,0 +1,71 @@
+import socket
+import sys
+import threading
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.metrics import MetricsExporter, MetricsRegistry  # noqa: E402
+
+
+def test_render_aggregates_events_from_threads():
+    now = [0.0]
+    reg = MetricsRegistry(clock=lambda: now[0])
+    reg.connection_state(True)
+
+    def writer():
+        for _ in range(250):
+            reg.write_result(True, 0.02)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    reg.write_result(False)
+    reg.reconnect_attempt("link_lost")
+    reg.reconnect_attempt("link_lost")
+    reg.rescan()
+    reg.schedule_transition("off")
+    now[0] = 30.0
+    reg.connection_state(False)
+    now[0] = 100.0
+
+    text = reg.render()
+    assert "led_connected 0" in text
+    assert "led_connected_seconds_total 30.000" in text
+    assert 'led_writes_total{result="ok"} 1000' in text
+    assert 'led_writes_total{result="error"} 1' in text
+    assert 'led_reconnect_attempts_total{reason="link_lost"} 2' in text
+    assert "led_rescans_total 1" in text
+    assert 'led_schedule_transitions_total{action="off"} 1' in text
+    assert 'led_write_latency_seconds_bucket{le="0.01"} 0' in text
+    assert 'led_write_latency_seconds_bucket{le="0.025"} 1000' in text
+    assert 'led_write_latency_seconds_bucket{le="+Inf"} 1000' in text
+
+
+def test_exporter_writes_file_and_serves_http(tmp_path):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    reg = MetricsRegistry()
+    reg.rescan()
+    exporter = MetricsExporter(reg, tmp_path / "metrics.prom", interval=60, http_port=port)
+    exporter.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+    finally:
+        exporter.stop()
+    assert "led_rescans_total 1" in body
+    assert "led_rescans_total 1" in (tmp_path / "metrics.prom").read_text(encoding="utf-8")
+
+
+def test_disabled_registry_does_not_queue_events():
+    reg = MetricsRegistry(enabled=False)
+    for _ in range(100):
+        reg.write_result(True, 0.01)
+        reg.connection_state(True)
+    assert len(reg._events) == 0
+    assert reg.snapshot()["write_count"] == 0
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.palette import PaletteRegistry, color_command  # noqa: E402
+
+
+def _registry():
+    return PaletteRegistry(
+        [
+            ("Piros", "#ff0000", "7e000503ff000000ef"),
+            ("Zöld", "#00ff00", "7e00050300ff0000ef"),
+        ]
+    )
+
+
+def test_lookups_by_name_and_command():
+    palette = _registry()
+    assert palette.command_for("Zöld") == "7e00050300ff0000ef"
+    assert palette.hex_for("Nincs", "#ffffff") == "#ffffff"
+    assert palette.by_command("7e000503ff000000ef").name == "Piros"
+    assert palette[0][0] == "Piros"
+    assert color_command("#FF0000") == palette.command_for("Piros")
+
+
+def test_events_and_index_maintenance():
+    palette = _registry()
+    events = []
+
+    def listener(event):
+        events.append((event.kind, event.index, event.entry.name))
+
+    palette.subscribe(listener)
+    palette.add("Kék", "#0000ff")
+    palette.remove("Piros")
+    palette.rename("Kék", "Égkék")
+
+    assert events == [("added", 2, "Kék"), ("removed", 0, "Piros"), ("renamed", 1, "Égkék")]
+    assert palette.index_of("Égkék") == 1
+    assert palette.by_command("7e0005030000ff00ef").name == "Égkék"
+    assert palette.names() == ["Zöld", "Égkék"]
+
+
+def test_duplicate_names_rejected():
+    palette = _registry()
+    with pytest.raises(ValueError):
+        palette.add("Piros", "#ff0001")
+    with pytest.raises(AttributeError):
+        palette[0].name = "x"
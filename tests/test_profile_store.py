@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.profile_store import LazySchedule, ProfileStore  # noqa: E402
+
+DAYS = ["Hétfő", "Kedd"]
+
+
+def default_schedule():
+    return {day: {"color": "Piros", "on_time": "", "off_time": "", "sunrise": False,
+                  "sunrise_offset": 0, "sunset": False, "sunset_offset": 0} for day in DAYS}  # fmt: skip
+
+
+def profile(active, on_time, offset=-15):
+    schedule = default_schedule()
+    schedule["Kedd"].update(on_time=on_time, off_time="23:00", sunset=True, sunset_offset=offset)
+    return {"active": active, "schedule": schedule}
+
+
+def test_upsert_touches_only_one_profile_and_inactive_load_lazily(tmp_path):
+    store = ProfileStore(tmp_path / "profiles.db")
+    try:
+        assert store.journal_mode() == "wal"
+        store.sync({f"P{i:04d}": profile(i % 10 != 0, "18:00") for i in range(1000)})
+        before = store._conn.total_changes
+        store.upsert("P0001", profile(True, "19:30", offset="-20"))
+        assert store._conn.total_changes - before == 1 + len(DAYS)  # egy profil sor és a napjai
+
+        profiles = store.load(default_schedule)
+        assert list(profiles)[:2] == ["P0000", "P0001"]
+        assert profiles["P0001"]["schedule"]["Kedd"]["on_time"] == "19:30"
+        assert profiles["P0001"]["schedule"]["Kedd"]["sunset_offset"] == -20
+        lazy = profiles["P0000"]["schedule"]
+        assert isinstance(lazy, LazySchedule) and not lazy.loaded
+        store.upsert("P0000", {"active": True, "schedule": lazy})  # csak az aktív jelző íródik
+        assert not lazy.loaded
+        assert lazy["Kedd"]["sunset"] is True and lazy == profile(False, "18:00")["schedule"]
+
+        store.delete("P0002")
+        store.upsert("Új", profile(True, "07:00"))
+        names = list(store.load(default_schedule))
+        assert "P0002" not in names and names[-1] == "Új"
+    finally:
+        store.close()
+
+
+def test_migration_runs_once(tmp_path):
+    path = tmp_path / "profiles.db"
+    store = ProfileStore(path)
+    assert store.migrate({"Régi": profile(True, "20:00")}, "led_schedule.json")
+    store.close()
+    store = ProfileStore(path)  # újraindítás után
+    try:
+        assert store.migrated
+        assert not store.migrate({"Másik": profile(True, "21:00")}, "led_schedule_profiles.json")
+        assert list(store.load(default_schedule)) == ["Régi"]
+    finally:
+        store.close()
@@ -1,11 +1,26 @@
 import types
 import sys
 import importlib
+from datetime import timedelta, tzinfo
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 import config  # noqa: E402
+from core import clock  # noqa: E402
+
+
+class DummyTZ(tzinfo):
+    zone = "UTC"
+
+    def utcoffset(self, dt):
+        return timedelta(0)
+
+    def dst(self, dt):
+        return timedelta(0)
+
+    def localize(self, dt):
+        return dt.replace(tzinfo=self)
 
 
 def setup_pyside(monkeypatch):
@@ -83,24 +98,9 @@ def test_check_profiles_turns_off_when_after_last_interval(monkeypatch):
     setup_pyside(monkeypatch)
     glogic = importlib.import_module("gui.gui2_schedule_logic")
 
-    class DummyTZ:
-        zone = "UTC"
-
-        def localize(self, dt):
-            from datetime import timezone
-
-            return dt.replace(tzinfo=timezone.utc)
-
     from datetime import datetime as dt, timezone
 
-    fixed_now = dt(2023, 1, 2, 20, 0, tzinfo=timezone.utc)
-
-    class FixedDateTime(dt):
-        @classmethod
-        def now(cls, tz=None):
-            return fixed_now
-
-    monkeypatch.setattr(glogic, "datetime", FixedDateTime)
+    monkeypatch.setattr(clock, "_current", clock.VirtualClock(dt(2023, 1, 2, 20, 0, tzinfo=timezone.utc)))
     monkeypatch.setattr(glogic, "LOCAL_TZ", DummyTZ())
     monkeypatch.setattr(
         glogic,
@@ -134,3 +134,98 @@ def test_check_profiles_turns_off_when_after_last_interval(monkeypatch):
 
     assert "sent" not in log
     assert log.get("off")
+
+
+def test_check_profiles_replays_a_week_on_virtual_clock(monkeypatch):
+    setup_pyside(monkeypatch)
+    glogic = importlib.import_module("gui.gui2_schedule_logic")
+    from datetime import datetime as dt
+
+    virtual = clock.VirtualClock(dt(2023, 1, 2, 0, 0, tzinfo=DummyTZ()))  # hétfő
+    monkeypatch.setattr(clock, "_current", virtual)
+    monkeypatch.setattr(glogic, "LOCAL_TZ", DummyTZ())
+    english = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    monkeypatch.setattr(glogic, "DAYS_HU", dict(zip(english, config.DAYS)))
+
+    schedule = glogic.get_default_schedule()
+    color = glogic.COLORS[0][0]
+    for day in config.DAYS:
+        schedule[day].update({"on_time": "22:00", "off_time": "06:00", "color": color})
+    main_app = types.SimpleNamespace(
+        profiles={"Éjjel": {"active": True, "schedule": schedule}},
+        sunrise=None,
+        sunset=None,
+        is_led_on=False,
+        last_color_hex=None,
+    )
+    transitions = []
+
+    def send_color_command(hex_code, cause=None):
+        transitions.append((virtual.now(DummyTZ()).strftime("%a %H:%M"), "on"))
+        main_app.is_led_on, main_app.last_color_hex = True, hex_code
+
+    def turn_off_led(cause=None):
+        transitions.append((virtual.now(DummyTZ()).strftime("%a %H:%M"), "off"))
+        main_app.is_led_on = False
+
+    controls = types.SimpleNamespace(send_color_command=send_color_command, turn_off_led=turn_off_led)
+    widget = types.SimpleNamespace(main_app=main_app, controls_widget=controls)
+    for _ in range(7 * 24 * 60):  # egy hét percenként
+        glogic.check_profiles(widget)
+        virtual.advance(60)
+
+    assert len(transitions) == 15  # hétfő 00:00-kor még a vasárnap esti intervallum fut
+    assert transitions[:3] == [("Mon 00:00", "on"), ("Mon 06:00", "off"), ("Mon 22:00", "on")]
+    assert transitions[-1] == ("Sun 22:00", "on")
+
+
+def test_legacy_schedule_migrates_once_into_profile_store(monkeypatch, tmp_path):
+    setup_pyside(monkeypatch)
+    glogic = importlib.import_module("gui.gui2_schedule_logic")
+    legacy = tmp_path / "led_schedule.json"
+    legacy.write_text('{"Kedd": {"on_time": "19:00", "off_time": "23:00", "sunset_offset": "5"}}', encoding="utf-8")
+    monkeypatch.setattr(glogic, "CONFIG_FILE", str(legacy))
+    monkeypatch.setattr(glogic, "PROFILES_FILE", str(tmp_path / "led_schedule_profiles.json"))
+    monkeypatch.setattr(glogic, "PROFILES_DB", str(tmp_path / "profiles.db"))
+    try:
+        app = types.SimpleNamespace()
+        glogic.load_profiles_from_file(app)
+        assert app.profiles["Alapértelmezett"]["schedule"]["Kedd"]["sunset_offset"] == 5
+        app.profiles["Este"] = {"active": False, "schedule": glogic.get_default_schedule()}
+        assert glogic._save_profiles_to_file(app, "Este")
+        legacy.write_text("{}", encoding="utf-8")  # a migráció egyszeri, a régi fájl már nem számít
+        glogic.close_profile_store()
+
+        app = types.SimpleNamespace()
+        glogic.load_profiles_from_file(app)
+        assert list(app.profiles) == ["Alapértelmezett", "Este"]
+        assert app.profiles["Alapértelmezett"]["schedule"]["Kedd"]["on_time"] == "19:00"
+        assert app.profiles["Este"]["schedule"] == glogic.get_default_schedule()  # lustán töltődik
+    finally:
+        glogic.close_profile_store()
+
+
+def test_unreadable_profiles_json_is_not_marked_migrated(monkeypatch, tmp_path):
+    setup_pyside(monkeypatch)
+    glogic = importlib.import_module("gui.gui2_schedule_logic")
+    profiles_file = tmp_path / "led_schedule_profiles.json"
+    profiles_file.write_text('{"Este": {"active": true, "sched', encoding="utf-8")  # félbeszakadt írás
+    monkeypatch.setattr(glogic, "CONFIG_FILE", str(tmp_path / "led_schedule.json"))
+    monkeypatch.setattr(glogic, "PROFILES_FILE", str(profiles_file))
+    monkeypatch.setattr(glogic, "PROFILES_DB", str(tmp_path / "profiles.db"))
+    try:
+        app = types.SimpleNamespace()
+        glogic.load_profiles_from_file(app)
+        assert list(app.profiles) == ["Alapértelmezett"]
+        app.profiles["Új"] = {"active": True, "schedule": glogic.get_default_schedule()}
+        assert glogic._save_profiles_to_file(app, "Új")
+        assert not glogic._profile_store().migrated
+        glogic.close_profile_store()
+
+        profiles_file.write_text('{"Este": {"active": false, "schedule": {}}}', encoding="utf-8")  # javított fájl
+        app = types.SimpleNamespace()
+        glogic.load_profiles_from_file(app)
+        assert list(app.profiles) == ["Új", "Este"]
+        assert glogic._profile_store().migrated
+    finally:
+        glogic.close_profile_store()
@@ -0,0 +1,69 @@
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("numpy")
+
+from config import DAYS  # noqa: E402
+from core.schedule_sim import simulate  # noqa: E402
+
+
+def fixed_sun(day):
+    return datetime(day.year, day.month, day.day, 6, 0), datetime(day.year, day.month, day.day, 18, 30)
+
+
+def profile(active=True, **days):
+    return {"active": active, "schedule": days}
+
+
+def entry(color, on="18:00", off="22:00", **kw):
+    return {"color": color, "on_time": on, "off_time": off, **kw}
+
+
+def test_overnight_span_and_transitions():
+    monday = date(2024, 1, 1)
+    profiles = {"Éjjel": profile(**{DAYS[0]: entry("Kék", "22:00", "06:00")})}
+    sim = simulate(profiles, monday, date(2024, 1, 3))
+    assert sim.color_at(datetime(2024, 1, 1, 23, 0)) == "Kék"
+    assert sim.color_at(datetime(2024, 1, 2, 5, 59)) == "Kék"
+    assert sim.color_at(datetime(2024, 1, 2, 6, 0)) is None
+    assert sim.transitions() == [
+        (datetime(2024, 1, 1, 0, 0), None),
+        (datetime(2024, 1, 1, 22, 0), "Kék"),
+        (datetime(2024, 1, 2, 6, 0), None),
+    ]
+    hours = sim.daily_on_hours()
+    assert hours[monday] == {"Kék": 2.0}
+    assert hours[date(2024, 1, 2)] == {"Kék": 6.0}
+
+
+def test_sun_offsets_earliest_start_wins_and_conflicts():
+    every_day = {name: entry("Piros", "17:00", "21:00") for name in DAYS}
+    sunny = {name: {"color": "Zöld", "sunset": True, "sunset_offset": 30, "on_time": "16:00"} for name in DAYS}
+    profiles = {"Este": profile(**every_day), "Nap": profile(**sunny), "Ki": profile(False, **every_day)}
+    sim = simulate(profiles, date(2024, 1, 1), date(2024, 1, 8), sun_times=fixed_sun)
+    # A Nap profil 16:00-kor kezd, 19:00-ig (napnyugta + 30 perc) ő nyer, utána a Piros
+    assert sim.color_at(datetime(2024, 1, 3, 18, 59)) == "Zöld"
+    assert sim.color_at(datetime(2024, 1, 3, 19, 0)) == "Piros"
+    assert sim.daily_on_hours()[date(2024, 1, 3)] == {"Zöld": 3.0, "Piros": 2.0}
+    assert sim.conflict_minutes == 7 * 120
+    with pytest.raises(ValueError):
+        simulate(profiles, date(2024, 1, 1), date(2024, 1, 2))
+
+
+def test_year_with_dozens_of_profiles_is_fast():
+    profiles = {
+        f"P{i}": profile(**{name: entry("Piros" if i % 2 else "Kék", f"{i % 24:02d}:15", "07:45") for name in DAYS})
+        for i in range(36)
+    }
+    began = time.perf_counter()
+    sim = simulate(profiles, date(2024, 1, 1), date(2025, 1, 1), sun_times=fixed_sun)
+    elapsed = time.perf_counter() - began
+    assert sim.days == 366
+    assert len(sim.daily_on_hours()) == 366
+    assert elapsed < 1.0
@@ -0,0 +1,43 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.stall_watchdog import StallWatchdog  # noqa: E402
+
+
+def _blocking_save():
+    time.sleep(0.3)  # pl. szinkron JSON mentés a GUI szálon
+
+
+def test_stall_captures_blocked_stack_and_duration():
+    watchdog = StallWatchdog(threshold=0.05, heartbeat=0.01)
+    watchdog.start()
+    try:
+        watchdog.beat()
+        _blocking_save()
+        stall = watchdog.beat()
+    finally:
+        watchdog.stop()
+    assert stall is not None
+    assert 0.2 < stall.duration < 1.0
+    assert "_blocking_save" in stall.stack
+    snap = watchdog.snapshot()
+    assert snap["total"] == 1 and snap["window"]["count"] == 1
+    assert 'led_gui_stall_seconds_bucket{le="0.25"} 0' in watchdog.metric_lines()
+    assert "led_gui_stall_seconds_count 1" in watchdog.metric_lines()
+
+
+def test_regular_beats_are_not_stalls():
+    now = [100.0]
+    watchdog = StallWatchdog(threshold=0.25, heartbeat=0.05, clock=lambda: now[0])
+    for _ in range(10):
+        now[0] += 0.2  # lassú, de küszöb alatti szívverés
+        assert not watchdog.check()
+        assert watchdog.beat() is None
+    now[0] += 0.35
+    assert watchdog.check()
+    assert not watchdog.check()  # egy akadás csak egyszer kerül mentésre
+    assert abs(watchdog.beat().duration - 0.3) < 1e-9
+    assert watchdog.snapshot()["total"] == 1
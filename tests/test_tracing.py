@@ -0,0 +1,83 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.tracing import Tracer, TRACER, reset_current_span, set_current_span  # noqa: E402
+
+
+def test_disabled_tracer_returns_no_span():
+    tracer = Tracer()
+    assert tracer.start_trace("ui.click") is None
+    assert len(tracer) == 0
+
+
+def test_spans_propagate_into_send_command(monkeypatch, tmp_path, dummy_bleak):
+    import importlib
+
+    bc = importlib.import_module("core.ble_controller")
+
+    class FakeClient:
+        is_connected = True
+
+        async def write_gatt_char(self, uuid, data, response=False):
+            await asyncio.sleep(0)
+
+    controller = bc.BLEController()
+    controller.client = FakeClient()
+    monkeypatch.setattr(TRACER, "enabled", True)
+    TRACER.clear()
+
+    root = TRACER.start_trace("ui.send_color_command", color="7e000503ff000000ef")
+
+    async def task():
+        token = set_current_span(root.child("async.write"))
+        try:
+            await controller.send_command("7e000503ff000000ef")
+        finally:
+            reset_current_span(token)
+
+    asyncio.run(task())
+    root.end()
+
+    out = tmp_path / "trace.json"
+    assert TRACER.export_chrome(out) == 3
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    TRACER.clear()
+    assert [e["name"] for e in events] == ["ble.slot_wait", "ble.write_gatt_char", "ui.send_color_command"]
+    assert {e["args"]["trace_id"] for e in events} == {root.trace_id}
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+
+
+def test_failed_write_span_is_closed(dummy_bleak):
+    import importlib
+
+    bc = importlib.import_module("core.ble_controller")
+
+    class FailingClient:
+        is_connected = True
+
+        async def write_gatt_char(self, uuid, data, response=False):
+            raise bc.BleakError("write failed")
+
+    controller = bc.BLEController()
+    controller.client = FailingClient()
+    tracer = Tracer()
+    tracer.enabled = True
+    root = tracer.start_trace("ui.turn_off_led")
+
+    async def task():
+        token = set_current_span(root)
+        try:
+            await controller._write_frame("7e00050300000000ef")
+        finally:
+            reset_current_span(token)
+
+    with pytest.raises(bc.BleakError):
+        asyncio.run(task())
+    events = tracer.chrome_trace()["traceEvents"]
+    assert [(e["name"], e["args"]["failed"]) for e in events] == [("ble.write_gatt_char", True)]
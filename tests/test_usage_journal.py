@@ -0,0 +1,84 @@
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("numpy")
+
+from core.device_shadow import DeviceState  # noqa: E402
+from core.usage_journal import MAGIC, RECORD, UsageJournal, UsageReport, load  # noqa: E402
+
+RED = "7e000503ff000000ef"
+BLUE = "7e0005030000ff00ef"
+ADDR = "AA:BB:CC:DD:EE:FF"
+
+
+def ts(day, hour, minute=0):
+    return datetime(2024, 3, day, hour, minute, tzinfo=timezone.utc).timestamp()
+
+
+def test_journal_round_trip_and_torn_tail(tmp_path):
+    path = tmp_path / "usage.bin"
+    journal = UsageJournal()
+    assert not journal.record(ADDR, DeviceState(True, RED, 50))  # nincs megnyitva
+    assert journal.open(path)
+    journal.record(ADDR, DeviceState(True, RED, 50), "schedule", when=ts(1, 8))
+    journal.record(ADDR, DeviceState(False, RED, 50), "user", when=ts(1, 9))
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 5)  # félbeszakadt írás
+
+    records = load(path)
+    assert len(records) == 2
+    assert list(records["power"]) == [1, 0]
+    assert records["device"][0] == 0xAABBCCDDEEFF
+
+    assert journal.open(path)
+    journal.record(ADDR, DeviceState(True, BLUE, None), "user", when=ts(1, 10))
+    journal.close()
+    assert path.stat().st_size == len(MAGIC) + 3 * RECORD.size
+    assert load(path)["brightness"][-1] == -1
+
+
+def test_on_time_per_day_and_overrides(tmp_path):
+    journal = UsageJournal(tmp_path / "usage.bin")
+    journal.open()
+    journal.record(ADDR, DeviceState(True, RED, 80), "schedule", when=ts(1, 22))
+    journal.record(ADDR, DeviceState(True, BLUE, 80), "user", when=ts(2, 1))
+    journal.record(ADDR, DeviceState(False, BLUE, 80), "schedule", when=ts(2, 2))
+    journal.record("11:22:33:44:55:66", DeviceState(True, RED, None), "user", when=ts(2, 12))
+    journal.close()
+
+    report = UsageReport(load(journal.path), tz=timezone.utc, until=ts(2, 13))
+    hours = {day: {c: s / 3600 for c, s in colors.items()} for day, colors in report.on_time_per_day().items()}
+    assert hours == {date(2024, 3, 1): {RED: 2.0}, date(2024, 3, 2): {RED: 2.0, BLUE: 1.0}}
+    assert report.on_time_per_day(device=ADDR)[date(2024, 3, 2)] == {RED: 3600.0, BLUE: 3600.0}
+    assert report.cause_counts_per_day() == {
+        date(2024, 3, 1): {"schedule": 1},
+        date(2024, 3, 2): {"user": 2, "schedule": 1},
+    }
+    assert report.manual_overrides_per_day() == {date(2024, 3, 2): 1}
+
+
+def test_link_loss_stops_on_time_until_next_state(tmp_path, dummy_bleak):
+    import importlib
+
+    bc = importlib.import_module("core.ble_controller")
+    journal = UsageJournal(tmp_path / "usage.bin", clock=lambda: ts(1, 21))
+    journal.open()
+    controller = bc.BLEController(journal=journal)
+    controller.target_address = ADDR
+    shadow = controller.shadow_for()
+    shadow.acknowledge(RED)
+    journal.record(ADDR, shadow.reported, "schedule", when=ts(1, 20))
+    controller.on_link_lost()  # 21:00, utána órákig nincs kapcsolat
+    controller.on_link_lost()  # ismételt jelzés nem ír új rekordot
+    journal.record(ADDR, DeviceState(True, BLUE, None), "replay", when=ts(2, 8))
+    journal.close()
+
+    report = UsageReport(load(journal.path), tz=timezone.utc, until=ts(2, 9))
+    assert report.on_time_per_day() == {date(2024, 3, 1): {RED: 3600.0}, date(2024, 3, 2): {BLUE: 3600.0}}
+    assert report.cause_counts_per_day() == {date(2024, 3, 1): {"schedule": 1}, date(2024, 3, 2): {"replay": 1}}
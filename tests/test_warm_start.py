@@ -0,0 +1,36 @@
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _modules():
+    return importlib.import_module("core.warm_start"), importlib.import_module("core.ble_controller")
+
+
+def test_startup_timer_keeps_first_mark(dummy_bleak):
+    ws, _ = _modules()
+    now = [10.0]
+    timer = ws.StartupTimer(clock=lambda: now[0], origin=10.0)
+    now[0] = 10.4
+    assert timer.mark("connected")
+    now[0] = 10.9
+    assert timer.mark("first_command")
+    assert not timer.mark("connected")
+    assert timer.format_report() == "Indítási idők: connected 400 ms, first_command 900 ms"
+
+
+def test_wait_for_adapter_polls_until_bluetooth_is_on(monkeypatch, dummy_bleak):
+    ws, bc = _modules()
+    probes = []
+
+    async def probe():
+        probes.append(1)
+        if len(probes) < 3:
+            raise OSError("Bluetooth adapter is off")
+
+    monkeypatch.setattr(ws, "_probe_once", probe)
+    assert asyncio.run(ws.wait_for_adapter(bc.BLEController(), timeout=2.0, interval=0.01))
+    assert len(probes) == 3